@@ -10,6 +10,52 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "secret-key-change-in-production")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_EXPIRATION_HOURS: int = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    BCRYPT_EXECUTOR: str = os.getenv("BCRYPT_EXECUTOR", "thread")
+    BCRYPT_MAX_WORKERS: int = int(os.getenv("BCRYPT_MAX_WORKERS", "2"))
+    BCRYPT_MAX_QUEUE: int = int(os.getenv("BCRYPT_MAX_QUEUE", "100"))
+    INDEX_PLAN_CHECK: bool = os.getenv("INDEX_PLAN_CHECK", "true").lower() == "true"
+    CHAT_POLL_INTERVAL_SECONDS: float = float(os.getenv("CHAT_POLL_INTERVAL_SECONDS", "1.0"))
+    LOCATION_HISTORY_RETENTION_DAYS: int = int(os.getenv("LOCATION_HISTORY_RETENTION_DAYS", "30"))
+    LOCATION_BUCKET_MAX_FIXES: int = int(os.getenv("LOCATION_BUCKET_MAX_FIXES", "1000"))
+    STATS_RECONCILE_INTERVAL_SECONDS: int = int(os.getenv("STATS_RECONCILE_INTERVAL_SECONDS", "300"))
+    DISPATCH_ENABLED: bool = os.getenv("DISPATCH_ENABLED", "false").lower() == "true"
+    DISPATCH_INTERVAL_SECONDS: int = int(os.getenv("DISPATCH_INTERVAL_SECONDS", "30"))
+    DISPATCH_BATCH_SIZE: int = int(os.getenv("DISPATCH_BATCH_SIZE", "10000"))
+    DISPATCH_MAX_DISTANCE_KM: float = float(os.getenv("DISPATCH_MAX_DISTANCE_KM", "25"))
+    DISPATCH_CREW_CAPACITY: int = int(os.getenv("DISPATCH_CREW_CAPACITY", "3"))
+    DISPATCH_FIX_MAX_AGE_MINUTES: int = int(os.getenv("DISPATCH_FIX_MAX_AGE_MINUTES", "15"))
+    FAULT_INDEX_ENABLED: bool = os.getenv("FAULT_INDEX_ENABLED", "true").lower() == "true"
+    FAULT_INDEX_POLL_SECONDS: int = int(os.getenv("FAULT_INDEX_POLL_SECONDS", "10"))
+    LOCATION_INGEST_ENABLED: bool = os.getenv("LOCATION_INGEST_ENABLED", "true").lower() == "true"
+    LOCATION_INGEST_QUEUE_SIZE: int = int(os.getenv("LOCATION_INGEST_QUEUE_SIZE", "50000"))
+    LOCATION_INGEST_BATCH_SIZE: int = int(os.getenv("LOCATION_INGEST_BATCH_SIZE", "5000"))
+    LOCATION_INGEST_FLUSH_MS: int = int(os.getenv("LOCATION_INGEST_FLUSH_MS", "50"))
+    LOCATION_INGEST_MAX_RETRIES: int = int(os.getenv("LOCATION_INGEST_MAX_RETRIES", "5"))
+    LOCATION_INGEST_RETRY_MS: int = int(os.getenv("LOCATION_INGEST_RETRY_MS", "100"))
+    LOCATION_BATCH_MAX_FIXES: int = int(os.getenv("LOCATION_BATCH_MAX_FIXES", "5000"))
+    LOCATION_BATCH_MAX_BYTES: int = int(os.getenv("LOCATION_BATCH_MAX_BYTES", "4000000"))
+    CREW_FEED_MIN_INTERVAL_MS: int = int(os.getenv("CREW_FEED_MIN_INTERVAL_MS", "1000"))
+    CREW_FEED_POLL_SECONDS: float = float(os.getenv("CREW_FEED_POLL_SECONDS", "2.0"))
+    TILE_CLUSTER_DEPTH: int = int(os.getenv("TILE_CLUSTER_DEPTH", "4"))
+    TILE_CACHE_MAX_ENTRIES: int = int(os.getenv("TILE_CACHE_MAX_ENTRIES", "5000"))
+    TILE_CACHE_TTL_SECONDS: int = int(os.getenv("TILE_CACHE_TTL_SECONDS", "60"))
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    DEDUP_RADIUS_METERS: float = float(os.getenv("DEDUP_RADIUS_METERS", "300"))
+    DEDUP_WINDOW_MINUTES: int = int(os.getenv("DEDUP_WINDOW_MINUTES", "360"))
+    DEDUP_MIN_SIMILARITY: float = float(os.getenv("DEDUP_MIN_SIMILARITY", "0.3"))
+    DEDUP_MAX_CANDIDATES: int = int(os.getenv("DEDUP_MAX_CANDIDATES", "200"))
+    WORKERS: int = int(os.getenv("WORKERS", os.getenv("WEB_CONCURRENCY", "1")))
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_TTL_ME_SECONDS: int = int(os.getenv("CACHE_TTL_ME_SECONDS", "60"))
+    CACHE_TTL_DETAIL_SECONDS: int = int(os.getenv("CACHE_TTL_DETAIL_SECONDS", "30"))
+    CACHE_TTL_LIST_SECONDS: int = int(os.getenv("CACHE_TTL_LIST_SECONDS", "10"))
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
     
     class Config:
         env_file = ".env"
@@ -1,5 +1,7 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from config import settings
+from models import ensure_indexes, check_query_plans
+from migrations import run_migrations
 
 # MongoDB async client
 _client = None
@@ -11,9 +13,15 @@ async def init_db():
     _client = AsyncIOMotorClient(settings.MONGODB_URL)
     _database = _client[settings.DATABASE_NAME]
     
-    # Create indexes for better performance
-    users_collection = _database["users"]
-    await users_collection.create_index("email", unique=True)
+    # Create the indexes declared by the model modules
+    await ensure_indexes(_database)
+    
+    # Apply pending one-time data migrations
+    await run_migrations(_database)
+    
+    # Refuse to start if a hot query would scan a whole collection
+    if settings.INDEX_PLAN_CHECK:
+        await check_query_plans(_database)
     print("✅ Database initialized and indexes created")
 
 def get_db():
@@ -1,8 +1,20 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from routes import auth_router, consumer_router, electrician_router, chat_router
-from database import close_db, init_db
+from config import settings
+from database import close_db, get_db, init_db
+from utils.auth import password_hasher, principal_cache
+from utils.chat_hub import chat_hub
+from utils.stats_reconciler import stats_reconciler
+from utils.dispatch import dispatcher
+from utils.fault_index import fault_index
+from utils.response_cache import response_cache
+from utils.location_ingest import location_ingest
+from utils.crew_feed import crew_feed
+from utils.fault_tiles import fault_tiles
+from utils.dedup import duplicate_detector
 
 # Lifespan context manager
 @asynccontextmanager
@@ -10,9 +22,23 @@ async def lifespan(app: FastAPI):
     """Manage app startup and shutdown"""
     # Startup
     await init_db()
+    response_cache.configure()
+    await chat_hub.start(get_db())
+    await crew_feed.start(get_db())
+    await stats_reconciler.start(get_db())
+    await fault_index.start(get_db())
+    await dispatcher.start(get_db())
+    await location_ingest.start(get_db())
     print("🚀 VoltGuard API started")
     yield
     # Shutdown
+    await location_ingest.stop()
+    await dispatcher.stop()
+    await chat_hub.stop()
+    await crew_feed.stop()
+    await fault_index.stop()
+    await stats_reconciler.stop()
+    password_hasher.shutdown()
     await close_db()
     print("🛑 VoltGuard API stopped")
 
@@ -56,8 +82,36 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "ok", "message": "VoltGuard API is running"}
 
+# Readiness check endpoint
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: 503 until the open-fault index has loaded and caught up"""
+    index = fault_index.stats()
+    if index["enabled"] and not index["ready"]:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting", "fault_index": index}
+        )
+    return {"status": "ready", "fault_index": index}
+
+# Runtime metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    """In-process cache and worker metrics"""
+    return {
+        "token_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "dispatcher": dispatcher.stats(),
+        "fault_index": fault_index.stats(),
+        "response_cache": response_cache.stats(),
+        "location_ingest": location_ingest.stats(),
+        "crew_feed": crew_feed.stats(),
+        "fault_tiles": fault_tiles.stats(),
+        "duplicate_detector": duplicate_detector.stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     import os
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=settings.WORKERS)
@@ -0,0 +1,37 @@
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from .priority_rank import backfill_priority_rank
+from .geo_points import backfill_geo_points
+from .versions import backfill_versions
+from .quadkeys import backfill_quadkeys
+
+# One-time data migrations, applied in order and recorded in the `migrations` collection
+MIGRATIONS = [
+    ("0001_priority_rank", backfill_priority_rank),
+    ("0002_geo_points", backfill_geo_points),
+    ("0003_versions", backfill_versions),
+    ("0004_quadkeys", backfill_quadkeys),
+]
+
+
+async def run_migrations(db):
+    """Apply every migration that has not been recorded yet"""
+    migrations_collection = db["migrations"]
+
+    for name, migration in MIGRATIONS:
+        if await migrations_collection.find_one({"_id": name}):
+            continue
+
+        updated = await migration(db)
+        try:
+            await migrations_collection.insert_one({"_id": name, "applied_at": datetime.utcnow()})
+        except DuplicateKeyError:
+            # Another worker finished the same migration first
+            pass
+        print(f"🛠️ Migration {name} applied ({updated} documents updated)")
+
+
+__all__ = [
+    "MIGRATIONS", "run_migrations", "backfill_priority_rank", "backfill_geo_points", "backfill_versions",
+    "backfill_quadkeys"
+]
@@ -0,0 +1,16 @@
+async def backfill_geo_points(db):
+    """Add GeoJSON `geo` points to documents that only have latitude/longitude floats"""
+    valid_coordinates = {
+        "latitude": {"$type": "number", "$gte": -90, "$lte": 90},
+        "longitude": {"$type": "number", "$gte": -180, "$lte": 180},
+        "geo": {"$exists": False}
+    }
+    set_point = [{"$set": {
+        "geo": {"type": "Point", "coordinates": ["$longitude", "$latitude"]}
+    }}]
+
+    updated = 0
+    for collection_name in ("fault_requests", "consumer_locations"):
+        result = await db[collection_name].update_many(valid_coordinates, set_point)
+        updated += result.modified_count
+    return updated
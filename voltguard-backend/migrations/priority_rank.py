@@ -0,0 +1,23 @@
+from models.fault_request import PRIORITY_RANKS
+
+
+async def backfill_priority_rank(db):
+    """Set `priority_rank` on fault requests written before it existed"""
+    fault_requests_collection = db["fault_requests"]
+    updated = 0
+
+    for label, rank in PRIORITY_RANKS.items():
+        result = await fault_requests_collection.update_many(
+            {"priority": label, "priority_rank": {"$ne": rank}},
+            {"$set": {"priority_rank": rank}}
+        )
+        updated += result.modified_count
+
+    # Unknown or missing labels sort below every known priority
+    result = await fault_requests_collection.update_many(
+        {"priority": {"$nin": list(PRIORITY_RANKS)}, "priority_rank": {"$ne": 0}},
+        {"$set": {"priority_rank": 0}}
+    )
+    updated += result.modified_count
+
+    return updated
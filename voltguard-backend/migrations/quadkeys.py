@@ -0,0 +1,32 @@
+from pymongo import UpdateOne
+from models.geo import point_quadkey
+
+# Documents updated per bulk write
+BATCH_SIZE = 1000
+
+
+async def backfill_quadkeys(db):
+    """Add the map tile `quadkey` to fault requests that have coordinates but no quadkey"""
+    collection = db["fault_requests"]
+    cursor = collection.find(
+        {
+            "latitude": {"$type": "number", "$gte": -90, "$lte": 90},
+            "longitude": {"$type": "number", "$gte": -180, "$lte": 180},
+            "quadkey": {"$exists": False}
+        },
+        {"latitude": 1, "longitude": 1}
+    )
+
+    updated = 0
+    operations = []
+    async for doc in cursor:
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"quadkey": point_quadkey(doc["latitude"], doc["longitude"])}}
+        ))
+        if len(operations) == BATCH_SIZE:
+            updated += (await collection.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await collection.bulk_write(operations, ordered=False)).modified_count
+    return updated
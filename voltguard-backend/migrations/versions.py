@@ -0,0 +1,7 @@
+async def backfill_versions(db):
+    """Start the optimistic-concurrency `version` counter at 0 on existing fault requests"""
+    result = await db["fault_requests"].update_many(
+        {"version": {"$exists": False}},
+        {"$set": {"version": 0}}
+    )
+    return result.modified_count
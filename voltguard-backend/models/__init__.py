@@ -1,5 +1,11 @@
+from .base import Model, response_row
 from .user import User
 from .location import Location
 from .fault_request import FaultRequest
+from .message import Message
+from .indexes import register_index, register_query_shape, ensure_indexes, check_query_plans
 
-__all__ = ["User", "Location", "FaultRequest"]
+__all__ = [
+    "Model", "response_row", "User", "Location", "FaultRequest", "Message",
+    "register_index", "register_query_shape", "ensure_indexes", "check_query_plans"
+]
@@ -0,0 +1,50 @@
+class Model:
+    """
+    Base class for the MongoDB models
+
+    Each subclass lists its stored fields once in `FIELDS` and uses the same
+    tuple as its `__slots__`, so instances carry no per-instance `__dict__`
+    and dict conversion walks a shared tuple instead of a hand-written
+    literal. `DEFAULTS` holds the values `from_dict` uses for absent keys.
+    """
+
+    __slots__ = ()
+
+    FIELDS: tuple = ()
+    DEFAULTS: dict = {}
+
+    def derived_fields(self) -> dict:
+        """Stored fields computed from the others (indexed copies, ranks, ...)"""
+        return {}
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for MongoDB (includes _id)"""
+        doc = {field: getattr(self, field) for field in self.FIELDS}
+        doc.update(self.derived_fields())
+        return doc
+
+    def to_update_dict(self) -> dict:
+        """Convert to dictionary for MongoDB updates (excludes _id)"""
+        doc = self.to_dict()
+        del doc["_id"]
+        return doc
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Create from dictionary (MongoDB document)"""
+        defaults = cls.DEFAULTS
+        return cls(**{field: data.get(field, defaults.get(field)) for field in cls.FIELDS})
+
+
+def response_row(doc: dict, **extra) -> dict:
+    """
+    Turn a fetched document into a response row in place
+
+    `_id` is replaced by its string form under `id` and `extra` is merged in.
+    The document is not copied and no model objects are built, so list
+    endpoints hand the driver's dicts straight to response validation.
+    """
+    doc["id"] = str(doc.pop("_id"))
+    if extra:
+        doc.update(extra)
+    return doc
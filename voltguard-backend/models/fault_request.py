@@ -1,10 +1,37 @@
 from datetime import datetime
 from bson import ObjectId
+from .base import Model
+from .indexes import register_index, register_query_shape
+from .geo import geo_point, point_quadkey
 
+# Known lifecycle states; anything else is counted as "other" in the dashboard statistics
+STATUSES = ("open", "assigned", "in_progress", "resolved", "closed")
 
-class FaultRequest:
+# Numeric rank stored next to the priority label so the queue sorts correctly
+PRIORITY_RANKS = {
+    "low": 1,
+    "medium": 2,
+    "high": 3,
+    "critical": 4
+}
+
+
+def priority_rank(priority: str) -> int:
+    """Get the sortable rank of a priority label (0 for unknown labels)"""
+    return PRIORITY_RANKS.get(priority, 0)
+
+
+class FaultRequest(Model):
     """Fault Request model for MongoDB"""
     
+    FIELDS = (
+        "_id", "consumer_id", "title", "description", "location", "latitude", "longitude",
+        "photo_url", "status", "priority", "assigned_to", "assigned_at", "version",
+        "parent_id", "duplicate_score", "duplicate_count", "created_at", "updated_at"
+    )
+    DEFAULTS = {"status": "open", "priority": "medium", "version": 0, "duplicate_count": 0}
+    __slots__ = FIELDS
+    
     def __init__(
         self,
         consumer_id: str,
@@ -17,6 +44,11 @@ class FaultRequest:
         status: str = "open",  # open, assigned, in_progress, resolved, closed
         priority: str = "medium",  # low, medium, high, critical
         assigned_to: str = None,  # electrician_id
+        assigned_at: datetime = None,  # first assignment, for time-to-assign
+        version: int = 0,  # bumped on every status/assignment change
+        parent_id: str = None,  # incident this report was detected as a duplicate of
+        duplicate_score: float = None,  # text similarity to the parent when linked
+        duplicate_count: int = 0,  # reports linked to this one as duplicates
         _id: ObjectId = None,
         created_at: datetime = None,
         updated_at: datetime = None
@@ -32,42 +64,86 @@ class FaultRequest:
         self.status = status
         self.priority = priority
         self.assigned_to = assigned_to
+        self.assigned_at = assigned_at
+        self.version = version
+        self.parent_id = parent_id
+        self.duplicate_score = duplicate_score
+        self.duplicate_count = duplicate_count
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
     
-    def to_dict(self):
-        """Convert to dictionary for MongoDB"""
+    def derived_fields(self):
+        """Indexed copies of the coordinates and priority"""
         return {
-            "_id": self._id,
-            "consumer_id": self.consumer_id,
-            "title": self.title,
-            "description": self.description,
-            "location": self.location,
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "photo_url": self.photo_url,
-            "status": self.status,
-            "priority": self.priority,
-            "assigned_to": self.assigned_to,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at
+            "geo": geo_point(self.latitude, self.longitude),
+            "quadkey": point_quadkey(self.latitude, self.longitude),
+            "priority_rank": priority_rank(self.priority)
         }
-    
-    @staticmethod
-    def from_dict(data: dict):
-        """Create from dictionary"""
-        return FaultRequest(
-            consumer_id=data.get("consumer_id"),
-            title=data.get("title"),
-            description=data.get("description"),
-            location=data.get("location"),
-            latitude=data.get("latitude"),
-            longitude=data.get("longitude"),
-            photo_url=data.get("photo_url"),
-            status=data.get("status", "open"),
-            priority=data.get("priority", "medium"),
-            assigned_to=data.get("assigned_to"),
-            _id=data.get("_id"),
-            created_at=data.get("created_at"),
-            updated_at=data.get("updated_at")
-        )
+
+
+# Consumer view: own requests, optionally by status, newest first
+register_index("fault_requests", [("consumer_id", 1), ("created_at", -1), ("_id", -1)])
+register_index("fault_requests", [("consumer_id", 1), ("status", 1), ("created_at", -1), ("_id", -1)])
+
+# Electrician assignments, optionally by status, newest first
+register_index("fault_requests", [("assigned_to", 1), ("created_at", -1), ("_id", -1)])
+register_index("fault_requests", [("assigned_to", 1), ("status", 1), ("created_at", -1), ("_id", -1)])
+
+# Electrician queue, optionally by status, highest priority first
+register_index("fault_requests", [("priority_rank", -1), ("created_at", -1), ("_id", -1)])
+register_index("fault_requests", [("status", 1), ("priority_rank", -1), ("created_at", -1), ("_id", -1)])
+
+register_query_shape(
+    "fault_requests", "consumer_requests",
+    {"consumer_id": ""}, [("created_at", -1), ("_id", -1)]
+)
+register_query_shape(
+    "fault_requests", "consumer_requests_by_status",
+    {"consumer_id": "", "status": "open"}, [("created_at", -1), ("_id", -1)]
+)
+register_query_shape(
+    "fault_requests", "electrician_assignments",
+    {"assigned_to": ""}, [("created_at", -1), ("_id", -1)]
+)
+register_query_shape(
+    "fault_requests", "electrician_assignments_by_status",
+    {"assigned_to": "", "status": "assigned"}, [("created_at", -1), ("_id", -1)]
+)
+register_query_shape(
+    "fault_requests", "electrician_queue",
+    {}, [("priority_rank", -1), ("created_at", -1), ("_id", -1)]
+)
+register_query_shape(
+    "fault_requests", "electrician_queue_by_status",
+    {"status": "open"}, [("priority_rank", -1), ("created_at", -1), ("_id", -1)]
+)
+register_query_shape(
+    "fault_requests", "claim_next",
+    {"status": "open", "assigned_to": None}, [("priority_rank", -1), ("created_at", -1), ("_id", -1)]
+)
+
+# Analytics export, optionally by status, oldest first over a created_at range
+register_index("fault_requests", [("created_at", 1), ("_id", 1)])
+register_index("fault_requests", [("status", 1), ("created_at", 1), ("_id", 1)])
+
+register_query_shape(
+    "fault_requests", "export_range",
+    {"created_at": {"$gte": datetime(1970, 1, 1)}}, [("created_at", 1), ("_id", 1)]
+)
+register_query_shape(
+    "fault_requests", "export_range_by_status",
+    {"status": "open", "created_at": {"$gte": datetime(1970, 1, 1)}}, [("created_at", 1), ("_id", 1)]
+)
+
+# Nearby faults ($geoNear), optionally by status
+register_index("fault_requests", [("geo", "2dsphere"), ("status", 1)])
+
+# Map tiles: a tile is a quadkey range; the index covers the clustering aggregation
+register_index("fault_requests", [
+    ("quadkey", 1), ("status", 1), ("priority", 1), ("latitude", 1), ("longitude", 1)
+])
+
+register_query_shape(
+    "fault_requests", "tile",
+    {"quadkey": {"$gte": "0", "$lt": "04"}}
+)
@@ -0,0 +1,57 @@
+import math
+from typing import Optional
+
+# Length of a degree of latitude (and of longitude at the equator)
+KM_PER_DEGREE = 111.2
+
+# Finest Web Mercator tile level stored as a quadkey (cells of a few metres)
+QUADKEY_ZOOM = 23
+
+# Web Mercator stops short of the poles
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+
+def geo_point(latitude: float, longitude: float):
+    """
+    Build a GeoJSON Point for a 2dsphere index
+
+    Returns None when either coordinate is missing or out of range, since a
+    2dsphere index rejects writes with invalid coordinates.
+    """
+    if latitude is None or longitude is None:
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+
+
+def tile_xy(latitude: float, longitude: float, zoom: int) -> tuple:
+    """Web Mercator (slippy map) tile column and row containing a point"""
+    latitude = max(-MAX_MERCATOR_LATITUDE, min(MAX_MERCATOR_LATITUDE, latitude))
+    scale = 1 << zoom
+    sin_latitude = math.sin(math.radians(latitude))
+    x = (longitude + 180) / 360 * scale
+    y = (0.5 - math.log((1 + sin_latitude) / (1 - sin_latitude)) / (4 * math.pi)) * scale
+    return min(max(int(x), 0), scale - 1), min(max(int(y), 0), scale - 1)
+
+
+def tile_quadkey(zoom: int, x: int, y: int) -> str:
+    """
+    Quadkey of a tile: one digit (0-3) per zoom level
+
+    A tile's quadkey is a prefix of the quadkey of every tile and point
+    inside it, so a tile is a string range over stored quadkeys.
+    """
+    digits = []
+    for level in range(zoom, 0, -1):
+        mask = 1 << (level - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return "".join(digits)
+
+
+def point_quadkey(latitude: float, longitude: float, zoom: int = QUADKEY_ZOOM) -> Optional[str]:
+    """Quadkey of the tile containing a point, or None without valid coordinates"""
+    if geo_point(latitude, longitude) is None:
+        return None
+    return tile_quadkey(zoom, *tile_xy(latitude, longitude, zoom))
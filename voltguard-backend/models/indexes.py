@@ -0,0 +1,124 @@
+from typing import List, Optional, Tuple
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+# Declared indexes per collection, filled in by the model modules at import time
+INDEXES: dict = {}
+
+# Query shapes the routes rely on, checked with explain() at startup
+QUERY_SHAPES: list = []
+
+# Plan stages that mean a query shape is not served by an index
+_BLOCKING_STAGES = ("COLLSCAN", "SORT")
+
+# Index options compared when reconciling an existing index with its declaration
+_COMPARED_OPTIONS = {
+    "unique": False,
+    "sparse": False,
+    "expireAfterSeconds": None,
+    "partialFilterExpression": None
+}
+
+
+def register_index(collection: str, keys, **kwargs) -> IndexModel:
+    """Declare an index on `collection`; `keys` and options are passed to `IndexModel`"""
+    index = IndexModel(keys, **kwargs)
+    INDEXES.setdefault(collection, []).append(index)
+    return index
+
+
+def register_query_shape(
+    collection: str,
+    name: str,
+    filter: dict,
+    sort: Optional[List[Tuple[str, int]]] = None
+):
+    """Declare a query shape that must be served by an index"""
+    QUERY_SHAPES.append({
+        "collection": collection,
+        "name": name,
+        "filter": filter,
+        "sort": sort
+    })
+
+
+def _index_matches(existing: dict, declared: dict) -> bool:
+    """Check whether an index from `index_information()` matches its declaration"""
+    if list(existing.get("key", [])) != list(declared["key"].items()):
+        return False
+    for option, default in _COMPARED_OPTIONS.items():
+        if existing.get(option, default) != declared.get(option, default):
+            return False
+    return True
+
+
+async def ensure_indexes(db):
+    """
+    Reconcile the declared indexes with the database
+
+    Missing indexes are created and indexes whose definition changed are
+    rebuilt. Indexes that are not declared are left alone. Safe to run on
+    every startup.
+    """
+    for collection_name, indexes in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+
+        missing = []
+        for index in indexes:
+            declared = index.document
+            current = existing.get(declared["name"])
+            if current is None:
+                missing.append(index)
+            elif not _index_matches(current, declared):
+                print(f"🔁 Rebuilding index {collection_name}.{declared['name']}")
+                await collection.drop_index(declared["name"])
+                missing.append(index)
+
+        if missing:
+            await collection.create_indexes(missing)
+            names = ", ".join(index.document["name"] for index in missing)
+            print(f"📇 Created indexes on {collection_name}: {names}")
+
+
+def _plan_stages(plan) -> list:
+    """Collect every stage name in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def check_query_plans(db):
+    """
+    Run explain() on every registered query shape
+
+    Raises RuntimeError listing the shapes whose winning plan is a collection
+    scan or needs an in-memory sort.
+    """
+    unindexed = []
+    for shape in QUERY_SHAPES:
+        cursor = db[shape["collection"]].find(shape["filter"])
+        if shape["sort"]:
+            cursor = cursor.sort(shape["sort"])
+        try:
+            explain = await cursor.explain()
+        except OperationFailure as e:
+            raise RuntimeError(f"explain() failed for query shape '{shape['name']}': {e}")
+
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        blocking = [stage for stage in _plan_stages(winning_plan) if stage in _BLOCKING_STAGES]
+        if blocking:
+            unindexed.append(f"{shape['collection']}:{shape['name']} ({', '.join(blocking)})")
+
+    if unindexed:
+        raise RuntimeError(
+            "Query shapes not served by an index: " + ", ".join(unindexed)
+        )
+    print(f"✅ {len(QUERY_SHAPES)} query shapes are index-backed")
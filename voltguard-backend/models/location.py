@@ -1,10 +1,24 @@
 from datetime import datetime
 from bson import ObjectId
+from config import settings
+from .base import Model
+from .indexes import register_index, register_query_shape
+from .geo import geo_point
 
+# Per-user hourly buckets of GPS fixes, kept alongside the current-location row
+LOCATION_HISTORY_COLLECTION = "location_history"
 
-class Location:
+
+class Location(Model):
     """Location model for storing consumer GPS data"""
     
+    FIELDS = (
+        "_id", "user_id", "latitude", "longitude", "accuracy", "altitude", "is_sharing",
+        "created_at", "updated_at"
+    )
+    DEFAULTS = {"is_sharing": True}
+    __slots__ = FIELDS
+    
     def __init__(
         self,
         user_id: str,
@@ -27,44 +41,70 @@ class Location:
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
     
-    def to_dict(self):
-        """Convert location to dictionary for MongoDB (includes _id)"""
-        return {
-            "_id": self._id,
-            "user_id": self.user_id,
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "accuracy": self.accuracy,
-            "altitude": self.altitude,
-            "is_sharing": self.is_sharing,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at
-        }
+    def derived_fields(self):
+        """Indexed GeoJSON copy of the coordinates"""
+        return {"geo": geo_point(self.latitude, self.longitude)}
     
-    def to_update_dict(self):
-        """Convert location to dictionary for MongoDB updates (excludes _id)"""
+    def to_history_fix(self):
+        """Convert location to a compact fix for the history bucket array"""
         return {
-            "user_id": self.user_id,
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "accuracy": self.accuracy,
-            "altitude": self.altitude,
-            "is_sharing": self.is_sharing,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at
+            "t": self.updated_at,
+            "lat": self.latitude,
+            "lon": self.longitude,
+            "acc": self.accuracy,
+            "alt": self.altitude,
+            "sh": self.is_sharing
         }
     
+    def history_bucket_update(self):
+        """Build the (filter, update) upsert that appends this fix to its hourly bucket"""
+        return self.history_bucket_batch([self])
+    
     @staticmethod
-    def from_dict(data: dict):
-        """Create location from dictionary (MongoDB document)"""
-        return Location(
-            user_id=data.get("user_id"),
-            latitude=data.get("latitude"),
-            longitude=data.get("longitude"),
-            accuracy=data.get("accuracy"),
-            altitude=data.get("altitude"),
-            is_sharing=data.get("is_sharing", True),
-            _id=data.get("_id"),
-            created_at=data.get("created_at"),
-            updated_at=data.get("updated_at")
-        )
+    def history_bucket_batch(locations: list):
+        """
+        Build the (filter, update) upsert appending several fixes to one hourly bucket
+        
+        All `locations` belong to the same user and hour, oldest first. Buckets
+        hold at most LOCATION_BUCKET_MAX_FIXES fixes; once a bucket has no room
+        for the whole batch the filter stops matching it and the upsert opens
+        a new one.
+        """
+        first, last = locations[0], locations[-1]
+        bucket_start = first.updated_at.replace(minute=0, second=0, microsecond=0)
+        bucket_filter = {
+            "user_id": first.user_id,
+            "bucket_start": bucket_start,
+            "count": {"$lte": settings.LOCATION_BUCKET_MAX_FIXES - len(locations)}
+        }
+        update = {
+            "$push": {"fixes": {"$each": [location.to_history_fix() for location in locations]}},
+            "$inc": {"count": len(locations)},
+            "$min": {"first_at": first.updated_at},
+            "$max": {"last_at": last.updated_at}
+        }
+        return bucket_filter, update
+
+# One current-location document per user
+register_index("consumer_locations", [("user_id", 1)])
+
+# Nearby sharing users ($geoNear)
+register_index("consumer_locations", [("geo", "2dsphere"), ("is_sharing", 1)])
+
+# Crew feed polling fallback: rows written since the last poll
+register_index("consumer_locations", [("written_at", 1)])
+
+register_query_shape("consumer_locations", "user_location", {"user_id": ""})
+
+# History buckets by user and time; buckets expire once their newest fix passes the retention window
+register_index(LOCATION_HISTORY_COLLECTION, [("user_id", 1), ("bucket_start", 1)])
+register_index(
+    LOCATION_HISTORY_COLLECTION,
+    [("last_at", 1)],
+    expireAfterSeconds=settings.LOCATION_HISTORY_RETENTION_DAYS * 24 * 3600
+)
+
+register_query_shape(
+    LOCATION_HISTORY_COLLECTION, "user_history_range",
+    {"user_id": "", "bucket_start": {"$gte": datetime(1970, 1, 1)}}, [("bucket_start", 1)]
+)
@@ -1,8 +1,15 @@
 from datetime import datetime
 from typing import Optional
 from bson import ObjectId
+from .base import Model
+from .indexes import register_index, register_query_shape
+
+class Message(Model):
+    """Chat message model for MongoDB"""
+
+    FIELDS = ("_id", "request_id", "sender_id", "sender_type", "content", "created_at")
+    __slots__ = FIELDS
 
-class Message:
     def __init__(
         self,
         request_id: str,
@@ -19,22 +26,19 @@ class Message:
         self.content = content
         self.created_at = created_at or datetime.utcnow()
 
-    def to_dict(self):
-        return {
-            "_id": self._id,
-            "request_id": self.request_id,
-            "sender_id": self.sender_id,
-            "sender_type": self.sender_type,
-            "content": self.content,
-            "created_at": self.created_at,
-        }
 
-    def to_update_dict(self):
-        """Returns dict for MongoDB update operations (excludes _id)"""
-        return {
-            "request_id": self.request_id,
-            "sender_id": self.sender_id,
-            "sender_type": self.sender_type,
-            "content": self.content,
-            "created_at": self.created_at,
-        }
+# Chat history per fault request, paged by ObjectId (creation order)
+register_index("messages", [("request_id", 1), ("_id", 1)])
+
+register_query_shape("messages", "request_messages", {"request_id": ""}, [("_id", -1)])
+register_query_shape(
+    "messages", "request_messages_after",
+    {"request_id": "", "_id": {"$gt": ObjectId("000000000000000000000000")}}, [("_id", 1)]
+)
+register_query_shape(
+    "messages", "request_messages_overlap",
+    {"request_id": "", "_id": {
+        "$gte": ObjectId("000000000000000000000000"), "$lt": ObjectId("ffffffffffffffffffffffff")
+    }},
+    [("_id", 1)]
+)
@@ -1,9 +1,19 @@
 from datetime import datetime
 from bson import ObjectId
+from .base import Model
+from .indexes import register_index
 
-class User:
+class User(Model):
     """User model for MongoDB"""
     
+    FIELDS = (
+        "_id", "email", "password_hash", "full_name", "role", "phone", "company",
+        "street_address", "city", "state", "postal_code", "country", "is_active",
+        "created_at", "updated_at"
+    )
+    DEFAULTS = {"role": "consumer", "is_active": True}
+    __slots__ = FIELDS
+    
     def __init__(
         self,
         email: str,
@@ -37,44 +47,7 @@ class User:
         self.is_active = is_active
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
-    
-    def to_dict(self):
-        """Convert user to dictionary for MongoDB"""
-        return {
-            "_id": self._id,
-            "email": self.email,
-            "password_hash": self.password_hash,
-            "full_name": self.full_name,
-            "role": self.role,
-            "phone": self.phone,
-            "company": self.company,
-            "street_address": self.street_address,
-            "city": self.city,
-            "state": self.state,
-            "postal_code": self.postal_code,
-            "country": self.country,
-            "is_active": self.is_active,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at
-        }
-    
-    @staticmethod
-    def from_dict(data: dict):
-        """Create user from dictionary (MongoDB document)"""
-        return User(
-            email=data.get("email"),
-            password_hash=data.get("password_hash"),
-            full_name=data.get("full_name"),
-            role=data.get("role", "consumer"),
-            phone=data.get("phone"),
-            company=data.get("company"),
-            street_address=data.get("street_address"),
-            city=data.get("city"),
-            state=data.get("state"),
-            postal_code=data.get("postal_code"),
-            country=data.get("country"),
-            is_active=data.get("is_active", True),
-            _id=data.get("_id"),
-            created_at=data.get("created_at"),
-            updated_at=data.get("updated_at")
-        )
+
+
+# Email is the login key and must be unique
+register_index("users", [("email", 1)], unique=True)
@@ -0,0 +1,12 @@
+from .base import BaseRepository
+from .users import UserRepository
+from .fault_requests import FaultRequestRepository
+from .messages import MessageRepository
+from .locations import LocationRepository
+from .stats import FaultStatsRepository
+from .leases import LeaseRepository
+
+__all__ = [
+    "BaseRepository", "UserRepository", "FaultRequestRepository",
+    "MessageRepository", "LocationRepository", "FaultStatsRepository", "LeaseRepository"
+]
@@ -0,0 +1,38 @@
+from typing import Optional
+from pymongo import ReturnDocument
+
+
+class BaseRepository:
+    """
+    Data access for one MongoDB collection
+    
+    Write helpers hand back the stored document from the write itself, so
+    handlers never need a second round trip to read what they just wrote.
+    """
+    
+    collection_name: str = None
+    
+    def __init__(self, db, collection_name: Optional[str] = None):
+        self.collection = db[collection_name or self.collection_name]
+    
+    async def insert(self, document: dict) -> dict:
+        """Insert a document and return it as stored"""
+        result = await self.collection.insert_one(document)
+        document["_id"] = result.inserted_id
+        return document
+    
+    async def update_and_return(
+        self,
+        query: dict,
+        update: dict,
+        upsert: bool = False,
+        projection: Optional[dict] = None
+    ) -> Optional[dict]:
+        """Apply an update and return the document after it, or None if nothing matched"""
+        return await self.collection.find_one_and_update(
+            query,
+            update,
+            projection=projection,
+            upsert=upsert,
+            return_document=ReturnDocument.AFTER
+        )
@@ -0,0 +1,281 @@
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from models.geo import geo_point
+from utils.pagination import paginate
+from .base import BaseRepository
+
+# Full documents without the fields only the database uses
+FULL_PROJECTION = {"geo": 0, "quadkey": 0, "priority_rank": 0}
+
+# Only what list views render
+SUMMARY_PROJECTION = {
+    "consumer_id": 1,
+    "title": 1,
+    "location": 1,
+    "status": 1,
+    "priority": 1,
+    "assigned_to": 1,
+    "parent_id": 1,
+    "duplicate_count": 1,
+    "created_at": 1,
+    "updated_at": 1
+}
+
+# Only what access checks need
+PARTICIPANTS_PROJECTION = {"consumer_id": 1, "assigned_to": 1}
+
+# What the dashboard counters need to account for a status or assignment change
+TRANSITION_PROJECTION = {
+    "status": 1,
+    "priority": 1,
+    "assigned_to": 1,
+    "assigned_at": 1,
+    "version": 1,
+    "created_at": 1,
+    "latitude": 1,
+    "longitude": 1
+}
+
+NEWEST_FIRST = [("created_at", -1), ("_id", -1)]
+QUEUE_ORDER = [("priority_rank", -1), ("created_at", -1), ("_id", -1)]
+OLDEST_FIRST = [("created_at", 1), ("_id", 1)]
+
+
+class FaultRequestRepository(BaseRepository):
+    """Data access for the `fault_requests` collection"""
+    
+    collection_name = "fault_requests"
+    
+    async def get(self, request_id: str, consumer_id: Optional[str] = None) -> Optional[dict]:
+        """Get a fault request, optionally only if it belongs to `consumer_id`"""
+        query = {"_id": ObjectId(request_id)}
+        if consumer_id is not None:
+            query["consumer_id"] = consumer_id
+        return await self.collection.find_one(query, FULL_PROJECTION)
+    
+    async def get_participants(self, request_id: str) -> Optional[dict]:
+        """Get just the consumer and assigned electrician of a fault request"""
+        return await self.collection.find_one({"_id": ObjectId(request_id)}, PARTICIPANTS_PROJECTION)
+    
+    async def _page(self, query: dict, sort: list, limit: int, cursor: Optional[str], count: str, summary: bool):
+        projection = dict(SUMMARY_PROJECTION) if summary else dict(FULL_PROJECTION)
+        if summary:
+            # Sort keys must be read back to build the next cursor
+            projection.update({field: 1 for field, _ in sort})
+        else:
+            for field, _ in sort:
+                projection.pop(field, None)
+        return await paginate(
+            self.collection, query, sort, limit,
+            cursor=cursor, count=count, projection=projection
+        )
+    
+    async def page_for_consumer(
+        self, consumer_id: str, status: Optional[str], limit: int,
+        cursor: Optional[str] = None, count: str = "none", summary: bool = False
+    ):
+        """One page of a consumer's requests, newest first"""
+        query = {"consumer_id": consumer_id}
+        if status:
+            query["status"] = status
+        return await self._page(query, NEWEST_FIRST, limit, cursor, count, summary)
+    
+    async def page_for_electrician(
+        self, electrician_id: str, status: Optional[str], limit: int,
+        cursor: Optional[str] = None, count: str = "none", summary: bool = False
+    ):
+        """One page of the requests assigned to an electrician, newest first"""
+        query = {"assigned_to": electrician_id}
+        if status:
+            query["status"] = status
+        return await self._page(query, NEWEST_FIRST, limit, cursor, count, summary)
+    
+    async def page_queue(
+        self, status: Optional[str], limit: int,
+        cursor: Optional[str] = None, count: str = "none", summary: bool = False
+    ):
+        """One page of the dispatch queue, highest priority first"""
+        query = {}
+        if status:
+            query["status"] = status
+        return await self._page(query, QUEUE_ORDER, limit, cursor, count, summary)
+    
+    async def dispatch_candidates(self, limit: int) -> list:
+        """Open, unassigned requests with coordinates, in queue order"""
+        return await self.collection.find(
+            {"status": "open", "assigned_to": None, "geo": {"$ne": None}},
+            {"latitude": 1, "longitude": 1, "priority_rank": 1, "created_at": 1, "version": 1}
+        ).sort(QUEUE_ORDER).limit(limit).to_list(limit)
+    
+    async def tile_clusters(self, quadkey: str, cluster_length: int, status: Optional[str] = None) -> list:
+        """
+        Counts and coordinate sums of the requests in a map tile, grouped by cluster, status and priority
+        
+        `quadkey` is the tile's quadkey; clusters are the quadkey prefixes of
+        `cluster_length` digits. The range match and the grouped fields are
+        all in the tile index, so the aggregation never fetches documents.
+        """
+        query = {"quadkey": {"$gte": quadkey, "$lt": quadkey + "4"}}
+        if status:
+            query["status"] = status
+        return await self.collection.aggregate([
+            {"$match": query},
+            {"$group": {
+                "_id": {
+                    "cluster": {"$substrBytes": ["$quadkey", 0, cluster_length]},
+                    "status": "$status",
+                    "priority": "$priority"
+                },
+                "count": {"$sum": 1},
+                "latitude": {"$sum": "$latitude"},
+                "longitude": {"$sum": "$longitude"}
+            }}
+        ]).to_list(None)
+    
+    async def active_assignment_counts(self, electrician_ids: list, statuses) -> dict:
+        """Number of requests in `statuses` assigned to each electrician"""
+        if not electrician_ids:
+            return {}
+        rows = await self.collection.aggregate([
+            {"$match": {"assigned_to": {"$in": electrician_ids}, "status": {"$in": list(statuses)}}},
+            {"$group": {"_id": "$assigned_to", "count": {"$sum": 1}}}
+        ]).to_list(None)
+        return {row["_id"]: row["count"] for row in rows}
+    
+    def export_cursor(
+        self, status: Optional[str], start: Optional[datetime], end: Optional[datetime],
+        batch_size: int
+    ):
+        """
+        Cursor over every matching request, oldest first, fetched `batch_size` at a time
+        
+        `start` is inclusive and `end` exclusive. The caller iterates the cursor
+        and must close it if it stops early.
+        """
+        query = {}
+        if status:
+            query["status"] = status
+        if start or end:
+            query["created_at"] = {}
+            if start:
+                query["created_at"]["$gte"] = start
+            if end:
+                query["created_at"]["$lt"] = end
+        return self.collection.find(query, FULL_PROJECTION).sort(OLDEST_FIRST).batch_size(batch_size)
+    
+    async def nearby(
+        self, latitude: float, longitude: float, radius_km: float,
+        status: Optional[str], limit: int
+    ) -> list:
+        """Requests within `radius_km` of a point, closest first, with `distance` in metres"""
+        query = {}
+        if status:
+            query["status"] = status
+        return await self.collection.aggregate([
+            {"$geoNear": {
+                "near": geo_point(latitude, longitude),
+                "key": "geo",
+                "distanceField": "distance",
+                "maxDistance": radius_km * 1000,
+                "query": query,
+                "spherical": True
+            }},
+            {"$limit": limit},
+            {"$project": FULL_PROJECTION}
+        ]).to_list(limit)
+    
+    async def duplicate_candidates(
+        self, latitude: float, longitude: float, radius_m: float, since: datetime, limit: int
+    ) -> list:
+        """Open requests created since `since` within `radius_m` of a point, closest first"""
+        return await self.collection.aggregate([
+            {"$geoNear": {
+                "near": geo_point(latitude, longitude),
+                "key": "geo",
+                "distanceField": "distance",
+                "maxDistance": radius_m,
+                "query": {"status": "open", "created_at": {"$gte": since}},
+                "spherical": True
+            }},
+            {"$limit": limit},
+            {"$project": {
+                "title": 1, "description": 1, "latitude": 1, "longitude": 1,
+                "parent_id": 1, "created_at": 1, "distance": 1
+            }}
+        ]).to_list(limit)
+    
+    async def record_duplicate(self, parent_id: str):
+        """Count one more report linked to an incident"""
+        await self.collection.update_one({"_id": ObjectId(parent_id)}, {"$inc": {"duplicate_count": 1}})
+    
+    @staticmethod
+    def _transition_update(fields: dict) -> list:
+        """
+        Pipeline update that sets `fields`, bumps `version` and stamps the first assignment
+        
+        Values are wrapped in `$literal` so client-supplied strings are never
+        read as field paths.
+        """
+        stage = {field: {"$literal": value} for field, value in fields.items()}
+        stage["version"] = {"$add": [{"$ifNull": ["$version", 0]}, 1]}
+        if fields.get("assigned_to"):
+            stage["assigned_at"] = {"$ifNull": ["$assigned_at", {"$literal": fields["updated_at"]}]}
+        return [{"$set": stage}]
+    
+    async def get_state(self, request_id: str) -> Optional[dict]:
+        """Get the current status/assignment fields and version of a request"""
+        return await self.collection.find_one({"_id": ObjectId(request_id)}, TRANSITION_PROJECTION)
+    
+    async def cancel(self, request_id: str, consumer_id: str) -> Optional[dict]:
+        """
+        Close a consumer's own request
+        
+        Returns the status/assignment fields from before the change, or None if
+        the request was not found.
+        """
+        return await self.collection.find_one_and_update(
+            {"_id": ObjectId(request_id), "consumer_id": consumer_id},
+            self._transition_update({"status": "closed", "updated_at": datetime.utcnow()}),
+            projection=TRANSITION_PROJECTION,
+            return_document=ReturnDocument.BEFORE
+        )
+    
+    async def update_status(
+        self, request_id: str, fields: dict, expected: Optional[dict] = None
+    ) -> Optional[dict]:
+        """
+        Set status/assignment fields on a request if it still matches `expected`
+        
+        `expected` holds conditions on the current document (status,
+        assigned_to, version). Returns the status/assignment fields from before
+        the change, or None if the request was not found or no longer matches.
+        """
+        query = {"_id": ObjectId(request_id)}
+        query.update(expected or {})
+        return await self.collection.find_one_and_update(
+            query,
+            self._transition_update(fields),
+            projection=TRANSITION_PROJECTION,
+            return_document=ReturnDocument.BEFORE
+        )
+    
+    async def claim_next(self, electrician_id: str) -> Optional[dict]:
+        """
+        Atomically assign the highest-priority open, unassigned request to an electrician
+        
+        Concurrent claims each get a different request. Returns the claimed
+        request as it was before the claim, or None if the queue is empty.
+        """
+        return await self.collection.find_one_and_update(
+            {"status": "open", "assigned_to": None},
+            self._transition_update({
+                "status": "assigned",
+                "assigned_to": electrician_id,
+                "updated_at": datetime.utcnow()
+            }),
+            projection=FULL_PROJECTION,
+            sort=QUEUE_ORDER,
+            return_document=ReturnDocument.BEFORE
+        )
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from .base import BaseRepository
+
+
+class LeaseRepository(BaseRepository):
+    """
+    Named, expiring leases for work that only one worker may do at a time
+
+    A lease is one document keyed by name. Its holder renews it before it
+    expires; once it has expired any worker can take it over.
+    """
+
+    collection_name = "leases"
+
+    async def acquire(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        """Take or renew the lease for `ttl_seconds`; returns False while another owner holds it"""
+        now = datetime.utcnow()
+        try:
+            lease = await self.collection.find_one_and_update(
+                {"_id": name, "$or": [{"owner": owner}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+                projection={"owner": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Held by someone else: the upsert tried to insert a second document with this name
+            return False
+        return lease is not None and lease["owner"] == owner
+
+    async def release(self, name: str, owner: str):
+        """Give the lease up early, if `owner` still holds it"""
+        await self.collection.delete_one({"_id": name, "owner": owner})
@@ -0,0 +1,220 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+from pymongo import UpdateOne
+from config import settings
+from models.location import Location, LOCATION_HISTORY_COLLECTION
+from .base import BaseRepository
+
+LOCATION_PROJECTION = {"geo": 0}
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _newer_fix_update(location: Location) -> list:
+    """Pipeline update that sets the fix's fields and `written_at` unless the stored row is newer"""
+    is_newer = {"$lte": [{"$ifNull": ["$updated_at", datetime.min]}, location.updated_at]}
+    stage = {
+        field: {"$cond": [is_newer, {"$literal": value}, f"${field}"]}
+        for field, value in location.to_update_dict().items()
+    }
+    stage["written_at"] = {"$cond": [is_newer, "$$NOW", "$written_at"]}
+    return [{"$set": stage}]
+
+
+class LocationRepository(BaseRepository):
+    """
+    Data access for `consumer_locations` and its `location_history` buckets
+    
+    Every write to a current location stamps `written_at` with the server's
+    clock; `updated_at` is the time of the fix, which may come from the client.
+    """
+    
+    collection_name = "consumer_locations"
+    
+    def __init__(self, db):
+        super().__init__(db)
+        self.history = db[LOCATION_HISTORY_COLLECTION]
+    
+    async def get_current(self, user_id: str) -> Optional[dict]:
+        """Get a user's current location"""
+        return await self.collection.find_one({"user_id": user_id}, LOCATION_PROJECTION)
+    
+    async def save_current(self, location: Location) -> dict:
+        """Upsert a user's current location and return it"""
+        return await self.update_and_return(
+            {"user_id": location.user_id},
+            {"$set": location.to_update_dict(), "$currentDate": {"written_at": True}},
+            upsert=True,
+            projection=LOCATION_PROJECTION
+        )
+    
+    async def save_batch(self, locations: list) -> dict:
+        """
+        Write a batch of fixes with one unordered `bulk_write` per collection
+        
+        Fixes are coalesced per user: only the newest becomes the current
+        location, and each user's fixes within an hour are appended to their
+        history bucket in a single `$push`. A current location is only
+        replaced by a newer fix, so a batch flushed late never undoes a
+        later write such as stopping sharing. Returns the operation counts.
+        """
+        latest = {}
+        buckets = {}
+        for location in sorted(locations, key=lambda location: location.updated_at):
+            latest[location.user_id] = location
+            bucket_start = location.updated_at.replace(minute=0, second=0, microsecond=0)
+            buckets.setdefault((location.user_id, bucket_start), []).append(location)
+        
+        current_ops = [
+            UpdateOne(
+                {"user_id": user_id},
+                _newer_fix_update(location),
+                upsert=True
+            )
+            for user_id, location in latest.items()
+        ]
+        
+        max_fixes = settings.LOCATION_BUCKET_MAX_FIXES
+        history_ops = [
+            UpdateOne(*Location.history_bucket_batch(fixes[start:start + max_fixes]), upsert=True)
+            for fixes in buckets.values()
+            for start in range(0, len(fixes), max_fixes)
+        ]
+        
+        await asyncio.gather(
+            self.collection.bulk_write(current_ops, ordered=False),
+            self.history.bulk_write(history_ops, ordered=False)
+        )
+        return {"current": len(current_ops), "history": len(history_ops)}
+    
+    async def history_timestamps(self, user_id: str, timestamps: set) -> set:
+        """
+        Which of `timestamps` the user already has stored fixes for
+        
+        Only the hourly buckets the timestamps fall in are read, so an
+        upload spanning days does not load the whole history in between.
+        """
+        bucket_starts = sorted({timestamp.replace(minute=0, second=0, microsecond=0) for timestamp in timestamps})
+        buckets = await self.history.find(
+            {"user_id": user_id, "bucket_start": {"$in": bucket_starts}},
+            {"_id": 0, "fixes.t": 1}
+        ).to_list(None)
+        return {fix["t"] for bucket in buckets for fix in bucket.get("fixes", [])}.intersection(timestamps)
+    
+    async def set_sharing(self, user_id: str, is_sharing: bool) -> bool:
+        """Turn sharing on or off; returns False if the user has no location yet"""
+        result = await self.collection.update_one(
+            {"user_id": user_id},
+            {
+                "$set": {"is_sharing": is_sharing, "updated_at": datetime.utcnow()},
+                "$currentDate": {"written_at": True}
+            }
+        )
+        return result.matched_count > 0
+    
+    async def append_history(self, location: Location):
+        """Append a fix to the user's hourly history bucket"""
+        bucket_filter, bucket_update = location.history_bucket_update()
+        await self.history.update_one(bucket_filter, bucket_update, upsert=True)
+    
+    async def history_range(
+        self, user_id: str, start: datetime, end: datetime,
+        resolution_seconds: int, limit: int
+    ):
+        """
+        The newest `limit` fixes between `start` and `end`, oldest first
+        
+        With `resolution_seconds` only the last fix of each window is kept.
+        Returns `(fixes, has_more)`, where `has_more` reports older fixes in
+        the range that did not fit.
+        """
+        pipeline = [
+            # Buckets are hourly, so widen the bucket match to the start of the hour
+            {"$match": {
+                "user_id": user_id,
+                "bucket_start": {
+                    "$gte": start.replace(minute=0, second=0, microsecond=0),
+                    "$lte": end
+                }
+            }},
+            {"$project": {"fixes": 1}},
+            {"$unwind": "$fixes"},
+            {"$match": {"fixes.t": {"$gte": start, "$lte": end}}},
+            {"$sort": {"fixes.t": 1}}
+        ]
+        if resolution_seconds:
+            pipeline += [
+                {"$group": {
+                    "_id": {"$floor": {"$divide": [
+                        {"$subtract": ["$fixes.t", EPOCH]}, resolution_seconds * 1000
+                    ]}},
+                    "fix": {"$last": "$fixes"}
+                }},
+                {"$replaceRoot": {"newRoot": "$fix"}}
+            ]
+        else:
+            pipeline.append({"$replaceRoot": {"newRoot": "$fixes"}})
+        # Newest first, reading one extra fix to detect more
+        pipeline += [{"$sort": {"t": -1}}, {"$limit": limit + 1}]
+        fixes = await self.history.aggregate(pipeline).to_list(limit + 1)
+        
+        has_more = len(fixes) > limit
+        fixes = fixes[:limit]
+        fixes.reverse()
+        return fixes, has_more
+    
+    async def nearby_electricians(self, near: dict, radius_km: float, limit: int) -> list:
+        """
+        Active electricians sharing their location within `radius_km`, closest first
+        
+        Users are joined per location so the limit applies after the role filter.
+        """
+        return await self.collection.aggregate([
+            {"$geoNear": {
+                "near": near,
+                "key": "geo",
+                "distanceField": "distance",
+                "maxDistance": radius_km * 1000,
+                "query": {"is_sharing": True},
+                "spherical": True
+            }},
+            {"$lookup": {
+                "from": "users",
+                "let": {"user_id": {"$convert": {
+                    "input": "$user_id", "to": "objectId", "onError": None
+                }}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$user_id"]}}},
+                    {"$project": {"full_name": 1, "role": 1, "is_active": 1}}
+                ],
+                "as": "user"
+            }},
+            {"$unwind": "$user"},
+            {"$match": {"user.role": "electrician", "user.is_active": {"$ne": False}}},
+            {"$limit": limit},
+            {"$project": {
+                "user_id": 1, "latitude": 1, "longitude": 1, "updated_at": 1,
+                "distance": 1, "user.full_name": 1
+            }}
+        ]).to_list(limit)
+    
+    async def sharing_electricians(self, since: datetime) -> list:
+        """Active electricians whose shared location was updated since `since`"""
+        return await self.collection.aggregate([
+            {"$match": {"is_sharing": True, "updated_at": {"$gte": since}, "geo": {"$ne": None}}},
+            {"$lookup": {
+                "from": "users",
+                "let": {"user_id": {"$convert": {
+                    "input": "$user_id", "to": "objectId", "onError": None
+                }}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$user_id"]}}},
+                    {"$project": {"role": 1, "is_active": 1}}
+                ],
+                "as": "user"
+            }},
+            {"$unwind": "$user"},
+            {"$match": {"user.role": "electrician", "user.is_active": {"$ne": False}}},
+            {"$project": {"_id": 0, "user_id": 1, "latitude": 1, "longitude": 1}}
+        ]).to_list(None)
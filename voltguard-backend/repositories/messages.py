@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import ObjectId
+from .base import BaseRepository
+
+MESSAGE_PROJECTION = {
+    "request_id": 1,
+    "sender_id": 1,
+    "sender_type": 1,
+    "content": 1,
+    "created_at": 1
+}
+
+# ObjectIds made by different workers in the same second (or on skewed clocks) are not in
+# insert order, and a message can commit after a later one; forward reads look back this far
+CURSOR_OVERLAP_SECONDS = 2
+
+
+class MessageRepository(BaseRepository):
+    """Data access for the `messages` collection"""
+    
+    collection_name = "messages"
+    
+    async def page(
+        self,
+        request_id: str,
+        limit: int,
+        after_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        before_id: Optional[str] = None,
+        overlap: bool = False
+    ):
+        """
+        One page of a request's messages, oldest first
+        
+        Pages forward from `after_id` / `since`, backward from `before_id`, or
+        returns the latest page without a cursor. ObjectIds sort by creation
+        time, so every variant runs on the (request_id, _id) index.
+        Returns `(messages, has_more)`.
+        
+        With `overlap`, a page after `after_id` also starts with up to `limit`
+        messages from the CURSOR_OVERLAP_SECONDS before it, which the caller
+        may already have: ObjectId order is only approximately insert order,
+        so a message that sorts before `after_id` can still be new. Callers
+        drop ids they have seen.
+        """
+        query = {"request_id": request_id}
+        if after_id:
+            query["_id"] = {"$gt": ObjectId(after_id)}
+            forward = True
+        elif since:
+            query["_id"] = {"$gte": ObjectId.from_datetime(since)}
+            forward = True
+        elif before_id:
+            query["_id"] = {"$lt": ObjectId(before_id)}
+            forward = False
+        else:
+            forward = False
+        
+        # Read one extra message to detect more
+        messages = await self.collection.find(query, MESSAGE_PROJECTION).sort(
+            "_id", 1 if forward else -1
+        ).limit(limit + 1).to_list(limit + 1)
+        
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if not forward:
+            messages.reverse()
+        elif after_id and overlap:
+            after = ObjectId(after_id)
+            # The messages closest to the cursor are the likeliest to have been missed
+            earlier = await self.collection.find({
+                "request_id": request_id,
+                "_id": {
+                    "$gte": ObjectId.from_datetime(after.generation_time - timedelta(seconds=CURSOR_OVERLAP_SECONDS)),
+                    "$lt": after
+                }
+            }, MESSAGE_PROJECTION).sort("_id", -1).limit(limit).to_list(limit)
+            earlier.reverse()
+            messages = earlier + messages
+        return messages, has_more
@@ -0,0 +1,153 @@
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from pymongo.errors import PyMongoError
+from models.fault_request import STATUSES, PRIORITY_RANKS
+from .base import BaseRepository
+
+# The single counters document for the fault request dashboard
+FAULT_STATS_ID = "fault_requests"
+
+# Counter bucket for labels outside the known sets (also keeps field paths safe)
+OTHER = "other"
+
+
+def _status_key(status: Optional[str]) -> str:
+    return status if status in STATUSES else OTHER
+
+
+def _priority_key(priority: Optional[str]) -> str:
+    return priority if priority in PRIORITY_RANKS else OTHER
+
+
+def _electrician_key(electrician_id: Optional[str]) -> Optional[str]:
+    if not electrician_id:
+        return None
+    return electrician_id if electrician_id.isalnum() else OTHER
+
+
+class FaultStatsRepository(BaseRepository):
+    """
+    Materialized dashboard counters for fault requests
+
+    One document holds per-status, per-priority and per-electrician counts
+    plus the running sum behind mean time-to-assign. Writers apply `$inc`
+    deltas as requests change; `reconcile` rebuilds the document from the
+    fault requests to correct any drift.
+    """
+
+    collection_name = "stats"
+
+    async def get(self) -> Optional[dict]:
+        """Get the counters document"""
+        return await self.collection.find_one({"_id": FAULT_STATS_ID})
+
+    async def _apply(self, deltas: Counter):
+        deltas = {path: value for path, value in deltas.items() if value}
+        if not deltas:
+            return
+        try:
+            await self.collection.update_one(
+                {"_id": FAULT_STATS_ID},
+                {"$inc": deltas, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            # The request itself was written; the next reconcile corrects the counters
+            print(f"⚠️ Fault request stats update failed: {e}")
+
+    async def record_created(self, request: dict):
+        """Count a newly created fault request"""
+        deltas = Counter()
+        deltas["total"] += 1
+        deltas[f"by_status.{_status_key(request.get('status'))}"] += 1
+        deltas[f"by_priority.{_priority_key(request.get('priority'))}"] += 1
+        electrician = _electrician_key(request.get("assigned_to"))
+        if electrician:
+            deltas[f"by_electrician.{electrician}.{_status_key(request.get('status'))}"] += 1
+        await self._apply(deltas)
+
+    async def record_transition(self, previous: dict, fields: dict):
+        """
+        Move a fault request between counters
+
+        `previous` holds the status/assignment fields from before the update
+        and `fields` the values that were set. An assignment is counted only
+        when `fields` sets `assigned_to` on a request without `assigned_at`,
+        the same rule that stamps `assigned_at`, so each request is counted
+        once and the counters agree with `reconcile`.
+        """
+        old_status = _status_key(previous.get("status"))
+        new_status = _status_key(fields.get("status", previous.get("status")))
+        old_electrician = _electrician_key(previous.get("assigned_to"))
+        new_electrician = _electrician_key(fields.get("assigned_to") or previous.get("assigned_to"))
+
+        deltas = Counter()
+        deltas[f"by_status.{old_status}"] -= 1
+        deltas[f"by_status.{new_status}"] += 1
+        if old_electrician:
+            deltas[f"by_electrician.{old_electrician}.{old_status}"] -= 1
+        if new_electrician:
+            deltas[f"by_electrician.{new_electrician}.{new_status}"] += 1
+
+        if fields.get("assigned_to") and not previous.get("assigned_at") and previous.get("created_at"):
+            assigned_at = fields.get("updated_at") or datetime.utcnow()
+            deltas["assignments"] += 1
+            deltas["time_to_assign_seconds"] += (assigned_at - previous["created_at"]).total_seconds()
+
+        await self._apply(deltas)
+
+    async def reconcile(self, requests_collection) -> dict:
+        """Recompute every counter from `requests_collection` and replace the document"""
+        result = await requests_collection.aggregate([
+            {"$facet": {
+                "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                "by_priority": [{"$group": {"_id": "$priority", "count": {"$sum": 1}}}],
+                "by_electrician": [
+                    {"$match": {"assigned_to": {"$nin": [None, ""]}}},
+                    {"$group": {
+                        "_id": {"electrician": "$assigned_to", "status": "$status"},
+                        "count": {"$sum": 1}
+                    }}
+                ],
+                "time_to_assign": [
+                    {"$match": {"assigned_at": {"$type": "date"}}},
+                    {"$group": {
+                        "_id": None,
+                        "count": {"$sum": 1},
+                        "millis": {"$sum": {"$subtract": ["$assigned_at", "$created_at"]}}
+                    }}
+                ]
+            }}
+        ]).to_list(1)
+        facets = result[0] if result else {}
+
+        by_status = Counter()
+        for row in facets.get("by_status", []):
+            by_status[_status_key(row["_id"])] += row["count"]
+
+        by_priority = Counter()
+        for row in facets.get("by_priority", []):
+            by_priority[_priority_key(row["_id"])] += row["count"]
+
+        by_electrician = {}
+        for row in facets.get("by_electrician", []):
+            electrician = _electrician_key(row["_id"]["electrician"])
+            counts = by_electrician.setdefault(electrician, Counter())
+            counts[_status_key(row["_id"].get("status"))] += row["count"]
+
+        time_to_assign = (facets.get("time_to_assign") or [{}])[0]
+        now = datetime.utcnow()
+        document = {
+            "_id": FAULT_STATS_ID,
+            "total": sum(by_status.values()),
+            "by_status": dict(by_status),
+            "by_priority": dict(by_priority),
+            "by_electrician": {key: dict(counts) for key, counts in by_electrician.items()},
+            "assignments": time_to_assign.get("count", 0),
+            "time_to_assign_seconds": time_to_assign.get("millis", 0) / 1000,
+            "reconciled_at": now,
+            "updated_at": now
+        }
+        await self.collection.replace_one({"_id": FAULT_STATS_ID}, document, upsert=True)
+        return document
@@ -0,0 +1,63 @@
+from typing import Iterable, Optional
+from bson import ObjectId
+from .base import BaseRepository
+
+# Everything a response may show; never read the password hash unless it is needed
+PUBLIC_PROJECTION = {"password_hash": 0}
+
+# What `/me` and role changes return; only profile updates echo the address back
+PROFILE_PROJECTION = {
+    "email": 1,
+    "full_name": 1,
+    "role": 1,
+    "phone": 1,
+    "company": 1,
+    "is_active": 1,
+    "created_at": 1
+}
+
+
+class UserRepository(BaseRepository):
+    """Data access for the `users` collection"""
+    
+    collection_name = "users"
+    
+    async def get_by_id(self, user_id: ObjectId, projection: Optional[dict] = PUBLIC_PROJECTION) -> Optional[dict]:
+        """Get a user by ID (without the password hash by default)"""
+        return await self.collection.find_one({"_id": user_id}, projection)
+    
+    async def get_for_login(self, email: str) -> Optional[dict]:
+        """Get a user by email including the password hash"""
+        return await self.collection.find_one({"email": email})
+    
+    async def email_taken(self, email: str, exclude_id: Optional[ObjectId] = None) -> bool:
+        """Check whether an email belongs to a user (other than `exclude_id`)"""
+        query = {"email": email}
+        if exclude_id is not None:
+            query["_id"] = {"$ne": exclude_id}
+        return await self.collection.find_one(query, {"_id": 1}) is not None
+    
+    async def update_fields(
+        self, user_id: ObjectId, fields: dict, projection: Optional[dict] = PUBLIC_PROJECTION
+    ) -> Optional[dict]:
+        """Set fields on a user and return the updated user (without the password hash by default)"""
+        return await self.update_and_return(
+            {"_id": user_id},
+            {"$set": fields},
+            projection=projection
+        )
+    
+    async def set_fields(self, user_id: ObjectId, fields: dict) -> bool:
+        """Set fields on a user without reading it back; returns False if it was not found"""
+        result = await self.collection.update_one({"_id": user_id}, {"$set": fields})
+        return result.matched_count > 0
+    
+    async def get_names(self, user_ids: Iterable[ObjectId]) -> dict:
+        """Map user IDs (as strings) to full names with a single `$in` query"""
+        names = {}
+        async for user in self.collection.find(
+            {"_id": {"$in": list(user_ids)}},
+            {"full_name": 1}
+        ):
+            names[str(user["_id"])] = user.get("full_name", "Unknown")
+        return names
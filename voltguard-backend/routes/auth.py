@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException, status, Request, Depends
 from typing import Optional
 from datetime import datetime
+from config import settings
 from database import get_db
 from models import User
 from schemas import SignUpRequest, SignInRequest, TokenResponse, MessageResponse, UserResponse
-from utils import hash_password, verify_password, create_access_token, decode_access_token
-from utils.auth import get_current_user as get_current_user_dep
+from utils import create_access_token
+from utils.auth import get_current_user as get_current_user_dep, get_token_principal, principal_cache
+from utils.auth import password_hasher, password_needs_rehash
+from repositories import UserRepository
+from repositories.users import PROFILE_PROJECTION
+from utils.response_cache import FAULT_REQUESTS_TAG, response_cache, user_tag
 from bson import ObjectId
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -22,19 +27,17 @@ async def signup(req: SignUpRequest):
     - **phone**: Optional phone number
     - **company**: Optional company name
     """
-    db = get_db()
-    users_collection = db["users"]
+    users = UserRepository(get_db())
     
     # Check if user already exists (async)
-    existing_user = await users_collection.find_one({"email": req.email})
-    if existing_user:
+    if await users.email_taken(req.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Hash password
-    password_hash = hash_password(req.password)
+    # Hash password on the worker pool
+    password_hash = await password_hasher.hash(req.password)
     
     # Create new user
     user = User(
@@ -47,8 +50,7 @@ async def signup(req: SignUpRequest):
     )
     
     # Insert user into database (async)
-    result = await users_collection.insert_one(user.to_dict())
-    user._id = result.inserted_id
+    await users.insert(user.to_dict())
     
     # Create JWT token
     access_token = create_access_token(str(user._id), user.email, user.role)
@@ -75,19 +77,18 @@ async def signin(req: SignInRequest):
     - **email**: User email
     - **password**: User password
     """
-    db = get_db()
-    users_collection = db["users"]
+    users = UserRepository(get_db())
     
-    # Find user by email (async)
-    user_doc = await users_collection.find_one({"email": req.email})
+    # Find user by email, including the password hash (async)
+    user_doc = await users.get_for_login(req.email)
     if not user_doc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    # Verify password
-    if not verify_password(req.password, user_doc["password_hash"]):
+    # Verify password on the worker pool
+    if not await password_hasher.verify(req.password, user_doc["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -106,11 +107,11 @@ async def signin(req: SignInRequest):
     # Create JWT token
     access_token = create_access_token(str(user._id), user.email, user.role)
     
-    # Update last login (async)
-    await users_collection.update_one(
-        {"_id": user._id},
-        {"$set": {"updated_at": datetime.utcnow()}}
-    )
+    # Update last login, upgrading the hash if the cost factor changed (async)
+    update_data = {"updated_at": datetime.utcnow()}
+    if password_needs_rehash(user_doc["password_hash"]):
+        update_data["password_hash"] = await password_hasher.hash(req.password)
+    await users.set_fields(user._id, update_data)
     
     # Prepare response
     user_response = UserResponse(
@@ -132,6 +133,8 @@ async def get_me(request: Request):
     Get current user profile
     
     - **authorization**: Bearer token in Authorization header
+    
+    Responses are cached per user and carry an ETag for `If-None-Match`.
     """
     try:
         # Get authorization header from request
@@ -153,38 +156,36 @@ async def get_me(request: Request):
         token = authorization.replace("Bearer ", "")
         print(f"Token extracted: {token[:20]}...")
         
-        payload = decode_access_token(token)
-        print(f"Decoded payload: {payload}")
+        principal = await get_token_principal(token, get_db())
+        print(f"Token principal: {principal}")
         
-        if not payload:
+        if not principal:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired token"
             )
         
-        db = get_db()
-        users_collection = db["users"]
-        
-        user_doc = await users_collection.find_one({"_id": ObjectId(payload["user_id"])})
-        
-        if not user_doc:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        user = User.from_dict(user_doc)
-        print(f"User found: {user.email}")
-        
-        return UserResponse(
-            _id=str(user._id),
-            email=user.email,
-            full_name=user.full_name,
-            role=user.role,
-            phone=user.phone,
-            company=user.company,
-            is_active=user.is_active,
-            created_at=user.created_at
+        async def build():
+            user_doc = await UserRepository(get_db()).get_by_id(ObjectId(principal["_id"]), PROFILE_PROJECTION)
+            
+            if not user_doc:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+            
+            print(f"User found: {user_doc['email']}")
+            
+            return UserResponse.from_document(user_doc)
+        
+        return await response_cache.respond(
+            request,
+            "auth.me",
+            principal["_id"],
+            [user_tag(principal["_id"])],
+            settings.CACHE_TTL_ME_SECONDS,
+            UserResponse,
+            build
         )
     except HTTPException:
         raise
@@ -208,36 +209,27 @@ async def update_user_role(
     try:
         new_role = "electrician"
         
-        users_collection = db["users"]
-        
-        # Update user's role (async)
-        result = await users_collection.update_one(
-            {"_id": ObjectId(current_user.get("_id"))},
-            {"$set": {"role": new_role, "updated_at": datetime.utcnow()}}
+        # Update user's role and get the updated user back (async)
+        updated_user = await UserRepository(db).update_fields(
+            ObjectId(current_user.get("_id")),
+            {"role": new_role, "updated_at": datetime.utcnow()},
+            projection=PROFILE_PROJECTION
         )
         
-        if result.matched_count == 0:
+        if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        # Fetch updated user (async)
-        updated_user = await users_collection.find_one({"_id": ObjectId(current_user.get("_id"))})
+        # Cached principals still carry the old role
+        principal_cache.invalidate_user(current_user.get("_id"))
+        await response_cache.invalidate(user_tag(str(current_user.get("_id"))))
         
         # Create new token with updated role
         access_token = create_access_token(str(updated_user["_id"]), updated_user["email"], updated_user["role"])
         
-        user_response = UserResponse(
-            id=str(updated_user["_id"]),
-            email=updated_user["email"],
-            full_name=updated_user["full_name"],
-            role=updated_user["role"],
-            phone=updated_user.get("phone"),
-            company=updated_user.get("company"),
-            is_active=updated_user.get("is_active", True),
-            created_at=updated_user["created_at"]
-        )
+        user_response = UserResponse.from_document(updated_user)
         
         return TokenResponse(access_token=access_token, user=user_response)
     except HTTPException:
@@ -317,11 +309,10 @@ async def update_user_profile(
                 detail=f"Invalid user ID format: {str(e)}"
             )
         
-        db = get_db()
-        users_collection = db["users"]
+        users = UserRepository(get_db())
         
         # Verify user exists (async)
-        existing_user = await users_collection.find_one({"_id": user_object_id})
+        existing_user = await users.get_by_id(user_object_id, projection={"email": 1})
         if not existing_user:
             print(f"[ERROR] User not found with ID: {user_object_id}")
             raise HTTPException(
@@ -336,11 +327,7 @@ async def update_user_profile(
         
         if email is not None and email.strip():
             # Check if new email is already taken (async)
-            existing_email_user = await users_collection.find_one({
-                "email": email,
-                "_id": {"$ne": user_object_id}
-            })
-            if existing_email_user:
+            if await users.email_taken(email, exclude_id=user_object_id):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Email already in use"
@@ -373,16 +360,8 @@ async def update_user_profile(
         
         print(f"[DEBUG] Update data: {update_data}")
         
-        # Update user (async)
-        result = await users_collection.update_one(
-            {"_id": user_object_id},
-            {"$set": update_data}
-        )
-        
-        print(f"[DEBUG] Update result - Matched: {result.matched_count}, Modified: {result.modified_count}")
-        
-        # Fetch updated user (async)
-        updated_user = await users_collection.find_one({"_id": user_object_id})
+        # Update user and get the updated document back (async)
+        updated_user = await users.update_fields(user_object_id, update_data)
         
         if not updated_user:
             print(f"[ERROR] Failed to retrieve updated user after update")
@@ -393,21 +372,16 @@ async def update_user_profile(
         
         print(f"[DEBUG] Updated user: {updated_user.get('email')}, Address: {updated_user.get('street_address', 'N/A')}")
         
-        return UserResponse(
-            id=str(updated_user["_id"]),
-            email=updated_user["email"],
-            full_name=updated_user["full_name"],
-            role=updated_user["role"],
-            phone=updated_user.get("phone"),
-            company=updated_user.get("company"),
-            street_address=updated_user.get("street_address"),
-            city=updated_user.get("city"),
-            state=updated_user.get("state"),
-            postal_code=updated_user.get("postal_code"),
-            country=updated_user.get("country"),
-            is_active=updated_user.get("is_active", True),
-            created_at=updated_user["created_at"]
-        )
+        # Cached principals still carry the old email
+        if "email" in update_data:
+            principal_cache.invalidate_user(user_id_str)
+        # Fault request lists show electrician names, so a rename invalidates them too
+        if "full_name" in update_data:
+            await response_cache.invalidate(user_tag(str(user_id_str)), FAULT_REQUESTS_TAG)
+        else:
+            await response_cache.invalidate(user_tag(str(user_id_str)))
+        
+        return UserResponse.from_document(updated_user)
     except HTTPException:
         raise
     except Exception as e:
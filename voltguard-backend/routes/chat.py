@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
 from datetime import datetime
+from typing import Optional
 from bson import ObjectId
 from database import get_db
 from models.message import Message
+from models.base import response_row
 from schemas.message import SendMessageRequest, MessageResponse, MessagesListResponse
-from utils.auth import get_current_user
+from repositories import FaultRequestRepository, MessageRepository
+from utils.auth import get_current_user, get_token_principal
+from utils.chat_hub import chat_hub
+from utils.fast_json import list_response
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+logger = logging.getLogger(__name__)
+
 
 @router.post("/send", response_model=MessageResponse)
 async def send_message(
@@ -23,12 +32,8 @@ async def send_message(
         print(f"DEBUG: Current user: {current_user.get('_id')}, role: {current_user.get('role')}")
         
         # Verify that the request exists and user is part of it
-        fault_requests_collection = db["fault_requests"]
-        
         try:
-            request_doc = await fault_requests_collection.find_one(
-                {"_id": ObjectId(message_data.request_id)}
-            )
+            request_doc = await FaultRequestRepository(db).get_participants(message_data.request_id)
             print(f"DEBUG: Found request by ObjectId: {request_doc is not None}")
         except Exception as e:
             print(f"DEBUG: Error converting to ObjectId: {e}")
@@ -73,23 +78,12 @@ async def send_message(
             content=message_data.content,
         )
 
-        # Save to database
-        messages_collection = db["messages"]
-        result = await messages_collection.insert_one(message.to_dict())
+        # Save to database; the inserted document is the response source
+        created_msg = await MessageRepository(db).insert(message.to_dict())
 
-        # Fetch created message
-        created_msg = await messages_collection.find_one({"_id": result.inserted_id})
+        print(f"DEBUG: Message saved with ID: {created_msg['_id']}")
 
-        print(f"DEBUG: Message saved with ID: {result.inserted_id}")
-
-        return MessageResponse(
-            id=str(created_msg["_id"]),
-            request_id=created_msg["request_id"],
-            sender_id=created_msg["sender_id"],
-            sender_type=created_msg["sender_type"],
-            content=created_msg["content"],
-            created_at=created_msg["created_at"],
-        )
+        return MessageResponse.from_document(created_msg)
     except HTTPException:
         raise
     except Exception as e:
@@ -103,24 +97,34 @@ async def send_message(
 @router.get("/request/{request_id}", response_model=MessagesListResponse)
 async def get_request_messages(
     request_id: str,
+    after_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    before_id: Optional[str] = None,
+    overlap: bool = False,
+    limit: int = Query(100, ge=1, le=500),
     current_user = Depends(get_current_user),
     db = Depends(get_db),
 ):
     """
-    Get all messages for a fault request
+    Get messages for a fault request, oldest first
+    
+    - **after_id**: Only messages newer than this message ID (polling for new messages)
+    - **overlap**: With `after_id`, also return messages from the few seconds before it,
+      which can still be new; drop ids already shown
+    - **since**: Only messages created at or after this time
+    - **before_id**: Only messages older than this message ID (scrolling back through history)
+    - **limit**: Maximum number of messages to return
+    
+    Without a cursor the most recent `limit` messages are returned.
+    `has_more` reports whether further messages exist in the paging direction.
     """
     try:
         print(f"DEBUG: Fetching messages for request_id: {request_id}")
         print(f"DEBUG: Current user: {current_user.get('_id')}, role: {current_user.get('role')}")
         
         # Verify that the request exists
-        fault_requests_collection = db["fault_requests"]
-        
-        # Try to find by ObjectId first
         try:
-            request_doc = await fault_requests_collection.find_one(
-                {"_id": ObjectId(request_id)}
-            )
+            request_doc = await FaultRequestRepository(db).get_participants(request_id)
             print(f"DEBUG: Found request by ObjectId: {request_doc is not None}")
         except Exception as e:
             print(f"DEBUG: Error converting to ObjectId: {e}")
@@ -151,31 +155,26 @@ async def get_request_messages(
                 detail="Not authorized to view messages in this request",
             )
 
-        # Fetch messages (async)
-        messages_collection = db["messages"]
-        messages = []
-        async for msg in messages_collection.find({
-            "request_id": request_id
-        }).sort("created_at", 1):
-            messages.append(msg)
+        # Fetch one page on the (request_id, _id) index (async)
+        messages, has_more = await MessageRepository(db).page(
+            request_id, limit, after_id=after_id, since=since, before_id=before_id, overlap=overlap
+        )
 
         print(f"DEBUG: Found {len(messages)} messages for request {request_id}")
 
-        message_responses = [
-            MessageResponse(
-                id=str(msg["_id"]),
-                request_id=msg["request_id"],
-                sender_id=msg["sender_id"],
-                sender_type=msg["sender_type"],
-                content=msg["content"],
-                created_at=msg["created_at"],
-            )
-            for msg in messages
-        ]
-
-        return MessagesListResponse(
-            messages=message_responses, total=len(message_responses)
-        )
+        message_rows = [response_row(msg) for msg in messages]
+        # With overlap the page can start with messages older than after_id
+        newest_id = after_id
+        if message_rows and (not after_id or ObjectId(message_rows[-1]["id"]) > ObjectId(after_id)):
+            newest_id = message_rows[-1]["id"]
+
+        return list_response(MessagesListResponse, {
+            "messages": message_rows,
+            "total": len(message_rows),
+            "has_more": has_more,
+            "oldest_id": message_rows[0]["id"] if message_rows else before_id,
+            "newest_id": newest_id,
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -184,3 +183,73 @@ async def get_request_messages(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error fetching messages: {str(e)}",
         )
+
+
+@router.websocket("/ws/{request_id}")
+async def chat_websocket(
+    websocket: WebSocket,
+    request_id: str,
+    token: Optional[str] = None,
+):
+    """
+    Receive new messages for a fault request chat as they are sent
+
+    Browsers cannot set headers on WebSockets, so the JWT is passed as the
+    `token` query parameter. The connection is authorized once on connect;
+    every message inserted into the room afterwards is pushed as JSON.
+    """
+    db = get_db()
+    principal = await get_token_principal(token, db) if token else None
+    if not principal:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid or expired token")
+        return
+
+    try:
+        request_doc = await FaultRequestRepository(db).get_participants(request_id)
+    except Exception:
+        request_doc = None
+
+    if not request_doc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Fault request not found")
+        return
+
+    # Same rule as the REST endpoints: the consumer or the assigned electrician
+    user_id = str(principal["_id"])
+    is_consumer = request_doc.get("consumer_id") == user_id
+    is_electrician = (
+        principal.get("role") == "electrician" and request_doc.get("assigned_to") == user_id
+    )
+    if not (is_consumer or is_electrician):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Not authorized for this request")
+        return
+
+    await websocket.accept()
+    queue = chat_hub.subscribe(request_id)
+
+    async def forward_messages():
+        while True:
+            msg = await queue.get()
+            await websocket.send_text(MessageResponse.from_document(msg).model_dump_json())
+
+    async def wait_for_disconnect():
+        # Clients only listen; anything they send is ignored
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    sender = asyncio.create_task(forward_messages())
+    receiver = asyncio.create_task(wait_for_disconnect())
+    try:
+        done, pending = await asyncio.wait(
+            {sender, receiver}, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if not task.cancelled() and task.exception() and \
+                    not isinstance(task.exception(), WebSocketDisconnect):
+                logger.warning("Chat WebSocket error for request %s: %r", request_id, task.exception())
+    finally:
+        chat_hub.unsubscribe(request_id, queue)
@@ -1,29 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from datetime import datetime
-from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+from config import settings
 from database import get_db
 from models.location import Location
 from models.fault_request import FaultRequest
-from schemas.location import LocationUpdate, LocationResponse, LocationHistoryResponse
+from models.geo import geo_point
+from models.base import response_row
+from schemas.location import (
+    LocationUpdate,
+    LocationBatch,
+    LocationBatchResponse,
+    LocationResponse,
+    LocationHistoryResponse,
+    NearbyElectrician,
+    NearbyElectricianList
+)
 from schemas.fault_request import (
     CreateFaultRequest,
     FaultRequestResponse,
-    UpdateFaultRequestStatus,
-    FaultRequestList
+    FaultRequestList,
+    FaultRequestPage,
+    FaultRequestSummaryPage
 )
+from repositories import FaultRequestRepository, FaultStatsRepository, LocationRepository
 from utils.auth import get_current_user
+from utils.users import resolve_assigned_names
+from utils.dedup import duplicate_detector
+from utils.fault_index import fault_index
+from utils.fault_tiles import fault_tiles
+from utils.location_ingest import location_ingest
+from utils.request_body import read_decoded_body
+from utils.response_cache import FAULT_REQUESTS_TAG, fault_request_tag, response_cache
 
 router = APIRouter(prefix="/api/consumer", tags=["consumer"])
 
+# How far ahead of the server a device clock may run in a batch upload
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
 
-@router.post("/location/update", response_model=LocationResponse)
+@router.post("/location/update", response_model=LocationResponse, status_code=status.HTTP_202_ACCEPTED)
 async def update_location(
     location_data: LocationUpdate,
+    response: Response,
     current_user = Depends(get_current_user),
     db = Depends(get_db)
 ):
     """
     Update consumer's current location
+    
+    The fix is queued for the location ingest stage and echoed back with
+    202; it is written within LOCATION_INGEST_FLUSH_MS. A full queue answers
+    503 with `Retry-After`. With the ingest stage disabled the fix is written
+    before responding with 200.
     """
     try:
         # Create new location document
@@ -36,35 +67,117 @@ async def update_location(
             is_sharing=location_data.is_sharing
         )
         
-        # Insert or update location in MongoDB
-        locations_collection = db["consumer_locations"]
+        if location_ingest.running:
+            if not location_ingest.submit(location):
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Location updates are backed up, retry shortly",
+                    headers={"Retry-After": "1"}
+                )
+            return LocationResponse.from_document(location.to_dict())
+        
+        # Update the user's location or insert it, getting the stored document back
+        locations = LocationRepository(db)
+        updated_location = await locations.save_current(location)
         
-        # Find existing location for user and update it, or insert new one
-        result = await locations_collection.update_one(
-            {"user_id": str(current_user.get("_id"))},
-            {"$set": location.to_update_dict()},
-            upsert=True
-        )
+        # Append the fix to the user's hourly history bucket
+        await locations.append_history(location)
         
-        # Fetch the updated location
-        updated_location = await locations_collection.find_one(
-            {"user_id": str(current_user.get("_id"))}
+        response.status_code = status.HTTP_200_OK
+        return LocationResponse.from_document(updated_location)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error updating location: {str(e)}"
         )
+
+
+@router.post("/location/batch", response_model=LocationBatchResponse)
+async def upload_location_batch(
+    request: Request,
+    current_user = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Upload fixes buffered on the device while offline
+    
+    The body is a JSON array of fixes with their device `timestamp`,
+    optionally sent with `Content-Encoding: gzip`. Fixes are de-duplicated
+    by timestamp, within the batch and against stored history, so a retried
+    upload stores nothing twice. New fixes are appended to the history in
+    one bulk write; the current location only moves to the newest fix, and
+    only if nothing newer is stored. Fixes dated in the future or past the
+    history retention window are rejected.
+    """
+    try:
+        body = await read_decoded_body(request, settings.LOCATION_BATCH_MAX_BYTES)
+        try:
+            fixes = LocationBatch.model_validate_json(body).root
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False))
+        if len(fixes) > settings.LOCATION_BATCH_MAX_FIXES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {settings.LOCATION_BATCH_MAX_FIXES} fixes per batch"
+            )
+        
+        now = datetime.utcnow()
+        earliest = now - timedelta(days=settings.LOCATION_HISTORY_RETENTION_DAYS)
+        latest = now + MAX_CLOCK_SKEW
         
-        return LocationResponse(
-            user_id=updated_location["user_id"],
-            latitude=updated_location["latitude"],
-            longitude=updated_location["longitude"],
-            accuracy=updated_location.get("accuracy"),
-            altitude=updated_location.get("altitude"),
-            is_sharing=updated_location["is_sharing"],
-            created_at=updated_location["created_at"],
-            updated_at=updated_location["updated_at"]
+        # Stored timestamps are naive UTC with millisecond precision; later copies of a timestamp win
+        by_timestamp = {}
+        rejected = 0
+        for fix in fixes:
+            timestamp = fix.timestamp
+            if timestamp.tzinfo:
+                timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            timestamp = timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000)
+            if earliest <= timestamp <= latest:
+                by_timestamp[timestamp] = fix
+            else:
+                rejected += 1
+        
+        user_id = str(current_user.get("_id"))
+        locations = LocationRepository(db)
+        if by_timestamp:
+            stored = await locations.history_timestamps(user_id, set(by_timestamp))
+            for timestamp in stored:
+                del by_timestamp[timestamp]
+        
+        new_fixes = [
+            Location(
+                user_id=user_id,
+                latitude=fix.latitude,
+                longitude=fix.longitude,
+                accuracy=fix.accuracy,
+                altitude=fix.altitude,
+                is_sharing=fix.is_sharing,
+                created_at=timestamp,
+                updated_at=timestamp
+            )
+            for timestamp, fix in by_timestamp.items()
+        ]
+        if new_fixes:
+            await locations.save_batch(new_fixes)
+        
+        return LocationBatchResponse(
+            received=len(fixes),
+            duplicates=len(fixes) - rejected - len(new_fixes),
+            rejected=rejected,
+            stored=len(new_fixes),
+            latest=max(by_timestamp) if by_timestamp else None
         )
+    except HTTPException:
+        raise
+    except RequestValidationError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Error updating location: {str(e)}"
+            detail=f"Error uploading locations: {str(e)}"
         )
 
 
@@ -77,10 +190,7 @@ async def get_current_location(
     Get consumer's current location
     """
     try:
-        locations_collection = db["consumer_locations"]
-        location = await locations_collection.find_one(
-            {"user_id": str(current_user.get("_id"))}
-        )
+        location = await LocationRepository(db).get_current(str(current_user.get("_id")))
         
         if not location:
             raise HTTPException(
@@ -88,16 +198,7 @@ async def get_current_location(
                 detail="Location not found. Please share your location first."
             )
         
-        return LocationResponse(
-            user_id=location["user_id"],
-            latitude=location["latitude"],
-            longitude=location["longitude"],
-            accuracy=location.get("accuracy"),
-            altitude=location.get("altitude"),
-            is_sharing=location["is_sharing"],
-            created_at=location["created_at"],
-            updated_at=location["updated_at"]
-        )
+        return LocationResponse.from_document(location)
     except HTTPException:
         raise
     except Exception as e:
@@ -116,13 +217,9 @@ async def stop_sharing_location(
     Stop sharing location
     """
     try:
-        locations_collection = db["consumer_locations"]
-        result = await locations_collection.update_one(
-            {"user_id": str(current_user.get("_id"))},
-            {"$set": {"is_sharing": False, "updated_at": datetime.utcnow()}}
-        )
+        found = await LocationRepository(db).set_sharing(str(current_user.get("_id")), False)
         
-        if result.matched_count == 0:
+        if not found:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Location sharing not found"
@@ -147,13 +244,9 @@ async def resume_sharing_location(
     Resume sharing location
     """
     try:
-        locations_collection = db["consumer_locations"]
-        result = await locations_collection.update_one(
-            {"user_id": str(current_user.get("_id"))},
-            {"$set": {"is_sharing": True, "updated_at": datetime.utcnow()}}
-        )
+        found = await LocationRepository(db).set_sharing(str(current_user.get("_id")), True)
         
-        if result.matched_count == 0:
+        if not found:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Location sharing not found"
@@ -171,40 +264,52 @@ async def resume_sharing_location(
 
 @router.get("/location/history", response_model=LocationHistoryResponse)
 async def get_location_history(
-    limit: int = 10,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution_seconds: int = Query(0, ge=0, le=86400),
+    limit: int = Query(500, ge=1, le=10000),
     current_user = Depends(get_current_user),
     db = Depends(get_db)
 ):
     """
-    Get consumer's location history
+    Get consumer's location history over a time range
+    
+    - **start**: Range start (default: 24 hours before end)
+    - **end**: Range end (default: now)
+    - **resolution_seconds**: Downsample to the last fix in each window of this size (0 keeps every fix)
+    - **limit**: Maximum number of points returned; the newest are kept and
+      `has_more` reports that older points in the range were left out
     """
     try:
-        locations_collection = db["consumer_locations"]
-        
-        # For now, this returns the current location
-        # In a real app, you might store historical data
-        location = await locations_collection.find_one(
-            {"user_id": str(current_user.get("_id"))}
-        )
+        # Stored timestamps are naive UTC
+        if end and end.tzinfo:
+            end = end.astimezone(timezone.utc).replace(tzinfo=None)
+        if start and start.tzinfo:
+            start = start.astimezone(timezone.utc).replace(tzinfo=None)
+        end = end or datetime.utcnow()
+        start = start or end - timedelta(hours=24)
+        if start > end:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start must be before end"
+            )
         
-        if not location:
-            return LocationHistoryResponse(locations=[], total=0)
-        
-        location_response = LocationResponse(
-            user_id=location["user_id"],
-            latitude=location["latitude"],
-            longitude=location["longitude"],
-            accuracy=location.get("accuracy"),
-            altitude=location.get("altitude"),
-            is_sharing=location["is_sharing"],
-            created_at=location["created_at"],
-            updated_at=location["updated_at"]
+        user_id = str(current_user.get("_id"))
+        fixes, has_more = await LocationRepository(db).history_range(
+            user_id, start, end, resolution_seconds, limit
         )
+        locations = [LocationResponse.from_history_fix(user_id, fix) for fix in fixes]
         
         return LocationHistoryResponse(
-            locations=[location_response],
-            total=1
+            locations=locations,
+            total=len(locations),
+            has_more=has_more,
+            start=start,
+            end=end,
+            resolution_seconds=resolution_seconds
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -222,6 +327,10 @@ async def create_fault_request(
 ):
     """
     Create a new fault request
+    
+    Reports close to a recent open request with a similar title and
+    description are linked to it: `parent_id` names the incident and
+    `duplicate_score` the text similarity.
     """
     try:
         # Create fault request document
@@ -236,29 +345,28 @@ async def create_fault_request(
             priority=fault_data.priority,
             status="open"
         )
+        document = fault_request.to_dict()
         
-        # Insert into database
-        fault_requests_collection = db["fault_requests"]
-        result = await fault_requests_collection.insert_one(fault_request.to_dict())
-        
-        # Fetch the created request
-        created_request = await fault_requests_collection.find_one({"_id": result.inserted_id})
-        
-        return FaultRequestResponse(
-            id=str(created_request["_id"]),
-            consumer_id=created_request["consumer_id"],
-            title=created_request["title"],
-            description=created_request["description"],
-            location=created_request["location"],
-            latitude=created_request.get("latitude"),
-            longitude=created_request.get("longitude"),
-            photo_url=created_request.get("photo_url"),
-            status=created_request["status"],
-            priority=created_request["priority"],
-            assigned_to=created_request.get("assigned_to"),
-            created_at=created_request["created_at"],
-            updated_at=created_request["updated_at"]
-        )
+        # Link likely duplicates under the incident they report
+        fault_requests = FaultRequestRepository(db)
+        duplicate = await duplicate_detector.find_parent(db, document, in_memory=fault_index.live)
+        if duplicate:
+            document["parent_id"], document["duplicate_score"] = duplicate
+        
+        # Insert into database; the inserted document is the response source
+        created_request = await fault_requests.insert(document)
+        await FaultStatsRepository(db).record_created(created_request)
+        if duplicate:
+            await fault_requests.record_duplicate(document["parent_id"])
+            await response_cache.invalidate_fault_requests(document["parent_id"])
+        else:
+            await response_cache.invalidate_fault_requests()
+        fault_tiles.invalidate_fault(created_request)
+        if fault_index.live:
+            # Visible to the next report right away, before the change stream delivers it
+            duplicate_detector.add(created_request)
+        
+        return FaultRequestResponse.from_document(created_request)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -268,62 +376,63 @@ async def create_fault_request(
 
 @router.get("/fault-requests", response_model=FaultRequestList)
 async def get_consumer_fault_requests(
+    request: Request,
     status_filter: str = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    count: str = Query("estimated", pattern="^(exact|estimated|none)$"),
+    view: str = Query("full", pattern="^(full|summary)$"),
     current_user = Depends(get_current_user),
     db = Depends(get_db)
 ):
     """
-    Get all fault requests for the current consumer
+    Get fault requests for the current consumer, newest first
+    
+    - **limit**: Page size (1-500)
+    - **cursor**: `next_cursor` from the previous page
+    - **count**: How to compute `total`: exact, estimated or none
+    - **view**: `full` requests or `summary` rows without description, photo and coordinates
+    
+    Responses are cached per user and carry an ETag for `If-None-Match`.
     """
-    try:
-        fault_requests_collection = db["fault_requests"]
-        
-        # Build query
-        query = {"consumer_id": str(current_user.get("_id"))}
-        if status_filter:
-            query["status"] = status_filter
-        
-        # Fetch requests sorted by creation date (newest first) (async)
-        requests = []
-        async for req in fault_requests_collection.find(query).sort("created_at", -1):
-            requests.append(req)
-        
-        # Convert to response format
-        users_collection = db["users"]
-        request_responses = []
-        
-        for req in requests:
-            # Get electrician name if assigned_to exists
-            assigned_to_name = None
-            if req.get("assigned_to"):
-                try:
-                    from bson import ObjectId
-                    electrician = await users_collection.find_one({"_id": ObjectId(req.get("assigned_to"))})
-                    if electrician:
-                        assigned_to_name = electrician.get("full_name", "Unknown")
-                except:
-                    assigned_to_name = None
-            
-            request_responses.append(
-                FaultRequestResponse(
-                    id=str(req["_id"]),
-                    consumer_id=req["consumer_id"],
-                    title=req["title"],
-                    description=req["description"],
-                    location=req["location"],
-                    latitude=req.get("latitude"),
-                    longitude=req.get("longitude"),
-                    photo_url=req.get("photo_url"),
-                    status=req["status"],
-                    priority=req["priority"],
-                    assigned_to=req.get("assigned_to"),
-                    assigned_to_name=assigned_to_name,
-                    created_at=req["created_at"],
-                    updated_at=req["updated_at"]
-                )
-            )
+    async def build():
+        # Fetch one page sorted by creation date (newest first) (async)
+        requests, next_cursor, total, total_is_estimate = await FaultRequestRepository(db).page_for_consumer(
+            str(current_user.get("_id")),
+            status_filter,
+            limit,
+            cursor=cursor,
+            count=count,
+            summary=view == "summary"
+        )
+        
+        # Resolve all electrician names in one query
+        assigned_names = await resolve_assigned_names(db, requests)
+        
+        # Rows are the fetched documents themselves; the response model validates them once
+        request_rows = [
+            response_row(req, assigned_to_name=assigned_names.get(req.get("assigned_to")))
+            for req in requests
+        ]
         
-        return FaultRequestList(requests=request_responses, total=len(request_responses))
+        return {
+            "requests": request_rows,
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }
+    
+    try:
+        return await response_cache.respond(
+            request,
+            "consumer.fault_requests",
+            str(current_user.get("_id")),
+            [FAULT_REQUESTS_TAG],
+            settings.CACHE_TTL_LIST_SECONDS,
+            FaultRequestSummaryPage if view == "summary" else FaultRequestPage,
+            build
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -334,19 +443,19 @@ async def get_consumer_fault_requests(
 @router.get("/fault-request/{request_id}", response_model=FaultRequestResponse)
 async def get_fault_request(
     request_id: str,
+    request: Request,
     current_user = Depends(get_current_user),
     db = Depends(get_db)
 ):
     """
     Get a specific fault request by ID
+    
+    Responses are cached per user and carry an ETag for `If-None-Match`.
     """
-    try:
-        fault_requests_collection = db["fault_requests"]
-        
-        request_doc = await fault_requests_collection.find_one({
-            "_id": ObjectId(request_id),
-            "consumer_id": str(current_user.get("_id"))
-        })
+    async def build():
+        request_doc = await FaultRequestRepository(db).get(
+            request_id, consumer_id=str(current_user.get("_id"))
+        )
         
         if not request_doc:
             raise HTTPException(
@@ -354,20 +463,17 @@ async def get_fault_request(
                 detail="Fault request not found"
             )
         
-        return FaultRequestResponse(
-            id=str(request_doc["_id"]),
-            consumer_id=request_doc["consumer_id"],
-            title=request_doc["title"],
-            description=request_doc["description"],
-            location=request_doc["location"],
-            latitude=request_doc.get("latitude"),
-            longitude=request_doc.get("longitude"),
-            photo_url=request_doc.get("photo_url"),
-            status=request_doc["status"],
-            priority=request_doc["priority"],
-            assigned_to=request_doc.get("assigned_to"),
-            created_at=request_doc["created_at"],
-            updated_at=request_doc["updated_at"]
+        return FaultRequestResponse.from_document(request_doc)
+    
+    try:
+        return await response_cache.respond(
+            request,
+            "consumer.fault_request",
+            str(current_user.get("_id")),
+            [fault_request_tag(request_id)],
+            settings.CACHE_TTL_DETAIL_SECONDS,
+            FaultRequestResponse,
+            build
         )
     except HTTPException:
         raise
@@ -378,6 +484,63 @@ async def get_fault_request(
         )
 
 
+@router.get("/fault-request/{request_id}/nearby-electricians", response_model=NearbyElectricianList)
+async def get_nearby_electricians(
+    request_id: str,
+    radius_km: float = Query(25, gt=0, le=500),
+    limit: int = Query(10, ge=1, le=100),
+    current_user = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Get electricians sharing their location near a fault request, closest first
+    
+    - **radius_km**: Search radius in kilometres
+    - **limit**: Maximum number of electricians returned
+    """
+    try:
+        request_doc = await FaultRequestRepository(db).get(
+            request_id, consumer_id=str(current_user.get("_id"))
+        )
+        
+        if not request_doc:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Fault request not found"
+            )
+        
+        near = geo_point(request_doc.get("latitude"), request_doc.get("longitude"))
+        if not near:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Fault request has no coordinates"
+            )
+        
+        # Walk sharing locations closest first and keep the active electricians
+        electricians = await LocationRepository(db).nearby_electricians(near, radius_km, limit)
+        
+        responses = [
+            NearbyElectrician(
+                user_id=loc["user_id"],
+                full_name=loc["user"].get("full_name", "Unknown"),
+                latitude=loc["latitude"],
+                longitude=loc["longitude"],
+                distance_km=loc["distance"] / 1000,
+                updated_at=loc["updated_at"]
+            )
+            for loc in electricians
+        ]
+        
+        return NearbyElectricianList(electricians=responses, total=len(responses))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error fetching nearby electricians: {str(e)}"
+        )
+
+
 @router.put("/fault-request/{request_id}/cancel")
 async def cancel_fault_request(
     request_id: str,
@@ -388,27 +551,18 @@ async def cancel_fault_request(
     Cancel a fault request (consumer only)
     """
     try:
-        fault_requests_collection = db["fault_requests"]
-        
-        result = await fault_requests_collection.update_one(
-            {
-                "_id": ObjectId(request_id),
-                "consumer_id": str(current_user.get("_id"))
-            },
-            {
-                "$set": {
-                    "status": "closed",
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
+        previous = await FaultRequestRepository(db).cancel(request_id, str(current_user.get("_id")))
         
-        if result.matched_count == 0:
+        if not previous:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Fault request not found or you don't have permission"
             )
         
+        await FaultStatsRepository(db).record_transition(previous, {"status": "closed"})
+        await response_cache.invalidate_fault_requests(request_id)
+        fault_tiles.invalidate_fault(previous)
+        
         return {"message": "Fault request cancelled successfully"}
     except HTTPException:
         raise
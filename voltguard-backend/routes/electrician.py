@@ -1,27 +1,141 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
 from datetime import datetime
-from bson import ObjectId
+from config import settings
 from database import get_db
-from models.fault_request import FaultRequest
+from models.geo import QUADKEY_ZOOM
+from models.base import response_row
 from schemas.fault_request import (
     FaultRequestResponse,
     UpdateFaultRequestStatus,
-    FaultRequestList
+    FaultRequestList,
+    FaultRequestPage,
+    FaultRequestSummaryPage,
+    FaultRequestStats,
+    ClaimedFaultRequests,
+    NearbyFaultRequestList,
+    FaultTile
 )
-from utils.auth import get_current_user
+from schemas.location import CrewFeedEvent
+from repositories import FaultRequestRepository, FaultStatsRepository
+from utils.auth import get_current_user, get_token_principal
+from utils.users import resolve_assigned_names, resolve_user_names
+from utils.fast_json import list_response
+from utils.export import EXPORT_MEDIA_TYPES, stream_fault_requests
+from utils.crew_feed import crew_feed
+from utils.fault_index import fault_index
+from utils.fault_tiles import fault_tiles
+from utils.response_cache import FAULT_REQUESTS_TAG, fault_request_tag, response_cache
 
 router = APIRouter(prefix="/api/electrician", tags=["electrician"])
 
+# Idle crew map streams get a comment line this often
+CREW_FEED_KEEPALIVE_SECONDS = 15
+
 
 @router.get("/fault-requests", response_model=FaultRequestList)
 async def get_all_fault_requests(
+    request: Request,
     status_filter: str = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    count: str = Query("estimated", pattern="^(exact|estimated|none)$"),
+    view: str = Query("full", pattern="^(full|summary)$"),
     current_user = Depends(get_current_user),
     db = Depends(get_db)
 ):
     """
-    Get all fault requests (electrician view)
+    Get fault requests (electrician view), highest priority first
     Only electricians can access this
+    
+    - **limit**: Page size (1-500)
+    - **cursor**: `next_cursor` from the previous page
+    - **count**: How to compute `total`: exact, estimated or none
+    - **view**: `full` requests or `summary` rows without description, photo and coordinates
+    
+    The first page of `status_filter=open` comes from the in-memory open-fault
+    index while it follows the change stream and has caught up; later pages
+    continue in MongoDB. Responses are cached per user and carry an ETag for
+    `If-None-Match`.
+    """
+    # Checked before the cache so a role change takes effect immediately
+    if current_user.get("role") not in ["electrician", "lineman"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only electricians can view fault requests"
+        )
+    
+    async def build():
+        if status_filter == "open" and not cursor and fault_index.live:
+            # First page of the open queue straight from the in-memory index
+            requests, next_cursor, total, total_is_estimate = fault_index.page(
+                limit, count, summary=view == "summary"
+            )
+        else:
+            # Fetch one page sorted by priority and creation date (async)
+            requests, next_cursor, total, total_is_estimate = await FaultRequestRepository(db).page_queue(
+                status_filter,
+                limit,
+                cursor=cursor,
+                count=count,
+                summary=view == "summary"
+            )
+        
+        # Resolve all electrician names in one query
+        assigned_names = await resolve_assigned_names(db, requests)
+        
+        # Rows are the fetched documents themselves; the response model validates them once
+        request_rows = [
+            response_row(req, assigned_to_name=assigned_names.get(req.get("assigned_to")))
+            for req in requests
+        ]
+        
+        return {
+            "requests": request_rows,
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }
+    
+    try:
+        return await response_cache.respond(
+            request,
+            "electrician.fault_requests",
+            str(current_user.get("_id")),
+            [FAULT_REQUESTS_TAG],
+            settings.CACHE_TTL_LIST_SECONDS,
+            FaultRequestSummaryPage if view == "summary" else FaultRequestPage,
+            build
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error fetching fault requests: {str(e)}"
+        )
+
+
+@router.get("/fault-requests/nearby", response_model=NearbyFaultRequestList)
+async def get_nearby_fault_requests(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5, gt=0, le=500),
+    status_filter: Optional[str] = "open",
+    limit: int = Query(50, ge=1, le=500),
+    current_user = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Get fault requests within a radius, closest first
+    
+    - **latitude** / **longitude**: Search point
+    - **radius_km**: Search radius in kilometres
+    - **status_filter**: Only requests with this status (default: open)
+    - **limit**: Maximum number of requests returned
     """
     try:
         # Verify user is electrician
@@ -31,86 +145,234 @@ async def get_all_fault_requests(
                 detail="Only electricians can view fault requests"
             )
         
-        fault_requests_collection = db["fault_requests"]
-        
-        # Build query
-        query = {}
-        if status_filter:
-            query["status"] = status_filter
-        
-        # Fetch requests sorted by priority and creation date (async)
-        requests = []
-        async for req in fault_requests_collection.find(query).sort([("priority", -1), ("created_at", -1)]):
-            requests.append(req)
+        # Distance-sorted search on the 2dsphere index (distance in metres)
+        requests = await FaultRequestRepository(db).nearby(
+            latitude, longitude, radius_km, status_filter, limit
+        )
         
-        # Convert to response format
-        users_collection = db["users"]
-        request_responses = []
+        # Resolve all electrician names in one query
+        assigned_names = await resolve_assigned_names(db, requests)
         
-        for req in requests:
-            # Get electrician name if assigned_to exists
-            assigned_to_name = None
-            if req.get("assigned_to"):
-                try:
-                    from bson import ObjectId
-                    electrician = await users_collection.find_one({"_id": ObjectId(req.get("assigned_to"))})
-                    if electrician:
-                        assigned_to_name = electrician.get("full_name", "Unknown")
-                except:
-                    assigned_to_name = None
-            
-            request_responses.append(
-                FaultRequestResponse(
-                    id=str(req["_id"]),
-                    consumer_id=req["consumer_id"],
-                    title=req["title"],
-                    description=req["description"],
-                    location=req["location"],
-                    latitude=req.get("latitude"),
-                    longitude=req.get("longitude"),
-                    photo_url=req.get("photo_url"),
-                    status=req["status"],
-                    priority=req["priority"],
-                    assigned_to=req.get("assigned_to"),
-                    assigned_to_name=assigned_to_name,
-                    created_at=req["created_at"],
-                    updated_at=req["updated_at"]
-                )
+        request_rows = [
+            response_row(
+                req,
+                assigned_to_name=assigned_names.get(req.get("assigned_to")),
+                distance_km=req["distance"] / 1000
             )
+            for req in requests
+        ]
         
-        return FaultRequestList(requests=request_responses, total=len(request_responses))
+        return list_response(NearbyFaultRequestList, {"requests": request_rows, "total": len(request_rows)})
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Error fetching fault requests: {str(e)}"
+            detail=f"Error fetching nearby fault requests: {str(e)}"
         )
 
 
-@router.get("/fault-request/{request_id}", response_model=FaultRequestResponse)
-async def get_fault_request(
-    request_id: str,
+@router.get("/fault-requests/export")
+async def export_fault_requests(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status_filter: str = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = Query(1000, ge=100, le=10000),
     current_user = Depends(get_current_user),
     db = Depends(get_db)
 ):
     """
-    Get a specific fault request details
+    Stream every matching fault request for analytics, oldest first
+    Only electricians can access this
+    
+    - **format**: `ndjson` (one FaultRequestResponse object per line) or `csv`
+    - **status_filter**: Only requests with this status
+    - **start** / **end**: Only requests created in [start, end)
+    - **batch_size**: Documents fetched from MongoDB and written per chunk
+    """
+    if current_user.get("role") not in ["electrician", "lineman"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only electricians can export fault requests"
+        )
+    if start and end and start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    
+    cursor = FaultRequestRepository(db).export_cursor(status_filter, start, end, batch_size)
+    return StreamingResponse(
+        stream_fault_requests(db, cursor, batch_size, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="fault-requests.{format}"'}
+    )
+
+
+@router.get("/crews/stream")
+async def stream_crew_locations(
+    request: Request,
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    token: Optional[str] = None,
+    db = Depends(get_db)
+):
+    """
+    Live map feed of sharing users inside a bounding box (Server-Sent Events)
+    Only electricians can access this
+    
+    `EventSource` cannot set headers, so the JWT may be passed as the `token`
+    query parameter instead of the Authorization header. The first `snapshot`
+    event lists everyone currently in the box; `update` events then carry
+    moved or new users (`locations`) and users that left the box or stopped
+    sharing (`removed`). Updates are coalesced to each user's latest fix and
+    sent at most every CREW_FEED_MIN_INTERVAL_MS.
+    """
+    if token is None:
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            token = authorization[7:]
+    principal = await get_token_principal(token, db) if token else None
+    if not principal:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+    if principal.get("role") not in ["electrician", "lineman"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only electricians can view the crew map"
+        )
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_lat/min_lon must not exceed max_lat/max_lon"
+        )
+    
+    subscriber = crew_feed.subscribe(min_lat, min_lon, max_lat, max_lon)
+    
+    def sse(event: str, locations: list, removed: list) -> str:
+        payload = CrewFeedEvent(locations=locations, removed=removed).model_dump_json()
+        return f"event: {event}\ndata: {payload}\n\n"
+    
+    async def events():
+        try:
+            yield sse("snapshot", crew_feed.snapshot(subscriber), [])
+            while not await request.is_disconnected():
+                try:
+                    locations, removed = await asyncio.wait_for(
+                        subscriber.next_changes(), CREW_FEED_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line; keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse("update", locations, removed)
+        finally:
+            crew_feed.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/faults/tiles/{z}/{x}/{y}", response_model=FaultTile)
+async def get_fault_tile(
+    z: int = Path(..., ge=0, le=QUADKEY_ZOOM),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    status_filter: Optional[str] = None,
+    current_user = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Clustered fault requests in a Web Mercator map tile
+    Only electricians can access this
+    
+    - **z** / **x** / **y**: Slippy map tile coordinates
+    - **status_filter**: Only requests with this status
+    
+    The tile is split into cells TILE_CLUSTER_DEPTH zoom levels deeper; each
+    cluster carries its quadkey, count, mean position and counts by status
+    and priority, so the payload stays bounded whatever the fault count.
+    """
+    if current_user.get("role") not in ["electrician", "lineman"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only electricians can view fault tiles"
+        )
+    if x >= 1 << z or y >= 1 << z:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No tile {z}/{x}/{y}"
+        )
+    
+    try:
+        body = await fault_tiles.render(db, z, x, y, status_filter)
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error building fault tile: {str(e)}"
+        )
+
+
+@router.get("/stats", response_model=FaultRequestStats)
+async def get_fault_request_stats(
+    current_user = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Dashboard counters: requests per status, per priority and per electrician,
+    plus mean time-to-assign
+    Only electricians can access this
+    
+    Counters are updated on every write and rebuilt every
+    `STATS_RECONCILE_INTERVAL_SECONDS`, so this is a single document read.
     """
     try:
-        # Verify user is electrician
         if current_user.get("role") not in ["electrician", "lineman"]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only electricians can view fault requests"
+                detail="Only electricians can view statistics"
             )
         
-        fault_requests_collection = db["fault_requests"]
-        users_collection = db["users"]
-        
-        request_doc = await fault_requests_collection.find_one({
-            "_id": ObjectId(request_id)
-        })
+        return FaultRequestStats.from_document(await FaultStatsRepository(db).get())
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error fetching statistics: {str(e)}"
+        )
+
+
+@router.get("/fault-request/{request_id}", response_model=FaultRequestResponse)
+async def get_fault_request(
+    request_id: str,
+    request: Request,
+    current_user = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Get a specific fault request details
+    
+    Responses are cached per user and carry an ETag for `If-None-Match`.
+    """
+    # Checked before the cache so a role change takes effect immediately
+    if current_user.get("role") not in ["electrician", "lineman"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only electricians can view fault requests"
+        )
+    
+    async def build():
+        request_doc = await FaultRequestRepository(db).get(request_id)
         
         if not request_doc:
             raise HTTPException(
@@ -119,30 +381,20 @@ async def get_fault_request(
             )
         
         # Get electrician name if assigned_to exists
-        assigned_to_name = None
-        if request_doc.get("assigned_to"):
-            try:
-                electrician = await users_collection.find_one({"_id": ObjectId(request_doc.get("assigned_to"))})
-                if electrician:
-                    assigned_to_name = electrician.get("full_name", "Unknown")
-            except:
-                assigned_to_name = None
+        assigned_names = await resolve_assigned_names(db, [request_doc])
+        assigned_to_name = assigned_names.get(request_doc.get("assigned_to"))
         
-        return FaultRequestResponse(
-            id=str(request_doc["_id"]),
-            consumer_id=request_doc["consumer_id"],
-            title=request_doc["title"],
-            description=request_doc["description"],
-            location=request_doc["location"],
-            latitude=request_doc.get("latitude"),
-            longitude=request_doc.get("longitude"),
-            photo_url=request_doc.get("photo_url"),
-            status=request_doc["status"],
-            priority=request_doc["priority"],
-            assigned_to=request_doc.get("assigned_to"),
-            assigned_to_name=assigned_to_name,
-            created_at=request_doc["created_at"],
-            updated_at=request_doc["updated_at"]
+        return FaultRequestResponse.from_document(request_doc, assigned_to_name)
+    
+    try:
+        return await response_cache.respond(
+            request,
+            "electrician.fault_request",
+            str(current_user.get("_id")),
+            [fault_request_tag(request_id)],
+            settings.CACHE_TTL_DETAIL_SECONDS,
+            FaultRequestResponse,
+            build
         )
     except HTTPException:
         raise
@@ -162,6 +414,14 @@ async def assign_fault_request(
 ):
     """
     Assign a fault request to electrician and update status
+    
+    The update is conditional, so two crews can never both claim a request:
+    
+    - **expected_status**: Only update if the request still has this status
+    - **expected_version**: Only update if the request is still at this `version`
+    
+    Without `expected_version`, a request already assigned to another
+    electrician is not taken over. Returns 409 if the request changed.
     """
     try:
         # Verify user is electrician
@@ -171,8 +431,6 @@ async def assign_fault_request(
                 detail="Only electricians can assign fault requests"
             )
         
-        fault_requests_collection = db["fault_requests"]
-        
         update_data = {
             "status": status_update.status,
             "updated_at": datetime.utcnow()
@@ -185,18 +443,41 @@ async def assign_fault_request(
             # Auto-assign to current electrician if not specified
             update_data["assigned_to"] = str(current_user.get("_id"))
         
-        result = await fault_requests_collection.update_one(
-            {"_id": ObjectId(request_id)},
-            {"$set": update_data}
-        )
+        expected = {}
+        if status_update.expected_status:
+            expected["status"] = status_update.expected_status
+        if status_update.expected_version is not None:
+            expected["version"] = status_update.expected_version
+        elif update_data.get("assigned_to"):
+            # Claim only if unassigned or already ours, never someone else's
+            expected["assigned_to"] = {"$in": [None, update_data["assigned_to"]]}
+        
+        fault_requests = FaultRequestRepository(db)
+        previous = await fault_requests.update_status(request_id, update_data, expected)
         
-        if result.matched_count == 0:
+        if not previous:
+            current = await fault_requests.get_state(request_id)
+            if not current:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Fault request not found"
+                )
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Fault request not found"
+                status_code=status.HTTP_409_CONFLICT,
+                detail=(
+                    f"Fault request was changed concurrently: status {current.get('status')}, "
+                    f"assigned to {current.get('assigned_to')}, version {current.get('version', 0)}"
+                )
             )
         
-        return {"message": "Fault request updated successfully"}
+        await FaultStatsRepository(db).record_transition(previous, update_data)
+        await response_cache.invalidate_fault_requests(request_id)
+        fault_tiles.invalidate_fault(previous)
+        
+        return {
+            "message": "Fault request updated successfully",
+            "version": previous.get("version", 0) + 1
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -206,70 +487,128 @@ async def assign_fault_request(
         )
 
 
-@router.get("/my-assignments", response_model=FaultRequestList)
-async def get_my_assignments(
-    status_filter: str = None,
+@router.post("/fault-requests/claim-next", response_model=ClaimedFaultRequests)
+async def claim_next_fault_requests(
+    count: int = Query(1, ge=1, le=20),
     current_user = Depends(get_current_user),
     db = Depends(get_db)
 ):
     """
-    Get fault requests assigned to current electrician
+    Assign the next `count` highest-priority open, unassigned requests to the caller
+    
+    Each claim is a single atomic `find_one_and_update`, so concurrent crews
+    always receive different requests. Returns fewer than `count` requests
+    when the queue runs out.
     """
     try:
-        # Verify user is electrician
         if current_user.get("role") not in ["electrician", "lineman"]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only electricians can view assignments"
+                detail="Only electricians can claim fault requests"
             )
         
-        fault_requests_collection = db["fault_requests"]
-        users_collection = db["users"]
+        electrician_id = str(current_user.get("_id"))
+        fault_requests = FaultRequestRepository(db)
+        stats = FaultStatsRepository(db)
         
-        # Build query
-        query = {"assigned_to": str(current_user.get("_id"))}
-        if status_filter:
-            query["status"] = status_filter
+        claimed_requests = []
+        for _ in range(count):
+            previous = await fault_requests.claim_next(electrician_id)
+            if not previous:
+                break
+            update_data = {
+                "status": "assigned",
+                "assigned_to": electrician_id,
+                "updated_at": datetime.utcnow()
+            }
+            await stats.record_transition(previous, update_data)
+            fault_tiles.invalidate_fault(previous)
+            
+            # The claim returned the document before the update; apply what it changed
+            claimed_requests.append({**previous, **update_data, "version": previous.get("version", 0) + 1})
         
-        # Fetch requests (async)
-        requests = []
-        async for req in fault_requests_collection.find(query).sort("created_at", -1):
-            requests.append(req)
+        electrician_name = None
+        if claimed_requests:
+            await response_cache.invalidate_fault_requests(*(str(req["_id"]) for req in claimed_requests))
+            electrician_name = (await resolve_user_names(db, [electrician_id])).get(electrician_id)
+        claimed = [FaultRequestResponse.from_document(req, electrician_name) for req in claimed_requests]
         
-        # Convert to response format
-        request_responses = []
+        return ClaimedFaultRequests(requests=claimed, total=len(claimed))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error claiming fault requests: {str(e)}"
+        )
+
+
+@router.get("/my-assignments", response_model=FaultRequestList)
+async def get_my_assignments(
+    request: Request,
+    status_filter: str = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    count: str = Query("estimated", pattern="^(exact|estimated|none)$"),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    current_user = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Get fault requests assigned to current electrician, newest first
+    
+    - **limit**: Page size (1-500)
+    - **cursor**: `next_cursor` from the previous page
+    - **count**: How to compute `total`: exact, estimated or none
+    - **view**: `full` requests or `summary` rows without description, photo and coordinates
+    
+    Responses are cached per user and carry an ETag for `If-None-Match`.
+    """
+    # Checked before the cache so a role change takes effect immediately
+    if current_user.get("role") not in ["electrician", "lineman"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only electricians can view assignments"
+        )
+    
+    async def build():
+        # Fetch one page sorted by creation date (newest first) (async)
+        requests, next_cursor, total, total_is_estimate = await FaultRequestRepository(db).page_for_electrician(
+            str(current_user.get("_id")),
+            status_filter,
+            limit,
+            cursor=cursor,
+            count=count,
+            summary=view == "summary"
+        )
         
-        for req in requests:
-            # Get electrician name if assigned_to exists
-            assigned_to_name = None
-            if req.get("assigned_to"):
-                try:
-                    from bson import ObjectId
-                    electrician = await users_collection.find_one({"_id": ObjectId(req.get("assigned_to"))})
-                    if electrician:
-                        assigned_to_name = electrician.get("full_name", "Unknown")
-                except:
-                    assigned_to_name = None
-            
-            request_responses.append(
-                FaultRequestResponse(
-                    id=str(req["_id"]),
-                    consumer_id=req["consumer_id"],
-                    title=req["title"],
-                    description=req["description"],
-                    location=req["location"],
-                    latitude=req.get("latitude"),
-                    longitude=req.get("longitude"),
-                    photo_url=req.get("photo_url"),
-                    status=req["status"],
-                    priority=req["priority"],
-                    assigned_to=req.get("assigned_to"),
-                    assigned_to_name=assigned_to_name,
-                    created_at=req["created_at"],
-                    updated_at=req["updated_at"]
-                )
-            )
-        return FaultRequestList(requests=request_responses, total=len(request_responses))
+        # Resolve all electrician names in one query
+        assigned_names = await resolve_assigned_names(db, requests)
+        
+        # Rows are the fetched documents themselves; the response model validates them once
+        request_rows = [
+            response_row(req, assigned_to_name=assigned_names.get(req.get("assigned_to")))
+            for req in requests
+        ]
+        
+        return {
+            "requests": request_rows,
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }
+    
+    try:
+        return await response_cache.respond(
+            request,
+            "electrician.my_assignments",
+            str(current_user.get("_id")),
+            [FAULT_REQUESTS_TAG],
+            settings.CACHE_TTL_LIST_SECONDS,
+            FaultRequestSummaryPage if view == "summary" else FaultRequestPage,
+            build
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -1,14 +1,39 @@
 from .auth import SignUpRequest, SignInRequest, UserResponse, TokenResponse, MessageResponse
-from .location import LocationUpdate, LocationResponse, LocationHistoryResponse
+from .location import (
+    LocationUpdate,
+    LocationFix,
+    LocationBatch,
+    LocationBatchResponse,
+    LocationResponse,
+    LocationHistoryResponse,
+    NearbyElectrician,
+    NearbyElectricianList,
+    CrewLocation,
+    CrewFeedEvent
+)
 from .fault_request import (
     CreateFaultRequest,
     FaultRequestResponse,
+    FaultRequestSummary,
     UpdateFaultRequestStatus,
-    FaultRequestList
+    FaultRequestList,
+    FaultRequestPage,
+    FaultRequestSummaryPage,
+    FaultRequestStats,
+    ClaimedFaultRequests,
+    NearbyFaultRequest,
+    NearbyFaultRequestList,
+    FaultCluster,
+    FaultTile
 )
 
 __all__ = [
     "SignUpRequest", "SignInRequest", "UserResponse", "TokenResponse", "MessageResponse", 
-    "LocationUpdate", "LocationResponse", "LocationHistoryResponse",
-    "CreateFaultRequest", "FaultRequestResponse", "UpdateFaultRequestStatus", "FaultRequestList"
+    "LocationUpdate", "LocationFix", "LocationBatch", "LocationBatchResponse",
+    "LocationResponse", "LocationHistoryResponse",
+    "NearbyElectrician", "NearbyElectricianList", "CrewLocation", "CrewFeedEvent",
+    "CreateFaultRequest", "FaultRequestResponse", "FaultRequestSummary", "UpdateFaultRequestStatus",
+    "FaultRequestList", "FaultRequestPage", "FaultRequestSummaryPage",
+    "FaultRequestStats", "ClaimedFaultRequests",
+    "NearbyFaultRequest", "NearbyFaultRequestList", "FaultCluster", "FaultTile"
 ]
@@ -37,6 +37,25 @@ class UserResponse(BaseModel):
         json_encoders = {
             datetime: lambda v: v.isoformat() if v else None
         }
+    
+    @classmethod
+    def from_document(cls, doc: dict):
+        """Build a response from a `users` document"""
+        return cls(
+            id=str(doc["_id"]),
+            email=doc["email"],
+            full_name=doc["full_name"],
+            role=doc["role"],
+            phone=doc.get("phone"),
+            company=doc.get("company"),
+            street_address=doc.get("street_address"),
+            city=doc.get("city"),
+            state=doc.get("state"),
+            postal_code=doc.get("postal_code"),
+            country=doc.get("country"),
+            is_active=doc.get("is_active", True),
+            created_at=doc["created_at"]
+        )
 
 class TokenResponse(BaseModel):
     """Token response schema"""
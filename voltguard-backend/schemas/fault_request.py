@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from typing import Dict, Optional, List, Union
 from datetime import datetime
 
 
@@ -28,6 +28,10 @@ class FaultRequestResponse(BaseModel):
     priority: str
     assigned_to: Optional[str] = None
     assigned_to_name: Optional[str] = None
+    version: int = Field(0, description="Changes on every status/assignment update")
+    parent_id: Optional[str] = Field(None, description="Incident this report duplicates, if detected")
+    duplicate_score: Optional[float] = Field(None, description="Text similarity to the parent incident")
+    duplicate_count: int = Field(0, description="Reports linked to this one as duplicates")
     created_at: datetime
     updated_at: datetime
     
@@ -36,15 +40,161 @@ class FaultRequestResponse(BaseModel):
             datetime: lambda v: v.isoformat() if v else None
         }
     )
+    
+    @classmethod
+    def from_document(cls, doc: dict, assigned_to_name: Optional[str] = None, **extra):
+        """Build a response from a MongoDB document"""
+        return cls(
+            id=str(doc["_id"]),
+            consumer_id=doc["consumer_id"],
+            title=doc["title"],
+            description=doc["description"],
+            location=doc["location"],
+            latitude=doc.get("latitude"),
+            longitude=doc.get("longitude"),
+            photo_url=doc.get("photo_url"),
+            status=doc["status"],
+            priority=doc["priority"],
+            assigned_to=doc.get("assigned_to"),
+            assigned_to_name=assigned_to_name,
+            version=doc.get("version", 0),
+            parent_id=doc.get("parent_id"),
+            duplicate_score=doc.get("duplicate_score"),
+            duplicate_count=doc.get("duplicate_count", 0),
+            created_at=doc["created_at"],
+            updated_at=doc["updated_at"],
+            **extra
+        )
+
+
+class FaultRequestSummary(BaseModel):
+    """Schema for a fault request in list views (no description, photo or coordinates)"""
+    id: str = Field(description="Request ID")
+    consumer_id: str
+    title: str
+    location: str
+    status: str
+    priority: str
+    assigned_to: Optional[str] = None
+    assigned_to_name: Optional[str] = None
+    parent_id: Optional[str] = None
+    duplicate_count: int = 0
+    created_at: datetime
+    updated_at: datetime
+    
+    @classmethod
+    def from_document(cls, doc: dict, assigned_to_name: Optional[str] = None):
+        """Build a summary from a MongoDB document"""
+        return cls(
+            id=str(doc["_id"]),
+            consumer_id=doc["consumer_id"],
+            title=doc["title"],
+            location=doc["location"],
+            status=doc["status"],
+            priority=doc["priority"],
+            assigned_to=doc.get("assigned_to"),
+            assigned_to_name=assigned_to_name,
+            parent_id=doc.get("parent_id"),
+            duplicate_count=doc.get("duplicate_count", 0),
+            created_at=doc["created_at"],
+            updated_at=doc["updated_at"]
+        )
+
+
+class NearbyFaultRequest(FaultRequestResponse):
+    """Schema for a fault request found by a proximity search"""
+    distance_km: float = Field(description="Distance from the search point in kilometres")
 
 
 class UpdateFaultRequestStatus(BaseModel):
     """Schema for updating fault request status"""
     status: str = Field(..., description="New status: open, assigned, in_progress, resolved, closed")
     assigned_to: Optional[str] = Field(None, description="Electrician ID to assign")
+    expected_status: Optional[str] = Field(None, description="Only update if the request still has this status")
+    expected_version: Optional[int] = Field(
+        None, description="Only update if the request is still at this version (required to take over another electrician's request)"
+    )
 
 
 class FaultRequestList(BaseModel):
-    """Schema for fault request list"""
+    """Schema for one page of fault requests (summaries when view=summary)"""
+    requests: List[Union[FaultRequestResponse, FaultRequestSummary]]
+    total: Optional[int] = Field(None, description="Matching requests (omitted when count=none)")
+    total_is_estimate: bool = Field(False, description="Whether total is an estimate")
+    limit: Optional[int] = Field(None, description="Page size used for this page")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page, null on the last page")
+
+
+class ClaimedFaultRequests(BaseModel):
+    """Schema for the requests assigned by a claim-next call"""
     requests: List[FaultRequestResponse]
     total: int
+
+
+class NearbyFaultRequestList(BaseModel):
+    """Schema for fault requests sorted by distance"""
+    requests: List[NearbyFaultRequest]
+    total: int
+
+
+class FaultRequestPage(FaultRequestList):
+    """FaultRequestList narrowed to full rows (same JSON, no union dispatch per row)"""
+    requests: List[FaultRequestResponse]
+
+
+class FaultRequestSummaryPage(FaultRequestList):
+    """FaultRequestList narrowed to summary rows (same JSON, no union dispatch per row)"""
+    requests: List[FaultRequestSummary]
+
+
+class FaultRequestStats(BaseModel):
+    """Schema for the electrician dashboard counters"""
+    total: int = 0
+    by_status: Dict[str, int] = Field(default_factory=dict)
+    by_priority: Dict[str, int] = Field(default_factory=dict)
+    by_electrician: Dict[str, Dict[str, int]] = Field(
+        default_factory=dict, description="Per electrician ID, counts by status"
+    )
+    mean_time_to_assign_seconds: Optional[float] = Field(
+        None, description="Mean time from creation to first assignment"
+    )
+    reconciled_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    @classmethod
+    def from_document(cls, doc: Optional[dict]):
+        """Build a response from the counters document (empty counters if it does not exist yet)"""
+        if not doc:
+            return cls()
+        assignments = doc.get("assignments", 0)
+        return cls(
+            total=doc.get("total", 0),
+            by_status=doc.get("by_status", {}),
+            by_priority=doc.get("by_priority", {}),
+            by_electrician=doc.get("by_electrician", {}),
+            mean_time_to_assign_seconds=(
+                doc.get("time_to_assign_seconds", 0) / assignments if assignments else None
+            ),
+            reconciled_at=doc.get("reconciled_at"),
+            updated_at=doc.get("updated_at")
+        )
+
+
+class FaultCluster(BaseModel):
+    """Schema for the fault requests in one cell of a map tile"""
+    quadkey: str = Field(description="Quadkey of the cell")
+    count: int
+    latitude: float = Field(description="Mean latitude of the requests in the cell")
+    longitude: float = Field(description="Mean longitude of the requests in the cell")
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+
+
+class FaultTile(BaseModel):
+    """Schema for a map tile of clustered fault requests"""
+    z: int
+    x: int
+    y: int
+    quadkey: str
+    clusters: List[FaultCluster]
+    total: int
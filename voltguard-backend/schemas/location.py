@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, RootModel
 from typing import Optional
 from datetime import datetime
 
@@ -12,6 +12,24 @@ class LocationUpdate(BaseModel):
     is_sharing: Optional[bool] = Field(True, description="Whether location is being shared")
 
 
+class LocationFix(LocationUpdate):
+    """Schema for a fix buffered on the device"""
+    timestamp: datetime = Field(..., description="When the device recorded the fix")
+
+
+class LocationBatch(RootModel[list[LocationFix]]):
+    """Schema for a batch upload: a JSON array of fixes"""
+
+
+class LocationBatchResponse(BaseModel):
+    """Schema for the outcome of a batch upload"""
+    received: int
+    duplicates: int
+    rejected: int
+    stored: int
+    latest: Optional[datetime] = None
+
+
 class LocationResponse(BaseModel):
     """Schema for location response"""
     user_id: str
@@ -22,9 +40,72 @@ class LocationResponse(BaseModel):
     is_sharing: bool
     created_at: datetime
     updated_at: datetime
+    
+    @classmethod
+    def from_document(cls, doc: dict):
+        """Build a response from a `consumer_locations` document"""
+        return cls(
+            user_id=doc["user_id"],
+            latitude=doc["latitude"],
+            longitude=doc["longitude"],
+            accuracy=doc.get("accuracy"),
+            altitude=doc.get("altitude"),
+            is_sharing=doc["is_sharing"],
+            created_at=doc["created_at"],
+            updated_at=doc["updated_at"]
+        )
+    
+    @classmethod
+    def from_history_fix(cls, user_id: str, fix: dict):
+        """Build a response from a fix stored in a history bucket"""
+        return cls(
+            user_id=user_id,
+            latitude=fix["lat"],
+            longitude=fix["lon"],
+            accuracy=fix.get("acc"),
+            altitude=fix.get("alt"),
+            is_sharing=fix.get("sh", True),
+            created_at=fix["t"],
+            updated_at=fix["t"]
+        )
 
 
 class LocationHistoryResponse(BaseModel):
     """Schema for location history"""
     locations: list[LocationResponse]
     total: int
+    has_more: bool = False
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    resolution_seconds: int = 0
+
+
+class NearbyElectrician(BaseModel):
+    """Schema for an electrician found by a proximity search"""
+    user_id: str
+    full_name: str
+    latitude: float
+    longitude: float
+    distance_km: float
+    updated_at: datetime
+
+
+class NearbyElectricianList(BaseModel):
+    """Schema for electricians sorted by distance"""
+    electricians: list[NearbyElectrician]
+    total: int
+
+
+class CrewLocation(BaseModel):
+    """Schema for a sharing user's position on the live crew map"""
+    user_id: str
+    latitude: float
+    longitude: float
+    accuracy: Optional[float] = None
+    updated_at: datetime
+
+
+class CrewFeedEvent(BaseModel):
+    """Schema for a live crew map event: moved or new users, and users that left the box"""
+    locations: list[CrewLocation]
+    removed: list[str] = []
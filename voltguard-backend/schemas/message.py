@@ -14,6 +14,21 @@ class MessageResponse(BaseModel):
     content: str
     created_at: datetime
 
+    @classmethod
+    def from_document(cls, doc: dict):
+        """Build a response from a `messages` document"""
+        return cls(
+            id=str(doc["_id"]),
+            request_id=doc["request_id"],
+            sender_id=doc["sender_id"],
+            sender_type=doc["sender_type"],
+            content=doc["content"],
+            created_at=doc["created_at"],
+        )
+
 class MessagesListResponse(BaseModel):
     messages: list[MessageResponse]
     total: int
+    has_more: bool = False
+    oldest_id: Optional[str] = None
+    newest_id: Optional[str] = None
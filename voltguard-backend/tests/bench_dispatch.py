@@ -0,0 +1,43 @@
+"""solve_assignments at dispatch batch size: 10k faults against 2k crews"""
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from config import settings
+from tests.benchmarks import per_call, report
+from utils.dispatch import solve_assignments
+
+pytestmark = pytest.mark.bench
+
+FAULTS = 10_000
+CREWS = 2_000
+
+
+def city(rng: random.Random, count: int, make) -> list:
+    # Spread over roughly 100 km x 100 km around Chennai
+    return [make(index, 12.6 + rng.random() * 0.9, 79.8 + rng.random() * 0.9) for index in range(count)]
+
+
+def test_solve_10k_faults_by_2k_crews_under_a_second():
+    rng = random.Random(18)
+    now = datetime.utcnow()
+    faults = city(rng, FAULTS, lambda index, lat, lon: {
+        "_id": ObjectId(), "latitude": lat, "longitude": lon,
+        "priority_rank": rng.randint(1, 4), "created_at": now - timedelta(minutes=rng.randrange(600))
+    })
+    crews = city(rng, CREWS, lambda index, lat, lon: {
+        "user_id": f"crew{index}", "latitude": lat, "longitude": lon,
+        "capacity": settings.DISPATCH_CREW_CAPACITY
+    })
+
+    seconds = per_call(lambda: solve_assignments(faults, crews, settings.DISPATCH_MAX_DISTANCE_KM, now), repeat=3)
+    assignments = solve_assignments(faults, crews, settings.DISPATCH_MAX_DISTANCE_KM, now)
+    report(f"solve_assignments {FAULTS}x{CREWS}", seconds=seconds, assigned=len(assignments))
+
+    per_crew = Counter(crew["user_id"] for _, crew, _ in assignments)
+    assert max(per_crew.values()) <= settings.DISPATCH_CREW_CAPACITY
+    assert len({fault["_id"] for fault, _, _ in assignments}) == len(assignments)
+    # Greedy over the nearest few crews per fault: nearly, not perfectly, full
+    assert len(assignments) >= 0.95 * min(FAULTS, CREWS * settings.DISPATCH_CREW_CAPACITY)
+    assert seconds < 1.0
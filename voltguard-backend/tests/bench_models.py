@@ -0,0 +1,60 @@
+"""Per-row cost of model conversion and list-response building for 10k documents"""
+from datetime import datetime
+import pytest
+from models import FaultRequest, User
+from models.base import response_row
+from schemas import FaultRequestPage, FaultRequestResponse
+from tests.benchmarks import per_call, report
+
+pytestmark = pytest.mark.bench
+
+ROWS = 10_000
+
+
+def documents() -> list:
+    now = datetime.utcnow()
+    return [
+        FaultRequest(
+            consumer_id="c" * 24, title=f"Fault {index}", description="Transformer humming loudly",
+            location="Main road", latitude=13.0 + index / 1e5, longitude=80.0, priority="high",
+            created_at=now, updated_at=now
+        ).to_dict()
+        for index in range(ROWS)
+    ]
+
+
+def page(rows: list) -> dict:
+    return {"requests": rows, "total": len(rows), "total_is_estimate": False, "limit": len(rows), "next_cursor": None}
+
+
+def test_models_have_no_instance_dict():
+    for model in (FaultRequest("c", "t", "d", "l"), User("a@b.c", "x", "A")):
+        assert not hasattr(model, "__dict__")
+
+
+def test_dict_conversion_per_row():
+    docs = documents()
+    from_dict = per_call(lambda: [FaultRequest.from_dict(doc) for doc in docs])
+    models = [FaultRequest.from_dict(doc) for doc in docs]
+    to_dict = per_call(lambda: [model.to_dict() for model in models])
+    report("FaultRequest.from_dict", us_per_row=from_dict / ROWS * 1e6)
+    report("FaultRequest.to_dict", us_per_row=to_dict / ROWS * 1e6)
+
+
+def test_response_rows_beat_per_row_models():
+    docs = documents()
+
+    def per_row_models():
+        # The pre-slots path: a response model per document, then the list model
+        rows = [FaultRequestResponse.from_document(doc) for doc in docs]
+        FaultRequestPage.model_validate(page([row.model_dump() for row in rows]))
+
+    def in_place_rows():
+        rows = [response_row(dict(doc)) for doc in docs]
+        FaultRequestPage.model_validate(page(rows))
+
+    models = per_call(per_row_models, repeat=3)
+    rows = per_call(in_place_rows, repeat=3)
+    report("list of 10k via per-row models", us_per_row=models / ROWS * 1e6)
+    report("list of 10k via response_row", us_per_row=rows / ROWS * 1e6, speedup=models / rows)
+    assert rows < models
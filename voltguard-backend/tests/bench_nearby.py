@@ -0,0 +1,63 @@
+"""Nearby open faults over 1M requests on a real mongod (set BENCH_MONGODB_URL)"""
+import asyncio
+import random
+import time
+from datetime import datetime
+import pytest
+from models import FaultRequest
+from models.indexes import ensure_indexes
+from repositories import FaultRequestRepository
+from tests.benchmarks import median, mongod_database, percentile, report
+
+pytestmark = pytest.mark.bench
+
+REQUESTS = 1_000_000
+BATCH = 50_000
+QUERIES = 200
+RADIUS_KM = 5
+LIMIT = 50
+
+
+def batch(rng: random.Random, count: int) -> list:
+    now = datetime.utcnow()
+    # About 100 requests per square kilometre over a 100 km x 100 km region
+    return [
+        FaultRequest(
+            consumer_id="c" * 24, title="Fault", description="Line down", location="Main road",
+            latitude=12.6 + rng.random() * 0.9, longitude=79.8 + rng.random() * 0.9,
+            status=rng.choice(["open", "open", "assigned", "resolved"]), created_at=now, updated_at=now
+        ).to_dict()
+        for _ in range(count)
+    ]
+
+
+async def run_nearby():
+    rng = random.Random(8)
+    async with mongod_database() as db:
+        await ensure_indexes(db)
+        for _ in range(REQUESTS // BATCH):
+            await db.fault_requests.insert_many(batch(rng, BATCH), ordered=False)
+
+        repository = FaultRequestRepository(db)
+        timings, results = [], []
+        for _ in range(QUERIES):
+            latitude, longitude = 12.7 + rng.random() * 0.7, 79.9 + rng.random() * 0.7
+            started = time.perf_counter()
+            rows = await repository.nearby(latitude, longitude, RADIUS_KM, "open", LIMIT)
+            timings.append(time.perf_counter() - started)
+            results.append(rows)
+        return timings, results
+
+
+def test_nearby_over_a_million_requests_under_10ms():
+    timings, results = asyncio.run(run_nearby())
+    report(
+        f"nearby {RADIUS_KM} km, limit {LIMIT}, over {REQUESTS} requests",
+        p50_ms=median(timings) * 1e3, p99_ms=percentile(timings, 0.99) * 1e3
+    )
+    for rows in results:
+        distances = [row["distance"] for row in rows]
+        assert len(rows) == LIMIT
+        assert distances == sorted(distances) and distances[-1] <= RADIUS_KM * 1000
+        assert all(row["status"] == "open" for row in rows)
+    assert median(timings) < 0.010
@@ -0,0 +1,83 @@
+"""
+Latency of other requests while signins burst, with bcrypt on the worker pool vs inline
+
+The signins are generated in the same process, so even with the pool the
+probes share the event loop (and the GIL) with the signins' own request
+handling; what the pool removes is waiting behind bcrypt itself.
+"""
+import asyncio
+import time
+import httpx
+import pytest
+import routes.auth as auth_routes
+from config import settings
+from tests.benchmarks import median, per_call, percentile, report
+from tests.conftest import auth_headers, create_fault_requests, create_user
+from utils.auth import PasswordHasher, hash_password, verify_password
+
+pytestmark = pytest.mark.bench
+
+ROUNDS = 8
+PROBES = 100
+BURST = 10
+PASSWORD = "correct horse battery staple"
+
+
+async def probe_latencies(client, email: str, headers: dict, burst: bool) -> list:
+    """Time sequential list requests, optionally while bursts of signins run alongside"""
+    transport = httpx.ASGITransport(app=client.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        async def signins():
+            while True:
+                responses = await asyncio.gather(*(
+                    http.post("/api/auth/signin", json={"email": email, "password": PASSWORD})
+                    for _ in range(BURST)
+                ))
+                assert all(response.status_code == 200 for response in responses)
+
+        burster = asyncio.create_task(signins()) if burst else None
+        await asyncio.sleep(0.05)
+        latencies = []
+        for _ in range(PROBES):
+            started = time.perf_counter()
+            response = await http.get("/api/consumer/fault-requests", headers=headers, params={"limit": 10})
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+        if burster:
+            burster.cancel()
+        return latencies
+
+
+def test_signin_bursts_do_not_raise_p99_of_other_requests(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", ROUNDS)
+    password_hash = hash_password(PASSWORD, ROUNDS)
+    signer = create_user(db, "burst@example.com")
+    asyncio.run(db["users"].update_one({"_id": signer["_id"]}, {"$set": {"password_hash": password_hash}}))
+    consumer = create_user(db, "consumer@example.com")
+    create_fault_requests(db, consumer, [], 20)
+    headers = auth_headers(consumer)
+
+    def probe(burst: bool, inline: bool) -> list:
+        hasher = PasswordHasher("thread", max_workers=2, max_queue=1000)
+        if inline:
+            # The pre-pool behaviour: bcrypt runs on the event loop
+            async def run_inline(func, *args):
+                return func(*args)
+            monkeypatch.setattr(hasher, "_run", run_inline)
+        monkeypatch.setattr(auth_routes, "password_hasher", hasher)
+        try:
+            return asyncio.run(probe_latencies(client, signer["email"], headers, burst))
+        finally:
+            hasher.shutdown()
+
+    quiet = probe(burst=False, inline=False)
+    pooled = probe(burst=True, inline=False)
+    inline = probe(burst=True, inline=True)
+    for name, latencies in (("quiet", quiet), ("signin burst, pool", pooled), ("signin burst, inline", inline)):
+        report(f"list requests, {name}", p50_ms=median(latencies) * 1e3, p99_ms=percentile(latencies, 0.99) * 1e3)
+
+    one_verify = per_call(lambda: verify_password(PASSWORD, password_hash), repeat=3)
+    report("bcrypt verify", rounds=ROUNDS, ms=one_verify * 1e3)
+    # Inline, a probe can wait behind a whole burst of verifies
+    assert percentile(inline, 0.99) > BURST * one_verify
+    assert percentile(pooled, 0.99) * 5 < percentile(inline, 0.99)
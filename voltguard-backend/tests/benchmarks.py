@@ -0,0 +1,57 @@
+"""Helpers for the benchmarks in tests/bench_*.py (run with `pytest --bench -s`)"""
+import os
+import statistics
+import time
+from contextlib import asynccontextmanager
+import pytest
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+# Benchmarks that need a real server create and drop a throwaway database here
+BENCH_MONGODB_URL = os.getenv("BENCH_MONGODB_URL", "mongodb://localhost:27017")
+
+
+def per_call(func, repeat: int = 5) -> float:
+    """Best-of-`repeat` wall time of `func()` in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def percentile(samples: list, fraction: float) -> float:
+    """The `fraction` quantile of `samples` (e.g. 0.99 for p99)"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(name: str, **figures):
+    """Print one result line, e.g. `report("to_dict", us_per_row=1.2)`"""
+    print(f"\n[bench] {name}: " + ", ".join(
+        f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in figures.items()
+    ))
+
+
+def median(samples: list) -> float:
+    return statistics.median(samples)
+
+
+@asynccontextmanager
+async def mongod_database():
+    """A fresh database on BENCH_MONGODB_URL, dropped afterwards; skips when no server answers"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(BENCH_MONGODB_URL, serverSelectionTimeoutMS=1000)
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"no mongod at {BENCH_MONGODB_URL}")
+    db = client[f"voltguard_bench_{ObjectId()}"]
+    try:
+        yield db
+    finally:
+        await client.drop_database(db.name)
+        client.close()
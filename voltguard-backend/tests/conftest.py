@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import database
+from database import get_db
+from models import FaultRequest, User
+from routes import auth_router, chat_router, consumer_router, electrician_router
+from tests.fakes import CountingDatabase
+from utils import create_access_token
+from utils.auth import principal_cache
+
+
+def pytest_addoption(parser):
+    parser.addoption("--bench", action="store_true", help="also run the benchmarks in tests/bench_*.py")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--bench"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; run with --bench")
+    for item in items:
+        if "bench" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def db():
+    return CountingDatabase()
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    # Handlers that call get_db() directly see the same database
+    monkeypatch.setattr(database, "_database", db)
+    app = FastAPI()
+    for router in (auth_router, consumer_router, electrician_router, chat_router):
+        app.include_router(router)
+    app.dependency_overrides[get_db] = lambda: db
+    principal_cache.clear()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def auth_headers(user: dict) -> dict:
+    """Headers with a token for `user`, already in the principal cache like a warm token"""
+    token = create_access_token(str(user["_id"]), user["email"], user["role"])
+    principal_cache.put(token, {"_id": str(user["_id"]), "email": user["email"], "role": user["role"]})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_user(db, email: str, role: str = "consumer", full_name: str = None) -> dict:
+    user = User(
+        email=email,
+        password_hash="unused",
+        full_name=full_name or email.split("@")[0].title(),
+        role=role
+    ).to_dict()
+    asyncio.run(db["users"].insert_one(user))
+    return user
+
+
+def create_fault_requests(db, consumer: dict, electricians: list, count: int) -> list:
+    """Insert `count` open fault requests, assigned round-robin to `electricians`"""
+    now = datetime.utcnow()
+    documents = []
+    for index in range(count):
+        document = FaultRequest(
+            consumer_id=str(consumer["_id"]),
+            title=f"Fault {index}",
+            description="Transformer humming loudly",
+            location="Main road",
+            priority="high",
+            latitude=13.0 + index / 1000,
+            longitude=80.0
+        ).to_dict()
+        document["created_at"] = now - timedelta(seconds=index)
+        if electricians:
+            document["status"] = "assigned"
+            document["assigned_to"] = str(electricians[index % len(electricians)]["_id"])
+        documents.append(document)
+    asyncio.run(db["fault_requests"].insert_many(documents))
+    return documents
@@ -0,0 +1,140 @@
+import math
+from collections import Counter
+from mongomock_motor import AsyncMongoMockClient
+
+# Mean Earth radius MongoDB uses for spherical distances
+EARTH_RADIUS_M = 6378100
+
+# Aggregation operators mongomock lacks, mapped to an equivalent it has
+OPERATOR_ALIASES = {"$substrBytes": "$substr"}
+
+
+def _with_aliases(value):
+    if isinstance(value, dict):
+        return {OPERATOR_ALIASES.get(key, key): _with_aliases(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_with_aliases(item) for item in value]
+    return value
+
+# Collection methods that each cost one round trip to MongoDB
+QUERY_METHODS = {
+    "find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one", "delete_one",
+    "delete_many", "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+    "bulk_write"
+}
+
+
+class CountingCollection:
+    """Motor collection stand-in that records every query it is asked to run"""
+
+    def __init__(self, collection, calls: Counter, log: list):
+        self._collection = collection
+        self._calls = calls
+        self._log = log
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in QUERY_METHODS:
+            return attribute
+
+        def counted(*args, **kwargs):
+            self._calls[(self._collection.name, name)] += 1
+            self._log.append((self._collection.name, name, args))
+            if name == "aggregate" and args:
+                args = (_with_aliases(args[0]), *args[1:])
+            if name in ("find", "find_one"):
+                # mongomock adds `_id` to the projection it is given; pymongo leaves shared constants alone
+                if len(args) > 1 and isinstance(args[1], dict):
+                    args = (args[0], dict(args[1]), *args[2:])
+                if isinstance(kwargs.get("projection"), dict):
+                    kwargs["projection"] = dict(kwargs["projection"])
+            return attribute(*args, **kwargs)
+        return counted
+
+
+class CountingDatabase:
+    """
+    In-memory Motor database that counts queries per collection and method
+
+    `calls` maps `(collection, method)` to the number of calls since the
+    last `reset()`; `queries(collection)` sums them for one collection.
+    `log` lists the calls in order as `(collection, method, args)`.
+    """
+
+    def __init__(self):
+        self._db = AsyncMongoMockClient()["voltguard_test"]
+        self.calls = Counter()
+        self.log = []
+
+    def __getitem__(self, name: str) -> CountingCollection:
+        return CountingCollection(self._db[name], self.calls, self.log)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def reset(self):
+        self.calls.clear()
+        self.log.clear()
+
+    def queries(self, collection: str = None) -> int:
+        return sum(
+            count for (name, _), count in self.calls.items()
+            if collection is None or name == collection
+        )
+
+
+def spherical_distance(a: list, b: list) -> float:
+    """Great-circle distance in metres between two `[longitude, latitude]` pairs"""
+    longitude_a, latitude_a, longitude_b, latitude_b = map(math.radians, (*a, *b))
+    h = (
+        math.sin((latitude_b - latitude_a) / 2) ** 2
+        + math.cos(latitude_a) * math.cos(latitude_b) * math.sin((longitude_b - longitude_a) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+class GeoNearCursor:
+    def __init__(self, collection, pipeline: list):
+        self._collection = collection
+        self._pipeline = pipeline
+
+    async def to_list(self, length):
+        stage = self._pipeline[0]["$geoNear"]
+        near = stage["near"]["coordinates"]
+        matches = []
+        async for document in self._collection.find(stage.get("query", {})):
+            point = document.get(stage["key"])
+            if not point:
+                continue
+            distance = spherical_distance(near, point["coordinates"])
+            if distance <= stage.get("maxDistance", math.inf):
+                matches.append({**document, stage["distanceField"]: distance})
+        matches.sort(key=lambda document: document[stage["distanceField"]])
+
+        # The remaining stages run on a scratch collection holding the sorted matches
+        scratch = AsyncMongoMockClient()["geo_near"]["matches"]
+        if matches:
+            await scratch.insert_many(matches)
+        rest = [{"$sort": {stage["distanceField"]: 1}}] + self._pipeline[1:]
+        return await scratch.aggregate(rest).to_list(length)
+
+
+class GeoNearCollection:
+    """
+    Collection wrapper that runs `$geoNear` pipelines, which mongomock lacks
+
+    Only a leading `$geoNear` stage with `near`, `key`, `distanceField`,
+    `maxDistance` and `query` is understood; later stages go to mongomock.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def aggregate(self, pipeline: list):
+        if pipeline and "$geoNear" in pipeline[0]:
+            return GeoNearCursor(self._collection, pipeline)
+        return self._collection.aggregate(pipeline)
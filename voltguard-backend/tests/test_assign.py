@@ -0,0 +1,52 @@
+import asyncio
+import httpx
+from bson import ObjectId
+from tests.conftest import auth_headers, create_fault_requests, create_user
+
+
+def assign_concurrently(client, request_id, crews: list, body: dict) -> list:
+    """PUT the same assignment for every crew at once; responses in crew order"""
+    async def assign_all():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.put(f"/api/electrician/fault-request/{request_id}/assign", headers=auth_headers(crew), json=body)
+                for crew in crews
+            ))
+    return asyncio.run(assign_all())
+
+
+def test_same_expected_version_assigns_exactly_once(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    crews = [create_user(db, f"crew{index}@example.com", role="electrician") for index in range(2)]
+    request_id = str(create_fault_requests(db, consumer, [], 1)[0]["_id"])
+    version = client.get(f"/api/electrician/fault-request/{request_id}", headers=auth_headers(crews[0])).json()["version"]
+
+    responses = assign_concurrently(client, request_id, crews, {"status": "assigned", "expected_version": version})
+
+    assert sorted(response.status_code for response in responses) == [200, 409]
+    winner = crews[[response.status_code for response in responses].index(200)]
+    conflict = next(response for response in responses if response.status_code == 409)
+    # The loser is told who holds the request now
+    assert str(winner["_id"]) in conflict.json()["detail"]
+    assert f"version {version + 1}" in conflict.json()["detail"]
+
+    stored = asyncio.run(db["fault_requests"].find_one({"_id": ObjectId(request_id)}))
+    assert stored["assigned_to"] == str(winner["_id"])
+    assert stored["version"] == version + 1
+
+
+def test_without_version_only_unassigned_or_own_requests_are_taken(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    crews = [create_user(db, f"crew{index}@example.com", role="electrician") for index in range(2)]
+    request_id = str(create_fault_requests(db, consumer, [], 1)[0]["_id"])
+
+    responses = assign_concurrently(client, request_id, crews, {"status": "assigned"})
+    assert sorted(response.status_code for response in responses) == [200, 409]
+    winner, loser = (crews if responses[0].status_code == 200 else crews[::-1])
+
+    path = f"/api/electrician/fault-request/{request_id}/assign"
+    # The holder can move its own request on; the other crew still cannot take it
+    assert client.put(path, headers=auth_headers(winner), json={"status": "in_progress"}).status_code == 200
+    assert client.put(path, headers=auth_headers(loser), json={"status": "in_progress"}).status_code == 409
+
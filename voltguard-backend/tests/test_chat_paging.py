@@ -0,0 +1,85 @@
+import asyncio
+from bson import ObjectId
+from config import settings
+from models import Message
+from tests.conftest import auth_headers, create_fault_requests, create_user
+from utils.chat_hub import ChatHub
+
+
+def same_second_earlier(message_id: ObjectId) -> ObjectId:
+    """An id from another worker in the same second that sorts before `message_id`"""
+    return ObjectId(message_id.binary[:4] + bytes(8))
+
+
+def message(request_id, sender: dict, content: str, _id: ObjectId = None) -> dict:
+    return Message(
+        request_id=str(request_id), sender_id=str(sender["_id"]), sender_type="consumer",
+        content=content, _id=_id
+    ).to_dict()
+
+
+def test_after_id_with_overlap_returns_messages_that_sort_before_it(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    request_id = create_fault_requests(db, consumer, [], 1)[0]["_id"]
+    first = message(request_id, consumer, "first")
+    asyncio.run(db["messages"].insert_one(first))
+
+    path = f"/api/chat/request/{request_id}"
+    seen = client.get(path, headers=auth_headers(consumer)).json()
+    assert seen["newest_id"] == str(first["_id"])
+
+    # Committed after `first` but with an id that sorts before it
+    late = message(request_id, consumer, "late", _id=same_second_earlier(first["_id"]))
+    asyncio.run(db["messages"].insert_one(late))
+
+    delta = client.get(
+        path, headers=auth_headers(consumer), params={"after_id": seen["newest_id"], "overlap": "true"}
+    ).json()
+    assert [row["id"] for row in delta["messages"]] == [str(late["_id"])]
+    assert delta["newest_id"] == str(first["_id"])
+    assert delta["has_more"] is False
+
+
+
+def test_poll_with_nothing_new_is_empty(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    request_id = create_fault_requests(db, consumer, [], 1)[0]["_id"]
+    headers = auth_headers(consumer)
+    for index in range(5):
+        client.post("/api/chat/send", headers=headers, json={"request_id": str(request_id), "content": f"Update {index}"})
+
+    path = f"/api/chat/request/{request_id}"
+    newest_id = client.get(path, headers=headers).json()["newest_id"]
+    delta = client.get(path, headers=headers, params={"after_id": newest_id}).json()
+    assert delta["messages"] == []
+    assert delta["newest_id"] == newest_id
+
+    # The overlap is bounded by the page size, keeping the messages closest to the cursor
+    delta = client.get(path, headers=headers, params={"after_id": newest_id, "overlap": "true", "limit": 2}).json()
+    assert [row["content"] for row in delta["messages"]] == ["Update 2", "Update 3"]
+
+
+def test_polling_hub_delivers_out_of_order_ids_once(db, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_POLL_INTERVAL_SECONDS", 0.01)
+    consumer = {"_id": ObjectId()}
+
+    async def follow():
+        hub = ChatHub()
+        hub._db = db
+        queue = hub.subscribe("room")
+        poller = asyncio.create_task(hub._poll())
+        try:
+            first = message("room", consumer, "first")
+            await db["messages"].insert_one(first)
+            await asyncio.sleep(0.05)
+            late = message("room", consumer, "late", _id=same_second_earlier(first["_id"]))
+            await db["messages"].insert_one(late)
+            await asyncio.sleep(0.05)
+        finally:
+            poller.cancel()
+        received = []
+        while not queue.empty():
+            received.append(queue.get_nowait()["content"])
+        return received
+
+    assert asyncio.run(follow()) == ["first", "late"]
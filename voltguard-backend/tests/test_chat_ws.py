@@ -0,0 +1,68 @@
+import asyncio
+import time
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from config import settings
+from models import Message
+from tests.conftest import auth_headers, create_fault_requests, create_user
+from utils.chat_hub import ChatHub, chat_hub
+
+
+def token(user: dict) -> str:
+    return auth_headers(user)["Authorization"].split()[1]
+
+
+def message(request_id, content: str) -> dict:
+    return Message(request_id=str(request_id), sender_id="s", sender_type="consumer", content=content).to_dict()
+
+
+def test_websocket_pushes_messages_for_its_room_only(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    request_id, other_id = (str(doc["_id"]) for doc in create_fault_requests(db, consumer, [], 2))
+
+    with client.websocket_connect(f"/api/chat/ws/{request_id}?token={token(consumer)}") as websocket:
+        # The hub runs on the app's event loop
+        client.portal.call(chat_hub.publish, message(other_id, "Elsewhere"))
+        client.portal.call(chat_hub.publish, message(request_id, "Crew on the way"))
+        pushed = websocket.receive_json()
+    assert pushed["content"] == "Crew on the way"
+    assert pushed["request_id"] == request_id
+    # The handler unsubscribes once it sees the disconnect
+    for _ in range(100):
+        if request_id not in chat_hub.rooms:
+            break
+        time.sleep(0.01)
+    assert request_id not in chat_hub.rooms
+
+
+@pytest.mark.parametrize("who", ["stranger", "no token"])
+def test_websocket_rejects_non_participants(client, db, who):
+    consumer = create_user(db, "consumer@example.com")
+    stranger = create_user(db, "stranger@example.com")
+    request_id = str(create_fault_requests(db, consumer, [], 1)[0]["_id"])
+    query = f"?token={token(stranger)}" if who == "stranger" else ""
+
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(f"/api/chat/ws/{request_id}{query}") as websocket:
+            websocket.receive_json()
+    assert closed.value.code == 1008
+
+
+def test_polling_fallback_delivers_each_message_once(db, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_POLL_INTERVAL_SECONDS", 0.01)
+
+    async def follow():
+        hub = ChatHub()
+        hub._db = db
+        queue = hub.subscribe("room")
+        task = asyncio.create_task(hub._poll())
+        await db["messages"].insert_one(message("room", "First"))
+        await db["messages"].insert_one(message("elsewhere", "Not for us"))
+        await asyncio.sleep(0.05)
+        await db["messages"].insert_one(message("room", "Second"))
+        # Several polls re-read the overlap window
+        await asyncio.sleep(0.1)
+        task.cancel()
+        return [queue.get_nowait()["content"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(follow()) == ["First", "Second"]
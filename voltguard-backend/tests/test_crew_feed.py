@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timedelta
+from pymongo.errors import AutoReconnect, OperationFailure
+from config import settings
+from models import Location
+from repositories import LocationRepository
+from utils.crew_feed import CrewFeed
+
+CHANGE_STREAM_HISTORY_LOST = 286
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    async def to_list(self, length):
+        return list(self._docs)
+
+
+class FakeStream:
+    """Delivers one change, then fails as if the connection dropped"""
+
+    resume_token = {"_data": "token"}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._changes()
+
+    async def _changes(self):
+        yield {"fullDocument": {
+            "user_id": "crew", "latitude": 13.0, "longitude": 80.0, "is_sharing": True,
+            "updated_at": datetime.utcnow()
+        }}
+        raise AutoReconnect("connection reset")
+
+
+class FakeLocations:
+    def __init__(self):
+        self.resume_tokens = []
+
+    def find(self, *args, **kwargs):
+        return FakeCursor([])
+
+    def watch(self, pipeline, full_document=None, resume_after=None):
+        self.resume_tokens.append(resume_after)
+        if resume_after is not None:
+            raise OperationFailure("resume point no longer in the oplog", code=CHANGE_STREAM_HISTORY_LOST)
+        return FakeStream()
+
+
+def test_lost_resume_token_starts_a_fresh_stream(monkeypatch):
+    monkeypatch.setattr(settings, "CREW_FEED_POLL_SECONDS", 0.01)
+    locations = FakeLocations()
+
+    async def follow():
+        crew_feed = CrewFeed()
+        crew_feed._db = {"consumer_locations": locations}
+        task = asyncio.create_task(crew_feed._watch())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        return crew_feed
+
+    crew_feed = asyncio.run(follow())
+    # Resumed once with the token, then reopened without it instead of failing forever
+    assert locations.resume_tokens[:3] == [None, FakeStream.resume_token, None]
+    assert crew_feed.published >= 2
+
+
+def fix(user_id: str, latitude: float, **fields) -> dict:
+    return {"user_id": user_id, "latitude": latitude, "longitude": 80.0, "is_sharing": True, **fields}
+
+
+def test_reload_sends_removals_and_missed_moves(db):
+    crew_feed = CrewFeed()
+    crew_feed._db = db
+    for user_id, latitude in (("stays", 13.1), ("moves", 13.2), ("stops", 13.3)):
+        crew_feed.publish(fix(user_id, latitude))
+    subscriber = crew_feed.subscribe(13.0, 79.5, 14.0, 80.5)
+    crew_feed.snapshot(subscriber)
+
+    # What changed while the stream was down
+    asyncio.run(db["consumer_locations"].insert_many([
+        fix("stays", 13.1), fix("moves", 13.4), fix("stops", 13.3, is_sharing=False), fix("joins", 13.5)
+    ]))
+    asyncio.run(crew_feed._load())
+
+    assert set(crew_feed.locations) == {"stays", "moves", "joins"}
+    assert set(subscriber.pending) == {"moves", "joins"}
+    assert subscriber.pending["moves"]["latitude"] == 13.4
+    assert subscriber.removed == {"stops"}
+
+
+def test_polling_follows_server_write_time_not_fix_time(db, monkeypatch):
+    monkeypatch.setattr(settings, "CREW_FEED_POLL_SECONDS", 0.01)
+    repository = LocationRepository(db)
+    asyncio.run(repository.save_current(Location(user_id="early", latitude=13.1, longitude=80.0)))
+
+    async def follow():
+        crew_feed = CrewFeed()
+        crew_feed._db = db
+        subscriber = crew_feed.subscribe(13.0, 79.5, 14.0, 80.5)
+        task = asyncio.create_task(crew_feed._poll())
+        await asyncio.sleep(0.05)
+        # A phone whose clock runs an hour behind
+        behind = datetime.utcnow() - timedelta(hours=1)
+        await repository.save_current(Location(user_id="skewed", latitude=13.2, longitude=80.0, updated_at=behind))
+        await repository.set_sharing("early", False)
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return crew_feed, subscriber
+
+    crew_feed, subscriber = asyncio.run(follow())
+    assert set(crew_feed.locations) == {"skewed"}
+    assert set(subscriber.pending) == {"skewed"}
+    assert subscriber.removed == {"early"}
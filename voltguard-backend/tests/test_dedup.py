@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime, timedelta
+from bson import ObjectId
+from utils.dedup import DuplicateDetector, SIGNATURE_SIZE, shingles, signature, similarity
+
+
+def report(title: str, description: str, latitude: float = 13.0, longitude: float = 80.2, **fields) -> dict:
+    return {
+        "_id": ObjectId(), "title": title, "description": description, "latitude": latitude,
+        "longitude": longitude, "created_at": datetime.utcnow(), **fields
+    }
+
+
+def test_similarity_of_short_texts_is_exact():
+    first, second = "power line down", "power line fallen"
+    exact = len(shingles(first) & shingles(second)) / len(shingles(first) | shingles(second))
+    assert similarity(signature(first), signature(second)) == exact
+    assert similarity(signature(first), signature(first)) == 1.0
+    assert similarity(signature(""), signature("")) == 0.0
+
+
+def test_similarity_of_long_texts_is_estimated_from_the_signatures():
+    words = [f"word{index}" for index in range(60)]
+    first, second = " ".join(words[:40]), " ".join(words[20:])
+    assert len(signature(first)) == SIGNATURE_SIZE
+    exact = len(shingles(first) & shingles(second)) / len(shingles(first) | shingles(second))
+    assert abs(similarity(signature(first), signature(second)) - exact) < 0.2
+
+
+def test_links_nearby_similar_report_to_root_incident():
+    detector = DuplicateDetector()
+    incident = report("Power line down on Anna Salai", "A power line fell near the bus stop, sparks")
+    duplicate = report("Wire down", "Power line down at the bus stop", parent_id=str(incident["_id"]))
+    elsewhere = report("Power line down on Anna Salai", "A power line fell near the bus stop", latitude=13.1)
+    stale = report("Power line down on Anna Salai", "A power line fell near the bus stop, sparks")
+    stale["created_at"] -= timedelta(days=2)
+    for doc in (incident, duplicate, elsewhere, stale):
+        detector.add(doc)
+
+    new = {"latitude": 13.0005, "longitude": 80.2003, "title": "Power line fallen Anna Salai",
+           "description": "Power line down near the bus stop with sparks"}
+    parent_id, score = asyncio.run(detector.find_parent(None, new, in_memory=True))
+    assert parent_id == str(incident["_id"])
+    assert score >= 0.3
+
+    unrelated = {"latitude": 13.0005, "longitude": 80.2003, "title": "Meter not working",
+                 "description": "My electricity meter display is blank since morning"}
+    assert asyncio.run(detector.find_parent(None, unrelated, in_memory=True)) is None
+
+
+def test_removed_requests_are_not_candidates():
+    detector = DuplicateDetector()
+    incident = report("Transformer fire", "Transformer on the corner is on fire")
+    detector.add(incident)
+    detector.remove(incident["_id"])
+    new = {"latitude": 13.0, "longitude": 80.2, "title": "Transformer fire", "description": "Transformer is burning"}
+    assert asyncio.run(detector.find_parent(None, new, in_memory=True)) is None
+    assert detector.stats()["indexed"] == 0
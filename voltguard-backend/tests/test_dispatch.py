@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from config import settings
+from repositories import LeaseRepository, LocationRepository
+from tests.conftest import create_fault_requests, create_user
+from utils.dispatch import DISPATCH_LEASE, Dispatcher
+
+
+@pytest.fixture
+def crew(db, monkeypatch):
+    crew = create_user(db, "crew@example.com", role="electrician")
+
+    async def sharing_electricians(self, since):
+        return [{"user_id": str(crew["_id"]), "latitude": 13.0, "longitude": 80.0}]
+
+    monkeypatch.setattr(LocationRepository, "sharing_electricians", sharing_electricians)
+    monkeypatch.setattr(settings, "DISPATCH_CREW_CAPACITY", 3)
+    return crew
+
+
+def dispatchers(db, count: int) -> list:
+    workers = [Dispatcher() for _ in range(count)]
+    for worker in workers:
+        worker._db = db
+    return workers
+
+
+def test_concurrent_dispatchers_respect_crew_capacity(db, crew):
+    create_fault_requests(db, create_user(db, "consumer@example.com"), [], 10)
+    first, second = dispatchers(db, 2)
+
+    async def round_on_both():
+        return await asyncio.gather(first.dispatch_once(), second.dispatch_once())
+
+    assigned = asyncio.run(round_on_both())
+    assert sorted(assigned) == [0, 3]
+    assert [first.leader, second.leader].count(True) == 1
+    load = asyncio.run(db["fault_requests"].count_documents({"assigned_to": str(crew["_id"])}))
+    assert load == 3
+
+
+def test_lease_passes_on_when_released_or_expired(db):
+    leases = LeaseRepository(db)
+
+    async def scenario():
+        results = [
+            await leases.acquire(DISPATCH_LEASE, "a", 60),
+            await leases.acquire(DISPATCH_LEASE, "b", 60),
+            await leases.acquire(DISPATCH_LEASE, "a", 60)
+        ]
+        await leases.release(DISPATCH_LEASE, "a")
+        results.append(await leases.acquire(DISPATCH_LEASE, "b", 0))
+        # b's lease has already expired
+        results.append(await leases.acquire(DISPATCH_LEASE, "a", 60))
+        return results
+
+    assert asyncio.run(scenario()) == [True, False, True, True, True]
+
+
+def test_stopping_leader_releases_lease(db, crew):
+    first, second = dispatchers(db, 2)
+
+    async def scenario():
+        await first.dispatch_once()
+        await first.stop()
+        await second.dispatch_once()
+        return first.leader, second.leader
+
+    assert asyncio.run(scenario()) == (False, True)
@@ -0,0 +1,110 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+import pytest
+from tests.conftest import auth_headers, create_fault_requests, create_user
+from utils.export import EXPORT_FIELDS, stream_fault_requests
+
+
+class TrackedCursor:
+    """Async cursor over documents that records reads and close(), optionally failing partway"""
+
+    def __init__(self, docs: list, fail_after: int = None):
+        self._docs = docs
+        self._fail_after = fail_after
+        self.read = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.read == self._fail_after:
+            raise ConnectionError("connection reset")
+        if self.read == len(self._docs):
+            raise StopAsyncIteration
+        self.read += 1
+        return dict(self._docs[self.read - 1])
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def exported(db):
+    consumer = create_user(db, "consumer@example.com")
+    return create_fault_requests(db, consumer, [], 250)
+
+
+def test_ndjson_export_streams_every_request_oldest_first(client, db, exported):
+    crew = create_user(db, "crew@example.com", role="electrician")
+    response = client.get(
+        "/api/electrician/fault-requests/export", headers=auth_headers(crew), params={"batch_size": 100}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [str(doc["_id"]) for doc in reversed(exported)]
+    assert set(rows[0]) == set(EXPORT_FIELDS)
+
+
+def test_csv_export_applies_filters(client, db, exported):
+    crew = create_user(db, "crew@example.com", role="electrician")
+    oldest_kept = sorted(doc["created_at"] for doc in exported)[200]
+    response = client.get(
+        "/api/electrician/fault-requests/export", headers=auth_headers(crew),
+        params={"format": "csv", "status_filter": "open", "start": oldest_kept.isoformat()}
+    )
+    assert response.status_code == 200
+    table = list(csv.reader(io.StringIO(response.text)))
+    assert tuple(table[0]) == EXPORT_FIELDS
+    assert len(table) == 1 + 50
+
+    empty = client.get(
+        "/api/electrician/fault-requests/export", headers=auth_headers(crew),
+        params={"format": "csv", "status_filter": "resolved"}
+    )
+    assert list(csv.reader(io.StringIO(empty.text))) == [list(EXPORT_FIELDS)]
+
+
+def test_export_is_electrician_only_and_checks_the_range(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    crew = create_user(db, "crew@example.com", role="electrician")
+    path = "/api/electrician/fault-requests/export"
+    assert client.get(path, headers=auth_headers(consumer)).status_code == 403
+    now = datetime.utcnow().isoformat()
+    assert client.get(path, headers=auth_headers(crew), params={"start": now, "end": now}).status_code == 400
+
+
+def test_stream_reads_one_batch_ahead_at_most(db, exported):
+    cursor = TrackedCursor(exported)
+
+    async def first_chunk():
+        stream = stream_fault_requests(db, cursor, 100, "ndjson")
+        chunk = await stream.__anext__()
+        read = cursor.read
+        # The client goes away after one chunk
+        await stream.aclose()
+        return chunk, read
+
+    chunk, read = asyncio.run(first_chunk())
+    assert chunk.count(b"\n") == 100
+    assert read == 100
+    assert cursor.closed
+
+
+def test_failed_export_closes_the_cursor_and_aborts(db, exported, capsys):
+    cursor = TrackedCursor(exported, fail_after=150)
+
+    async def drain():
+        chunks = []
+        async for chunk in stream_fault_requests(db, cursor, 100, "ndjson"):
+            chunks.append(chunk)
+        return chunks
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(drain())
+    assert cursor.closed
+    assert "Fault request export failed" in capsys.readouterr().out
@@ -0,0 +1,43 @@
+import json
+from config import settings
+from schemas import FaultRequestPage
+from tests.conftest import auth_headers, create_fault_requests, create_user
+from utils.fast_json import encode_json
+
+
+def test_fast_list_response_matches_regular_path(client, db, monkeypatch):
+    consumer = create_user(db, "consumer@example.com")
+    headers = auth_headers(consumer)
+    request_id = create_fault_requests(db, consumer, [], 1)[0]["_id"]
+    for index in range(5):
+        client.post("/api/chat/send", headers=headers, json={"request_id": str(request_id), "content": f"Update {index}"})
+
+    path = f"/api/chat/request/{request_id}"
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    regular = client.get(path, headers=headers)
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast = client.get(path, headers=headers)
+    assert regular.status_code == fast.status_code == 200
+    assert len(fast.json()["messages"]) == 5
+    assert fast.content == regular.content
+    assert fast.headers["content-type"] == regular.headers["content-type"]
+
+
+def test_extreme_floats_differ_only_in_notation():
+    payload = {
+        "requests": [],
+        "total": 0,
+        "total_is_estimate": False,
+        "limit": 50,
+        "next_cursor": None
+    }
+    row = {
+        "id": "0" * 24, "consumer_id": "c", "title": "t", "description": "d", "location": "l",
+        "latitude": 0.00001, "longitude": 1e16, "status": "open", "priority": "low",
+        "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-01T00:00:00"
+    }
+    payload["requests"].append(row)
+    encoded = encode_json(FaultRequestPage, payload)
+    assert b"1e-05" not in encoded
+    decoded = json.loads(encoded)["requests"][0]
+    assert (decoded["latitude"], decoded["longitude"]) == (0.00001, 1e16)
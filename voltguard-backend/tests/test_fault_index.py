@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId, Timestamp
+import routes.electrician as electrician_routes
+import utils.fault_index as fault_index_module
+from tests.conftest import auth_headers, create_fault_requests, create_user
+from utils.fault_index import FaultIndex, change_lag
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    async def to_list(self, length):
+        return list(self._docs)
+
+
+class BusyStream:
+    """Change stream that always has another change waiting"""
+
+    alive = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def try_next(self):
+        await asyncio.sleep(0.005)
+        request_id = ObjectId()
+        return {
+            "operationType": "insert",
+            "documentKey": {"_id": request_id},
+            "fullDocument": {
+                "_id": request_id, "status": "open", "priority": "high",
+                "created_at": datetime.utcnow(), "latitude": 13.0, "longitude": 80.0
+            },
+            "wallTime": datetime.utcnow()
+        }
+
+
+class FakeCollection:
+    def find(self, *args, **kwargs):
+        return FakeCursor([])
+
+    def watch(self, *args, **kwargs):
+        return BusyStream()
+
+
+class FakeDatabase:
+    def __getitem__(self, name):
+        return FakeCollection()
+
+
+def test_change_lag_uses_event_time():
+    assert change_lag({"wallTime": datetime.utcnow() - timedelta(seconds=30)}) >= 30
+    assert change_lag({"clusterTime": Timestamp(int(datetime.utcnow().timestamp()) - 30, 1)}) >= 29
+    assert change_lag({"wallTime": datetime.utcnow() + timedelta(seconds=5)}) == 0.0
+    assert change_lag({}) == 0.0
+
+
+def test_busy_change_stream_stays_ready(monkeypatch):
+    monkeypatch.setattr(fault_index_module, "STREAM_MAX_LAG_SECONDS", 0.1)
+
+    async def follow():
+        index = FaultIndex()
+        index._db = FakeDatabase()
+        task = asyncio.create_task(index._watch())
+        # Several lag windows without the stream ever running dry
+        await asyncio.sleep(0.4)
+        ready, live = index.ready, index.live
+        task.cancel()
+        return ready, live, len(index)
+
+    ready, live, size = asyncio.run(follow())
+    assert size > 10
+    assert ready and live
+
+
+def test_polling_index_is_not_live():
+    index = FaultIndex()
+    index.mode = "polling"
+    index.loaded = True
+    index.caught_up_at = fault_index_module.time.monotonic()
+    assert index.ready
+    assert not index.live
+
+
+@pytest.mark.parametrize("view", ["full", "summary"])
+def test_index_page_matches_database_page(client, db, monkeypatch, view):
+    consumer = create_user(db, "consumer@example.com")
+    crew = create_user(db, "crew@example.com", role="electrician")
+    create_fault_requests(db, consumer, [], 30)
+    path = "/api/electrician/fault-requests"
+    params = {"status_filter": "open", "limit": 10, "view": view, "count": "exact"}
+
+    from_database = client.get(path, headers=auth_headers(crew), params=params)
+
+    index = FaultIndex()
+    index._db = db
+    asyncio.run(index._load())
+    index.mode = "change_stream"
+    index.caught_up_at = fault_index_module.time.monotonic()
+    monkeypatch.setattr(electrician_routes, "fault_index", index)
+    db.reset()
+    from_index = client.get(path, headers=auth_headers(crew), params=params)
+
+    assert db.queries("fault_requests") == 0
+    assert from_index.status_code == from_database.status_code == 200
+    assert from_index.json() == from_database.json()
+    if view == "summary":
+        assert "description" not in index.top(1, summary=True)[0]
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+import routes.electrician as electrician_routes
+from config import settings
+from models import FaultRequest
+from models.geo import tile_xy
+from tests.conftest import auth_headers, create_user
+from utils.fault_tiles import FaultTileCache
+
+ZOOM = 10
+CENTER = (13.0827, 80.2707)
+
+
+@pytest.fixture
+def tiles(monkeypatch):
+    cache = FaultTileCache()
+    monkeypatch.setattr(electrician_routes, "fault_tiles", cache)
+    return cache
+
+
+def add_faults(db, count: int) -> list:
+    documents = [
+        FaultRequest(
+            consumer_id="c" * 24, title=f"Fault {index}", description="Line down", location="Main road",
+            latitude=CENTER[0] + (index % 40 - 20) / 2000, longitude=CENTER[1] + (index // 40 - 20) / 2000,
+            priority=("low", "high")[index % 2]
+        ).to_dict()
+        for index in range(count)
+    ]
+    asyncio.run(db["fault_requests"].insert_many(documents))
+    return documents
+
+
+def get_tile(client, crew, **params):
+    x, y = tile_xy(*CENTER, ZOOM)
+    response = client.get(f"/api/electrician/faults/tiles/{ZOOM}/{x}/{y}", headers=auth_headers(crew), params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.parametrize("count", [200, 1600])
+def test_tile_clusters_are_bounded_and_add_up(client, db, tiles, count):
+    crew = create_user(db, "crew@example.com", role="electrician")
+    add_faults(db, count)
+
+    tile = get_tile(client, crew)
+
+    assert tile["total"] == count
+    assert 1 < len(tile["clusters"]) <= 4 ** settings.TILE_CLUSTER_DEPTH
+    assert sum(cluster["count"] for cluster in tile["clusters"]) == count
+    assert sum(cluster["by_priority"].get("high", 0) for cluster in tile["clusters"]) == count // 2
+    for cluster in tile["clusters"]:
+        assert len(cluster["quadkey"]) == ZOOM + settings.TILE_CLUSTER_DEPTH
+        assert cluster["quadkey"].startswith(tile["quadkey"])
+
+
+def test_changed_fault_invalidates_its_tile(client, db, tiles):
+    crew = create_user(db, "crew@example.com", role="electrician")
+    request_id = str(add_faults(db, 50)[0]["_id"])
+    get_tile(client, crew, status_filter="open")
+
+    db.reset()
+    assert get_tile(client, crew, status_filter="open")["total"] == 50
+    assert db.queries("fault_requests") == 0
+    assert tiles.hits == 1
+
+    response = client.put(
+        f"/api/electrician/fault-request/{request_id}/assign", headers=auth_headers(crew), json={"status": "assigned"}
+    )
+    assert response.status_code == 200
+    assert get_tile(client, crew, status_filter="open")["total"] == 49
+    assert tiles.invalidations == 1
+
+
+def test_tiles_are_electrician_only_and_in_range(client, db, tiles):
+    consumer = create_user(db, "consumer@example.com")
+    crew = create_user(db, "crew@example.com", role="electrician")
+    assert client.get("/api/electrician/faults/tiles/1/0/0", headers=auth_headers(consumer)).status_code == 403
+    assert client.get("/api/electrician/faults/tiles/1/2/0", headers=auth_headers(crew)).status_code == 404
@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+import models.indexes as indexes_module
+from models.indexes import INDEXES, check_query_plans, ensure_indexes
+
+
+class ExplainCursor:
+    def __init__(self, plan):
+        self._plan = plan
+
+    def sort(self, sort):
+        return self
+
+    async def explain(self):
+        return {"queryPlanner": {"winningPlan": self._plan}}
+
+
+class PlannedDatabase:
+    """Database whose explain() returns a fixed winning plan per collection"""
+
+    def __init__(self, plans: dict):
+        self._plans = plans
+
+    def __getitem__(self, name):
+        plan = self._plans[name]
+
+        class Collection:
+            def find(self, filter):
+                return ExplainCursor(plan)
+        return Collection()
+
+
+def declared_names(collection: str) -> set:
+    return {index.document["name"] for index in INDEXES[collection]}
+
+
+def test_ensure_indexes_creates_every_declared_index_once(db, capsys):
+    asyncio.run(ensure_indexes(db))
+    for collection in INDEXES:
+        existing = asyncio.run(db[collection].index_information())
+        assert declared_names(collection) <= set(existing)
+    capsys.readouterr()
+
+    asyncio.run(ensure_indexes(db))
+    assert "Created indexes" not in capsys.readouterr().out
+
+
+def test_ensure_indexes_rebuilds_a_changed_definition(db, capsys):
+    asyncio.run(db["users"].create_index("email", name="email_1"))
+    asyncio.run(ensure_indexes(db))
+    assert "Rebuilding index users.email_1" in capsys.readouterr().out
+    assert asyncio.run(db["users"].index_information())["email_1"].get("unique")
+
+
+def test_query_plan_check_rejects_scans_and_in_memory_sorts(monkeypatch):
+    monkeypatch.setattr(indexes_module, "QUERY_SHAPES", [
+        {"collection": "indexed", "name": "by_owner", "filter": {}, "sort": [("created_at", -1)]},
+        {"collection": "scanned", "name": "by_title", "filter": {}, "sort": None},
+        {"collection": "sorted", "name": "by_rank", "filter": {}, "sort": [("rank", -1)]},
+    ])
+    fetch = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "owner_1"}}
+    database = PlannedDatabase({
+        "indexed": fetch,
+        "scanned": {"stage": "COLLSCAN"},
+        "sorted": {"stage": "SORT", "inputStage": fetch},
+    })
+
+    with pytest.raises(RuntimeError) as error:
+        asyncio.run(check_query_plans(database))
+    message = str(error.value)
+    assert "scanned:by_title (COLLSCAN)" in message
+    assert "sorted:by_rank (SORT)" in message
+    assert "indexed" not in message
+
+
+def test_query_plan_check_passes_index_backed_shapes(monkeypatch):
+    monkeypatch.setattr(indexes_module, "QUERY_SHAPES", [
+        {"collection": "indexed", "name": "by_owner", "filter": {}, "sort": [("created_at", -1)]},
+    ])
+    plan = {"stage": "LIMIT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}
+    asyncio.run(check_query_plans(PlannedDatabase({"indexed": plan})))
@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime, timedelta
+from tests.conftest import auth_headers, create_user
+
+
+def batch(start: datetime, minutes: list) -> list:
+    return [
+        {"latitude": 13.0, "longitude": 80.0, "timestamp": (start + timedelta(minutes=minute)).isoformat()}
+        for minute in minutes
+    ]
+
+
+def test_retried_batch_stores_nothing_twice(client, db):
+    headers = auth_headers(create_user(db, "crew@example.com", role="electrician"))
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=3)
+    fixes = batch(start, [0, 1, 2, 24 * 60, 2 * 24 * 60])
+
+    first = client.post("/api/consumer/location/batch", headers=headers, json=fixes)
+    assert first.status_code == 200, first.text
+    assert first.json()["stored"] == 5
+
+    retry = client.post("/api/consumer/location/batch", headers=headers, json=fixes + batch(start, [3]))
+    assert retry.json()["duplicates"] == 5
+    assert retry.json()["stored"] == 1
+
+
+def test_duplicate_check_reads_only_touched_buckets(client, db):
+    user = create_user(db, "crew@example.com", role="electrician")
+    headers = auth_headers(user)
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=3)
+    # A day of hourly history between the two ends of the next upload
+    client.post("/api/consumer/location/batch", headers=headers, json=batch(start, range(0, 24 * 60, 60)))
+
+    db.reset()
+    response = client.post("/api/consumer/location/batch", headers=headers, json=batch(start, [0, 5, 23 * 60 + 30]))
+    assert response.json()["duplicates"] == 1
+
+    reads = [args[0] for collection, method, args in db.log if (collection, method) == ("location_history", "find")]
+    assert len(reads) == 1
+    bucket_starts = reads[0]["bucket_start"]["$in"]
+    assert bucket_starts == [start, start + timedelta(hours=23)]
+    buckets = asyncio.run(db["location_history"].count_documents({"user_id": str(user["_id"])}))
+    assert buckets == 24
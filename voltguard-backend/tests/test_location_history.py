@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from tests.conftest import auth_headers, create_user
+
+
+def upload_hours(client, headers, start: datetime, hours: int, per_hour: int) -> list:
+    """Upload `per_hour` evenly spaced fixes into each of `hours` hourly buckets"""
+    timestamps = [
+        start + timedelta(hours=hour, minutes=minute * 60 // per_hour)
+        for hour in range(hours) for minute in range(per_hour)
+    ]
+    response = client.post("/api/consumer/location/batch", headers=headers, json=[
+        {"latitude": 13.0, "longitude": 80.0 + index / 1000, "timestamp": timestamp.isoformat()}
+        for index, timestamp in enumerate(timestamps)
+    ])
+    assert response.status_code == 200, response.text
+    return timestamps
+
+
+def history(client, headers, start: datetime, end: datetime, **params) -> dict:
+    response = client.get("/api/consumer/location/history", headers=headers, params={
+        "start": start.isoformat(), "end": end.isoformat(), **params
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_limit_keeps_the_newest_fixes_and_reports_more(client, db):
+    headers = auth_headers(create_user(db, "crew@example.com", role="electrician"))
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=6)
+    timestamps = upload_hours(client, headers, start, hours=3, per_hour=20)
+    end = start + timedelta(hours=3)
+
+    page = history(client, headers, start, end, limit=25)
+    returned = [datetime.fromisoformat(row["updated_at"]) for row in page["locations"]]
+    assert returned == timestamps[-25:]
+    assert page["has_more"] is True
+
+    everything = history(client, headers, start, end, limit=100)
+    assert len(everything["locations"]) == 60
+    assert everything["has_more"] is False
+
+
+def test_downsampled_limit_keeps_the_newest_windows(client, db):
+    headers = auth_headers(create_user(db, "crew@example.com", role="electrician"))
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=6)
+    timestamps = upload_hours(client, headers, start, hours=3, per_hour=20)
+
+    page = history(client, headers, start, start + timedelta(hours=3), resolution_seconds=3600, limit=2)
+    returned = [datetime.fromisoformat(row["updated_at"]) for row in page["locations"]]
+    # The last fix of each of the two newest hours
+    assert returned == [timestamps[39], timestamps[59]]
+    assert page["has_more"] is True
@@ -0,0 +1,117 @@
+import asyncio
+import pytest
+from bson.errors import InvalidDocument
+from pymongo.errors import AutoReconnect
+from config import settings
+from models import Location
+from repositories import LocationRepository
+from utils.location_ingest import LocationIngest
+
+
+@pytest.fixture(autouse=True)
+def fast_flushes(monkeypatch):
+    monkeypatch.setattr(settings, "LOCATION_INGEST_ENABLED", True)
+    monkeypatch.setattr(settings, "LOCATION_INGEST_FLUSH_MS", 1)
+    monkeypatch.setattr(settings, "LOCATION_INGEST_RETRY_MS", 1)
+    monkeypatch.setattr(settings, "LOCATION_INGEST_MAX_RETRIES", 3)
+
+
+def fix(user_id: str) -> Location:
+    return Location(user_id=user_id, latitude=13.0, longitude=80.0)
+
+
+def run_ingest(db, fixes: list) -> LocationIngest:
+    async def ingest():
+        location_ingest = LocationIngest()
+        await location_ingest.start(db)
+        for location in fixes:
+            assert location_ingest.submit(location)
+        await asyncio.sleep(0.05)
+        assert location_ingest.running
+        await location_ingest.stop()
+        return location_ingest
+    return asyncio.run(ingest())
+
+
+def test_failed_flush_is_retried(db, monkeypatch):
+    save_batch = LocationRepository.save_batch
+    failures = iter([AutoReconnect("primary stepped down")] * 2)
+
+    async def flaky_save_batch(self, locations):
+        error = next(failures, None)
+        if error:
+            raise error
+        return await save_batch(self, locations)
+
+    monkeypatch.setattr(LocationRepository, "save_batch", flaky_save_batch)
+    location_ingest = run_ingest(db, [fix("a"), fix("b")])
+    assert location_ingest.retries == 2
+    assert location_ingest.failed == 0
+    assert location_ingest.written == 2
+    assert asyncio.run(db["consumer_locations"].count_documents({})) == 2
+
+
+def test_flush_gives_up_after_max_retries(db, monkeypatch):
+    async def down(self, locations):
+        raise AutoReconnect("no primary")
+
+    monkeypatch.setattr(LocationRepository, "save_batch", down)
+    location_ingest = run_ingest(db, [fix("a")])
+    assert location_ingest.retries == settings.LOCATION_INGEST_MAX_RETRIES
+    assert location_ingest.failed == 1
+
+
+def test_bad_fix_only_drops_itself(db, monkeypatch):
+    save_batch = LocationRepository.save_batch
+
+    async def strict_save_batch(self, locations):
+        if any(location.user_id == "bad" for location in locations):
+            raise InvalidDocument("cannot encode object")
+        return await save_batch(self, locations)
+
+    monkeypatch.setattr(LocationRepository, "save_batch", strict_save_batch)
+    location_ingest = run_ingest(db, [fix("a"), fix("bad"), fix("b")])
+    assert location_ingest.failed == 1
+    assert location_ingest.written == 2
+    users = asyncio.run(db["consumer_locations"].distinct("user_id"))
+    assert sorted(users) == ["a", "b"]
+
+
+def test_flush_loop_survives_unexpected_errors(db, monkeypatch):
+    drain = LocationIngest._drain
+    errors = iter([KeyError("latitude")])
+
+    def broken_once(self, limit):
+        error = next(errors, None)
+        if error:
+            raise error
+        return drain(self, limit)
+
+    monkeypatch.setattr(LocationIngest, "_drain", broken_once)
+
+    async def ingest():
+        location_ingest = LocationIngest()
+        await location_ingest.start(db)
+        location_ingest.submit(fix("lost"))
+        await asyncio.sleep(0.05)
+        location_ingest.submit(fix("a"))
+        await asyncio.sleep(0.05)
+        running = location_ingest.running
+        await location_ingest.stop()
+        return location_ingest, running
+
+    location_ingest, running = asyncio.run(ingest())
+    assert running
+    assert location_ingest.loop_errors == 1
+    assert location_ingest.written == 1
+
+
+def test_not_running_once_the_flush_task_has_died(db):
+    async def ingest():
+        location_ingest = LocationIngest()
+        await location_ingest.start(db)
+        location_ingest._task.cancel()
+        await asyncio.sleep(0)
+        return location_ingest.running
+
+    assert asyncio.run(ingest()) is False
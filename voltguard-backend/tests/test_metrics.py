@@ -0,0 +1,23 @@
+from fastapi.testclient import TestClient
+import main
+from tests.conftest import auth_headers, create_user
+
+COMPONENTS = {
+    "token_cache", "password_hasher", "dispatcher", "fault_index", "response_cache",
+    "location_ingest", "crew_feed", "fault_tiles", "duplicate_detector"
+}
+
+
+def test_metrics_reports_every_component_and_counts_requests(client, db):
+    # No lifespan: the singletons report their idle state
+    metrics = TestClient(main.app)
+    before = metrics.get("/metrics").json()
+    assert set(before) == COMPONENTS
+
+    user = create_user(db, "consumer@example.com")
+    for _ in range(3):
+        assert client.get("/api/auth/me", headers=auth_headers(user)).status_code == 200
+
+    after = metrics.get("/metrics").json()
+    assert after["token_cache"]["hits"] - before["token_cache"]["hits"] == 3
+    assert after["token_cache"]["entries"] >= 1
@@ -0,0 +1,74 @@
+import pytest
+from tests.conftest import auth_headers, create_fault_requests, create_user
+
+
+def list_queries(client, db, path: str, headers: dict) -> int:
+    db.reset()
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.text
+    return db.queries()
+
+
+@pytest.fixture
+def consumer(db):
+    return create_user(db, "consumer@example.com")
+
+
+@pytest.fixture
+def electricians(db):
+    return [create_user(db, f"crew{index}@example.com", role="electrician") for index in range(20)]
+
+
+@pytest.mark.parametrize("path", [
+    "/api/consumer/fault-requests?limit=500",
+    "/api/consumer/fault-requests?limit=500&view=summary"
+])
+def test_consumer_list_resolves_names_in_constant_queries(client, db, consumer, electricians, path):
+    headers = auth_headers(consumer)
+    create_fault_requests(db, consumer, electricians[:2], 2)
+    few = list_queries(client, db, path, headers)
+    assert db.calls[("users", "find")] == 1
+
+    create_fault_requests(db, consumer, electricians, 200)
+    many = list_queries(client, db, path, headers)
+    assert db.calls[("users", "find")] == 1
+    assert db.calls[("users", "find_one")] == 0
+    assert many == few
+
+
+@pytest.mark.parametrize("path", [
+    "/api/electrician/fault-requests?limit=500",
+    "/api/electrician/fault-requests?limit=500&view=summary"
+])
+def test_electrician_list_resolves_names_in_constant_queries(client, db, consumer, electricians, path):
+    headers = auth_headers(electricians[0])
+    create_fault_requests(db, consumer, electricians[:2], 2)
+    few = list_queries(client, db, path, headers)
+
+    create_fault_requests(db, consumer, electricians, 200)
+    many = list_queries(client, db, path, headers)
+    assert db.calls[("users", "find")] == 1
+    assert db.calls[("users", "find_one")] == 0
+    assert many == few
+
+
+def test_my_assignments_resolves_names_in_constant_queries(client, db, consumer, electricians):
+    crew = electricians[0]
+    headers = auth_headers(crew)
+    create_fault_requests(db, consumer, [crew], 2)
+    few = list_queries(client, db, "/api/electrician/my-assignments", headers)
+
+    create_fault_requests(db, consumer, [crew], 200)
+    many = list_queries(client, db, "/api/electrician/my-assignments", headers)
+    assert db.calls[("users", "find_one")] == 0
+    assert many == few
+
+
+def test_list_names_match_assigned_electricians(client, db, consumer, electricians):
+    create_fault_requests(db, consumer, electricians, 40)
+    response = client.get("/api/consumer/fault-requests?limit=500", headers=auth_headers(consumer))
+    names = {str(crew["_id"]): crew["full_name"] for crew in electricians}
+    rows = response.json()["requests"]
+    assert len(rows) == 40
+    for row in rows:
+        assert row["assigned_to_name"] == names[row["assigned_to"]]
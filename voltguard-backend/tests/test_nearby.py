@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from migrations import backfill_geo_points
+from repositories import FaultRequestRepository
+from tests.conftest import auth_headers, create_user
+from tests.fakes import GeoNearCollection
+
+# Chennai Central; requests are placed due north of it at these distances
+CENTER = (13.0827, 80.2707)
+KM_NORTH = {"Far": 8.0, "Near": 0.5, "Mid": 3.0, "Closest": 0.1}
+
+
+@pytest.fixture
+def geo_near(monkeypatch):
+    repository_init = FaultRequestRepository.__init__
+
+    def init(self, db, collection_name=None):
+        repository_init(self, db, collection_name)
+        self.collection = GeoNearCollection(self.collection)
+
+    monkeypatch.setattr(FaultRequestRepository, "__init__", init)
+
+
+def report_faults(client, consumer):
+    for title, km in KM_NORTH.items():
+        response = client.post("/api/consumer/fault-request/create", headers=auth_headers(consumer), json={
+            "title": title, "description": "Sparking from the pole", "location": "Main road",
+            "latitude": CENTER[0] + km / 111.2, "longitude": CENTER[1]
+        })
+        assert response.status_code == 200
+
+
+def test_requests_store_a_geojson_point(client, db, geo_near):
+    consumer = create_user(db, "consumer@example.com")
+    report_faults(client, consumer)
+    stored = asyncio.run(db["fault_requests"].find_one({"title": "Near"}))
+    assert stored["geo"] == {"type": "Point", "coordinates": [stored["longitude"], stored["latitude"]]}
+
+
+def test_nearby_returns_requests_in_radius_closest_first(client, db, geo_near):
+    consumer = create_user(db, "consumer@example.com")
+    crew = create_user(db, "crew@example.com", role="electrician")
+    report_faults(client, consumer)
+    asyncio.run(db["fault_requests"].update_one({"title": "Mid"}, {"$set": {"status": "resolved"}}))
+    params = {"latitude": CENTER[0], "longitude": CENTER[1], "radius_km": 5}
+
+    response = client.get("/api/electrician/fault-requests/nearby", headers=auth_headers(crew), params=params)
+
+    assert response.status_code == 200
+    rows = response.json()["requests"]
+    assert [row["title"] for row in rows] == ["Closest", "Near"]
+    assert [round(row["distance_km"], 1) for row in rows] == [0.1, 0.5]
+    assert "geo" not in rows[0]
+
+    with_resolved = client.get(
+        "/api/electrician/fault-requests/nearby", headers=auth_headers(crew),
+        params={**params, "status_filter": "resolved"}
+    )
+    assert [row["title"] for row in with_resolved.json()["requests"]] == ["Mid"]
+
+    refused = client.get("/api/electrician/fault-requests/nearby", headers=auth_headers(consumer), params=params)
+    assert refused.status_code == 403
+
+
+def test_backfill_adds_points_only_for_valid_coordinates(db):
+    asyncio.run(db["fault_requests"].insert_many([
+        {"title": "Legacy", "latitude": 13.0, "longitude": 80.0},
+        {"title": "Out of range", "latitude": 95.0, "longitude": 80.0},
+        {"title": "No position"},
+    ]))
+
+    assert asyncio.run(backfill_geo_points(db)) == 1
+    with_points = asyncio.run(db["fault_requests"].find({"geo": {"$exists": True}}).to_list(None))
+    # mongomock leaves the field paths inside the pipeline update unevaluated, so only the type is checked
+    assert [(doc["title"], doc["geo"]["type"]) for doc in with_points] == [("Legacy", "Point")]
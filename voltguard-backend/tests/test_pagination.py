@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from tests.conftest import auth_headers, create_fault_requests, create_user
+from utils.pagination import encode_cursor, paginate
+
+
+def tied_requests(db, consumer: dict, count: int) -> list:
+    """Open requests that all share one priority and one created_at, so only _id orders them"""
+    requests = create_fault_requests(db, consumer, [], count)
+    created_at = datetime(2024, 1, 1)
+    asyncio.run(db["fault_requests"].update_many({}, {"$set": {"created_at": created_at}}))
+    return requests
+
+
+def walk(client, path: str, headers: dict, limit: int) -> list:
+    """Follow next_cursor from the first page to the last, returning every row"""
+    rows, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["requests"]) <= limit
+        rows += page["requests"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return rows
+
+
+@pytest.mark.parametrize("path, role", [
+    ("/api/consumer/fault-requests", "consumer"),
+    ("/api/electrician/fault-requests", "electrician")
+])
+def test_walking_tied_pages_has_no_duplicates_or_gaps(client, db, path, role):
+    consumer = create_user(db, "consumer@example.com")
+    reader = consumer if role == "consumer" else create_user(db, "crew@example.com", role="electrician")
+    requests = tied_requests(db, consumer, 57)
+
+    rows = walk(client, path, auth_headers(reader), limit=10)
+    ids = [row["id"] for row in rows]
+    assert len(ids) == len(set(ids)) == 57
+    # Ties on every other key fall back to _id, newest first
+    assert ids == sorted((str(request["_id"]) for request in requests), reverse=True)
+
+
+def test_mixed_direction_keyset_visits_every_document_once(db):
+    base = datetime(2024, 1, 1)
+    documents = [
+        {"_id": ObjectId(), "rank": index % 3, "created_at": base.replace(minute=index % 4)}
+        for index in range(50)
+    ]
+    asyncio.run(db["docs"].insert_many(documents))
+    sort = [("rank", -1), ("created_at", 1), ("_id", -1)]
+
+    async def walk_all():
+        seen, cursor = [], None
+        while True:
+            page, cursor, _, _ = await paginate(db["docs"], {}, sort, 7, cursor=cursor)
+            seen += page
+            if cursor is None:
+                return seen
+
+    seen = asyncio.run(walk_all())
+    expected = sorted(documents, key=lambda doc: (-doc["rank"], doc["created_at"], -int(str(doc["_id"]), 16)))
+    assert [doc["_id"] for doc in seen] == [doc["_id"] for doc in expected]
+
+
+@pytest.mark.parametrize("path, role", [
+    ("/api/consumer/fault-requests", "consumer"),
+    ("/api/electrician/fault-requests", "electrician")
+])
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    encode_cursor({"rank": 1}),
+    # One sort key short of either sort
+    encode_cursor([1])
+])
+def test_malformed_cursor_is_a_bad_request(client, db, path, role, cursor):
+    reader = create_user(db, "reader@example.com", role=role)
+    response = client.get(path, headers=auth_headers(reader), params={"cursor": cursor})
+    assert response.status_code == 400, response.text
+    assert "Invalid pagination cursor" in response.json()["detail"]
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+import routes.auth as auth_routes
+from config import settings
+from tests.conftest import create_user
+from utils.auth import PasswordHasher, hash_password
+
+PASSWORD = "correct horse battery staple"
+
+
+def add_password(db, user: dict, rounds: int) -> str:
+    password_hash = hash_password(PASSWORD, rounds)
+    asyncio.run(db["users"].update_one({"_id": user["_id"]}, {"$set": {"password_hash": password_hash}}))
+    return password_hash
+
+
+def test_full_queue_is_rejected_with_503():
+    hasher = PasswordHasher("thread", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def saturate():
+        running = asyncio.create_task(hasher._run(release.wait))
+        waiting = asyncio.create_task(hasher._run(release.wait))
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(HTTPException) as rejected:
+                await hasher._run(release.wait)
+            stats = hasher.stats()
+        finally:
+            release.set()
+        await asyncio.gather(running, waiting)
+        return rejected.value, stats
+
+    try:
+        error, stats = asyncio.run(saturate())
+    finally:
+        hasher.shutdown()
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
+    assert (stats["in_flight"], stats["queue_depth"], stats["rejected"]) == (1, 1, 1)
+    assert hasher.stats()["completed"] == 2
+
+
+def test_signin_is_refused_while_the_pool_is_saturated(client, db, monkeypatch):
+    user = create_user(db, "consumer@example.com")
+    add_password(db, user, 4)
+    monkeypatch.setattr(auth_routes, "password_hasher", PasswordHasher("thread", max_workers=1, max_queue=0))
+
+    response = client.post("/api/auth/signin", json={"email": user["email"], "password": PASSWORD})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_signin_rehashes_when_the_cost_factor_changes(client, db, monkeypatch):
+    user = create_user(db, "consumer@example.com")
+    add_password(db, user, 4)
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+
+    def stored_hash() -> str:
+        return asyncio.run(db["users"].find_one({"_id": user["_id"]}))["password_hash"]
+
+    assert client.post("/api/auth/signin", json={"email": user["email"], "password": PASSWORD}).status_code == 200
+    upgraded = stored_hash()
+    assert upgraded.startswith("$2b$05$")
+
+    assert client.post("/api/auth/signin", json={"email": user["email"], "password": PASSWORD}).status_code == 200
+    assert stored_hash() == upgraded
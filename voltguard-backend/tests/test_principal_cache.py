@@ -0,0 +1,39 @@
+from tests.conftest import auth_headers, create_user
+from utils import create_access_token
+
+
+def test_role_change_applies_to_the_token_already_in_use(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    headers = auth_headers(consumer)
+    assert client.get("/api/electrician/fault-requests", headers=headers).status_code == 403
+
+    response = client.put("/api/auth/update-role", headers=headers)
+    assert response.status_code == 200, response.text
+
+    # Same token as before the change, not the one update-role returned
+    response = client.get("/api/electrician/fault-requests", headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def test_cold_token_reads_the_user_once(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    token = create_access_token(str(consumer["_id"]), consumer["email"], "electrician")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    db.reset()
+    client.get("/api/consumer/fault-requests", headers=headers)
+    assert db.calls[("users", "find_one")] == 1
+
+    db.reset()
+    client.get("/api/consumer/fault-requests", headers=headers)
+    assert db.calls[("users", "find_one")] == 0
+
+    # The role comes from the user document, not the token's claims
+    assert client.get("/api/electrician/fault-requests", headers=headers).status_code == 403
+
+
+def test_token_of_a_deleted_user_is_rejected(client, db):
+    ghost = {"_id": "0" * 24, "email": "ghost@example.com", "role": "consumer"}
+    token = create_access_token(ghost["_id"], ghost["email"], ghost["role"])
+    response = client.get("/api/consumer/fault-requests", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
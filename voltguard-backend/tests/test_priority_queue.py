@@ -0,0 +1,43 @@
+import asyncio
+from migrations import backfill_priority_rank
+from tests.conftest import auth_headers, create_fault_requests, create_user
+
+# Lexicographic order of the labels is medium, low, high, critical
+PRIORITIES = ["medium", "low", "critical", "high", "urgent"]
+
+
+def queue_priorities(client, crew) -> list:
+    response = client.get(
+        "/api/electrician/fault-requests", headers=auth_headers(crew), params={"status_filter": "open", "limit": 50}
+    )
+    assert response.status_code == 200
+    return [row["priority"] for row in response.json()["requests"]]
+
+
+def test_queue_is_ordered_by_priority_rank(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    crew = create_user(db, "crew@example.com", role="electrician")
+    for priority in PRIORITIES:
+        response = client.post("/api/consumer/fault-request/create", headers=auth_headers(consumer), json={
+            "title": f"{priority} fault", "description": "Sparking from the pole", "location": "Main road",
+            "priority": priority
+        })
+        assert response.status_code == 200
+
+    assert queue_priorities(client, crew) == ["critical", "high", "medium", "low", "urgent"]
+
+
+def test_backfill_ranks_legacy_requests(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    crew = create_user(db, "crew@example.com", role="electrician")
+    documents = create_fault_requests(db, consumer, [], len(PRIORITIES))
+    for document, priority in zip(documents, PRIORITIES):
+        # Written before priority_rank existed
+        asyncio.run(db["fault_requests"].update_one(
+            {"_id": document["_id"]}, {"$set": {"priority": priority}, "$unset": {"priority_rank": ""}}
+        ))
+
+    assert asyncio.run(backfill_priority_rank(db)) == len(PRIORITIES)
+    assert queue_priorities(client, crew) == ["critical", "high", "medium", "low", "urgent"]
+    # Already ranked requests are left alone
+    assert asyncio.run(backfill_priority_rank(db)) == 0
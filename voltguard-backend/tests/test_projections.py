@@ -0,0 +1,57 @@
+import asyncio
+import bson
+from repositories.users import PROFILE_PROJECTION
+from tests.conftest import auth_headers, create_fault_requests, create_user
+
+ADDRESS = {
+    "street_address": "12 Anna Salai", "city": "Chennai", "state": "Tamil Nadu",
+    "postal_code": "600002", "country": "India"
+}
+
+# The `/me` payload before the repository layer: address fields were always null
+ME_FIELDS = {
+    "_id", "email", "full_name", "role", "phone", "company", "street_address", "city", "state",
+    "postal_code", "country", "is_active", "created_at"
+}
+
+
+def test_me_keeps_its_field_set_and_reads_less(client, db):
+    user = create_user(db, "consumer@example.com")
+    asyncio.run(db["users"].update_one({"_id": user["_id"]}, {"$set": ADDRESS}))
+
+    me = client.get("/api/auth/me", headers=auth_headers(user)).json()
+    assert set(me) == ME_FIELDS
+    assert all(me[field] is None for field in ADDRESS)
+
+    full = asyncio.run(db["users"].find_one({"_id": user["_id"]}))
+    profile = asyncio.run(db["users"].find_one({"_id": user["_id"]}, PROFILE_PROJECTION))
+    print(f"\n/me reads {len(bson.encode(profile))} of {len(bson.encode(full))} BSON bytes")
+    assert len(bson.encode(profile)) < len(bson.encode(full))
+
+    role = client.put("/api/auth/update-role", headers=auth_headers(user)).json()["user"]
+    assert all(role[field] is None for field in ADDRESS)
+
+
+def test_summary_view_shrinks_list_payloads(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    crew = create_user(db, "crew@example.com", role="electrician")
+    documents = create_fault_requests(db, consumer, [], 50)
+    asyncio.run(db["fault_requests"].update_many(
+        {"_id": {"$in": [doc["_id"] for doc in documents]}},
+        {"$set": {"description": "Transformer humming loudly near the bus stop. " * 10,
+                  "photo_url": "https://cdn.example.com/faults/" + "x" * 60 + ".jpg"}}
+    ))
+    path = "/api/electrician/fault-requests"
+
+    sizes = {}
+    for view in ("full", "summary"):
+        db.reset()
+        response = client.get(path, headers=auth_headers(crew), params={"limit": 50, "view": view})
+        assert len(response.json()["requests"]) == 50
+        projection = next(args[1] for name, method, args in db.log if name == "fault_requests" and method == "find")
+        rows = asyncio.run(db["fault_requests"].find({}, projection).to_list(None))
+        sizes[view] = (sum(len(bson.encode(row)) for row in rows), len(response.content))
+
+    print(f"\nBSON bytes read, JSON bytes sent for 50 rows: {sizes}")
+    assert sizes["summary"][0] * 3 < sizes["full"][0]
+    assert sizes["summary"][1] * 3 < sizes["full"][1]
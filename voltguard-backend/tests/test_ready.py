@@ -0,0 +1,39 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+import main
+from config import settings
+from utils.fault_index import FaultIndex
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = FaultIndex()
+    monkeypatch.setattr(main, "fault_index", index)
+    monkeypatch.setattr(settings, "FAULT_INDEX_ENABLED", True)
+    return index
+
+
+def test_ready_waits_for_the_fault_index(index):
+    # No lifespan: the index is never started, so its state is set by hand
+    client = TestClient(main.app)
+    starting = client.get("/ready")
+    assert starting.status_code == 503
+    assert starting.json()["status"] == "starting"
+
+    index.mode = "change_stream"
+    index.loaded = True
+    index.caught_up_at = time.monotonic()
+    ready = client.get("/ready")
+    assert ready.status_code == 200
+    assert ready.json()["fault_index"]["live"] is True
+
+    index.caught_up_at = time.monotonic() - 3600
+    assert client.get("/ready").status_code == 503
+
+
+def test_ready_ignores_a_disabled_index(index, monkeypatch):
+    monkeypatch.setattr(settings, "FAULT_INDEX_ENABLED", False)
+    response = TestClient(main.app).get("/ready")
+    assert response.status_code == 200
+    assert response.json()["fault_index"]["ready"] is False
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from config import settings
+from schemas import FaultRequestPage, UserResponse
+from tests.conftest import auth_headers, create_fault_requests, create_user
+from utils.response_cache import MemoryCacheBackend, ResponseCache, response_cache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "backend", MemoryCacheBackend(100))
+    monkeypatch.setattr(response_cache, "hits", 0)
+    return response_cache
+
+
+def reference_bytes(model, payload) -> bytes:
+    """Bytes FastAPI renders for `payload` from a route with `response_model=model`"""
+    app = FastAPI()
+    app.get("/reference", response_model=model)(lambda: payload)
+    return TestClient(app).get("/reference").content
+
+
+def test_me_matches_uncached_response(client, db, cache):
+    user = create_user(db, "consumer@example.com")
+    headers = auth_headers(user)
+
+    miss = client.get("/api/auth/me", headers=headers)
+    hit = client.get("/api/auth/me", headers=headers)
+    assert miss.status_code == hit.status_code == 200
+    assert cache.hits == 1
+    assert hit.content == miss.content
+    stored = asyncio.run(db["users"].find_one({"_id": user["_id"]}))
+    assert miss.content == reference_bytes(UserResponse, UserResponse.from_document(stored))
+    assert miss.json()["_id"] == str(user["_id"])
+
+
+def test_fault_request_list_matches_uncached_response(client, db, cache):
+    consumer = create_user(db, "consumer@example.com")
+    crew = create_user(db, "crew@example.com", role="electrician")
+    create_fault_requests(db, consumer, [crew], 5)
+    headers = auth_headers(consumer)
+
+    miss = client.get("/api/consumer/fault-requests", headers=headers)
+    hit = client.get("/api/consumer/fault-requests", headers=headers)
+    assert miss.status_code == hit.status_code == 200
+    assert cache.hits == 1
+    assert hit.content == miss.content
+    assert miss.content == reference_bytes(FaultRequestPage, miss.json())
+
+
+def test_if_none_match_returns_304(client, db, cache):
+    user = create_user(db, "consumer@example.com")
+    headers = auth_headers(user)
+    etag = client.get("/api/auth/me", headers=headers).headers["etag"]
+
+    response = client.get("/api/auth/me", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_memory_backend_is_refused_with_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "WORKERS", 4)
+    cache = ResponseCache()
+    with pytest.raises(RuntimeError):
+        cache.configure()
+
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    cache.configure()
+    assert not cache.enabled
+
+    monkeypatch.setattr(settings, "WORKERS", 1)
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    cache.configure()
+    assert isinstance(cache.backend, MemoryCacheBackend)
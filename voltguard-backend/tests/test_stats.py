@@ -0,0 +1,42 @@
+import asyncio
+from repositories import FaultStatsRepository
+from tests.conftest import auth_headers, create_fault_requests, create_user
+
+
+def counters(db) -> dict:
+    return asyncio.run(FaultStatsRepository(db).get()) or {}
+
+
+def reconciled(db) -> dict:
+    return asyncio.run(FaultStatsRepository(db).reconcile(db["fault_requests"]))
+
+
+def test_assignment_is_counted_once(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    crew = create_user(db, "crew@example.com", role="electrician")
+    request_id = str(create_fault_requests(db, consumer, [], 1)[0]["_id"])
+    path = f"/api/electrician/fault-request/{request_id}/assign"
+
+    assert client.put(path, headers=auth_headers(crew), json={"status": "assigned"}).status_code == 200
+    assert client.put(path, headers=auth_headers(crew), json={"status": "in_progress"}).status_code == 200
+    assert client.put(f"/api/consumer/fault-request/{request_id}/cancel", headers=auth_headers(consumer)).status_code == 200
+
+    assert counters(db)["assignments"] == 1
+    assert counters(db)["by_electrician"][str(crew["_id"])] == {"assigned": 0, "in_progress": 0, "closed": 1}
+    assert reconciled(db)["assignments"] == 1
+
+
+def test_legacy_assignments_are_not_counted_on_later_changes(client, db):
+    consumer = create_user(db, "consumer@example.com")
+    crew = create_user(db, "crew@example.com", role="electrician")
+    # Assigned before assigned_at was recorded
+    legacy = create_fault_requests(db, consumer, [crew], 2)
+    for document in legacy:
+        asyncio.run(db["fault_requests"].update_one({"_id": document["_id"]}, {"$unset": {"assigned_at": ""}}))
+
+    for document in legacy:
+        response = client.put(f"/api/consumer/fault-request/{document['_id']}/cancel", headers=auth_headers(consumer))
+        assert response.status_code == 200
+
+    assert counters(db).get("assignments", 0) == 0
+    assert reconciled(db)["assignments"] == 0
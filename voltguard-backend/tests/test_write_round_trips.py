@@ -0,0 +1,73 @@
+import pytest
+from config import settings
+from tests.conftest import auth_headers, create_user
+
+FAULT = {
+    "title": "Sparking pole",
+    "description": "Sparks from the pole outside number 12",
+    "location": "Main road",
+    "priority": "high",
+    "latitude": 13.0,
+    "longitude": 80.0
+}
+
+
+@pytest.fixture
+def consumer(db):
+    return create_user(db, "consumer@example.com")
+
+
+@pytest.fixture(autouse=True)
+def no_duplicate_lookup(monkeypatch):
+    # Duplicate detection reads nearby requests before the insert; not a read-back
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", False)
+
+
+def test_create_fault_request_does_not_read_back(client, db, consumer):
+    db.reset()
+    response = client.post("/api/consumer/fault-request/create", headers=auth_headers(consumer), json=FAULT)
+    assert response.status_code == 200, response.text
+    assert db.calls == {("fault_requests", "insert_one"): 1, ("stats", "update_one"): 1}
+    assert response.json()["title"] == FAULT["title"]
+    assert response.json()["consumer_id"] == str(consumer["_id"])
+
+
+def test_send_message_does_not_read_back(client, db, consumer):
+    headers = auth_headers(consumer)
+    request_id = client.post("/api/consumer/fault-request/create", headers=headers, json=FAULT).json()["id"]
+
+    db.reset()
+    response = client.post("/api/chat/send", headers=headers, json={"request_id": request_id, "content": "Any update?"})
+    assert response.status_code == 200, response.text
+    # One permission check on the request, one insert, nothing read back
+    assert db.calls == {("fault_requests", "find_one"): 1, ("messages", "insert_one"): 1}
+    assert response.json()["content"] == "Any update?"
+
+
+def test_update_location_writes_in_one_round_trip(client, db, consumer):
+    db.reset()
+    response = client.post(
+        "/api/consumer/location/update",
+        headers=auth_headers(consumer),
+        json={"latitude": 13.05, "longitude": 80.2}
+    )
+    assert response.status_code == 200, response.text
+    assert db.calls == {("consumer_locations", "find_one_and_update"): 1, ("location_history", "update_one"): 1}
+    assert response.json()["latitude"] == 13.05
+
+
+def test_update_role_does_not_read_back(client, db, consumer):
+    db.reset()
+    response = client.put("/api/auth/update-role", headers=auth_headers(consumer))
+    assert response.status_code == 200, response.text
+    assert db.calls == {("users", "find_one_and_update"): 1}
+    assert response.json()["user"]["role"] == "electrician"
+
+
+def test_update_profile_does_not_read_back(client, db, consumer):
+    db.reset()
+    response = client.put("/api/auth/update-profile?city=Chennai", headers=auth_headers(consumer))
+    assert response.status_code == 200, response.text
+    # Existence check plus the update, which returns the stored user
+    assert db.calls == {("users", "find_one"): 1, ("users", "find_one_and_update"): 1}
+    assert response.json()["city"] == "Chennai"
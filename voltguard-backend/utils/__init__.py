@@ -1,3 +1,17 @@
-from .auth import hash_password, verify_password, create_access_token, decode_access_token
+from .auth import (
+    hash_password,
+    verify_password,
+    create_access_token,
+    decode_access_token,
+    get_token_principal,
+    principal_cache,
+    password_needs_rehash,
+    password_hasher
+)
+from .users import resolve_user_names, resolve_assigned_names
 
-__all__ = ["hash_password", "verify_password", "create_access_token", "decode_access_token"]
+__all__ = [
+    "hash_password", "verify_password", "create_access_token", "decode_access_token",
+    "get_token_principal", "principal_cache", "password_needs_rehash", "password_hasher",
+    "resolve_user_names", "resolve_assigned_names"
+]
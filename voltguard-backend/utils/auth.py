@@ -1,19 +1,136 @@
+import asyncio
 import bcrypt
+import hashlib
 import jwt
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+from bson import ObjectId
+from bson.errors import InvalidId
 from config import settings
+from database import get_db
+from repositories.users import UserRepository
 from fastapi import Depends, HTTPException, status, Header
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     """Hash password using bcrypt"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds or settings.BCRYPT_ROUNDS)
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
 def verify_password(password: str, password_hash: str) -> bool:
     """Verify password against hash"""
     return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
 
+def password_needs_rehash(password_hash: str) -> bool:
+    """Check whether a bcrypt hash was made with a different cost factor than configured"""
+    try:
+        # Hash format: $2b$<cost>$<salt+digest>
+        return int(password_hash.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop on a bounded worker pool
+    
+    Each bcrypt call takes hundreds of milliseconds of CPU, so running it inline
+    would stall every other request on the worker. At most `max_workers` calls
+    run at once; up to `max_queue` more wait for a slot, and anything beyond
+    that is rejected with 503.
+    """
+    
+    def __init__(self, executor_type: str, max_workers: int, max_queue: int):
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._semaphore = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+    
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+    
+    async def _run(self, func, *args):
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        
+        started_at = time.perf_counter()
+        self.total_wait_seconds += started_at - queued_at
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_run_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password on the worker pool"""
+        return await self._run(hash_password, password, settings.BCRYPT_ROUNDS)
+    
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """Verify a password on the worker pool"""
+        return await self._run(verify_password, password, password_hash)
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_seconds * 1000 / self.completed, 2) if self.completed else 0.0,
+            "avg_run_ms": round(self.total_run_seconds * 1000 / self.completed, 2) if self.completed else 0.0
+        }
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.BCRYPT_EXECUTOR,
+    max_workers=settings.BCRYPT_MAX_WORKERS,
+    max_queue=settings.BCRYPT_MAX_QUEUE
+)
+
 def create_access_token(user_id: str, email: str, role: str) -> str:
     """Create JWT access token"""
     payload = {
@@ -37,7 +154,145 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(authorization: Optional[str] = Header(None)) -> dict:
+class PrincipalCache:
+    """
+    Bounded LRU cache of verified tokens to their principal
+    
+    Entries are keyed by a SHA-256 digest of the token so raw tokens are never
+    kept in memory, and expire at the token's `exp` or after `ttl_seconds`,
+    whichever comes first. Principals hold the role from the user document,
+    and `invalidate_user` drops a user's entries when that role changes.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # digest -> (principal, expires_at)
+        self._by_user = {}  # user_id -> set of digests
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+    
+    def get(self, token: str) -> Optional[dict]:
+        """Get the cached principal for a token, or None on a miss"""
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        principal, expires_at = entry
+        if expires_at <= time.time():
+            self._remove(digest)
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return principal
+    
+    def put(self, token: str, principal: dict, exp: Optional[float] = None):
+        """Cache the principal of a verified token"""
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        
+        digest = self._digest(token)
+        self._remove(digest)
+        self._entries[digest] = (principal, expires_at)
+        self._by_user.setdefault(principal["_id"], set()).add(digest)
+        
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def invalidate_user(self, user_id: str):
+        """Drop every cached token of a user (e.g. after a role change)"""
+        for digest in self._by_user.pop(str(user_id), set()):
+            if self._entries.pop(digest, None) is not None:
+                self.invalidations += 1
+    
+    def clear(self):
+        self._entries.clear()
+        self._by_user.clear()
+    
+    def _remove(self, digest: str):
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        user_id = entry[0]["_id"]
+        digests = self._by_user.get(user_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._by_user[user_id]
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
+# What a principal is built from
+PRINCIPAL_PROJECTION = {"email": 1, "role": 1}
+
+principal_cache = PrincipalCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS
+)
+
+
+async def get_token_principal(token: str, db) -> Optional[dict]:
+    """
+    Get the principal (`_id`, `email`, `role`) of a valid access token
+    
+    The email and role come from the user document rather than the token's
+    claims, so a role change applies to tokens already issued. Principals are
+    cached, so repeated requests with the same token skip both the signature
+    check and the read. Returns None for invalid or expired tokens and for
+    users that no longer exist.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    
+    payload = decode_access_token(token)
+    if not payload or not payload.get("user_id"):
+        return None
+    try:
+        user_id = ObjectId(payload["user_id"])
+    except (InvalidId, TypeError):
+        return None
+    
+    user = await UserRepository(db).get_by_id(user_id, PRINCIPAL_PROJECTION)
+    if not user:
+        return None
+    
+    principal = {
+        "_id": payload["user_id"],
+        "email": user.get("email"),
+        "role": user.get("role")
+    }
+    principal_cache.put(token, principal, exp=payload.get("exp"))
+    return principal
+
+
+async def get_current_user(authorization: Optional[str] = Header(None), db = Depends(get_db)) -> dict:
     """
     Get current user from JWT token in Authorization header
     """
@@ -61,28 +316,14 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    payload = decode_access_token(token)
+    principal = await get_token_principal(token, db)
     
-    if not payload:
+    if not principal:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id = payload.get("user_id")
-    email = payload.get("email")
-    role = payload.get("role")
-    
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return {
-        "_id": user_id,
-        "email": email,
-        "role": role
-    }
+    # Hand out a copy so callers cannot alter the cached principal
+    return dict(principal)
@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+from config import settings
+from repositories.messages import CURSOR_OVERLAP_SECONDS
+
+# Server error returned when change streams are not available (standalone mongod)
+CHANGE_STREAMS_UNSUPPORTED = 40573
+
+# Messages buffered per connection before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class ChatHub:
+    """
+    In-process fan-out of new chat messages to WebSocket subscribers
+
+    A single change stream on `messages` feeds every room in the process, so
+    idle connections cost one queue each and no database work. When change
+    streams are unavailable the hub polls for new messages in the active
+    rooms instead.
+    """
+
+    def __init__(self):
+        self.rooms: dict = {}
+        self.mode: Optional[str] = None
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db):
+        """Start watching the messages collection"""
+        self._db = db
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop watching and drop all subscribers"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.rooms.clear()
+
+    def subscribe(self, request_id: str) -> asyncio.Queue:
+        """Register a subscriber for a fault request chat room"""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.rooms.setdefault(request_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, request_id: str, queue: asyncio.Queue):
+        """Remove a subscriber, dropping the room once it is empty"""
+        subscribers = self.rooms.get(request_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self.rooms[request_id]
+
+    def publish(self, message: dict):
+        """Deliver a message document to every subscriber of its room"""
+        for queue in self.rooms.get(message.get("request_id"), ()):
+            if queue.full():
+                # Slow client: drop its oldest pending message rather than block the hub
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def _run(self):
+        try:
+            await self._watch()
+        except OperationFailure as e:
+            if e.code != CHANGE_STREAMS_UNSUPPORTED:
+                raise
+            print("⚠️ Change streams unavailable, chat hub falling back to polling")
+            await self._poll()
+
+    async def _watch(self):
+        """Push inserts from a change stream, resuming after transient errors"""
+        self.mode = "change_stream"
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        resume_token = None
+
+        while True:
+            try:
+                async with self._db["messages"].watch(pipeline, resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self.publish(change["fullDocument"])
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    raise
+                # The token may have fallen off the oplog and would fail every retry; start a
+                # fresh stream (messages in the gap are still in the REST history)
+                resume_token = None
+                print(f"⚠️ Chat change stream error: {e}")
+            except PyMongoError as e:
+                print(f"⚠️ Chat change stream error: {e}")
+            await asyncio.sleep(settings.CHAT_POLL_INTERVAL_SECONDS)
+
+    async def _poll(self):
+        """
+        Fetch new messages for the active rooms
+
+        Each poll re-reads CURSOR_OVERLAP_SECONDS before the newest message
+        seen, because a message whose ObjectId sorts earlier can commit later,
+        and skips the ids it has already published.
+        """
+        self.mode = "polling"
+        newest = datetime.utcnow()
+        delivered = set()
+
+        while True:
+            await asyncio.sleep(settings.CHAT_POLL_INTERVAL_SECONDS)
+            if not self.rooms:
+                continue
+            lower = ObjectId.from_datetime(newest - timedelta(seconds=CURSOR_OVERLAP_SECONDS))
+            delivered = {message_id for message_id in delivered if message_id >= lower}
+            try:
+                async for message in self._db["messages"].find({
+                    "request_id": {"$in": list(self.rooms)},
+                    "_id": {"$gte": lower}
+                }).sort("_id", 1):
+                    if message["_id"] in delivered:
+                        continue
+                    delivered.add(message["_id"])
+                    newest = max(newest, message["_id"].generation_time.replace(tzinfo=None))
+                    self.publish(message)
+            except PyMongoError as e:
+                print(f"⚠️ Chat polling error: {e}")
+
+
+chat_hub = ChatHub()
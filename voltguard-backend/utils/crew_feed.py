@@ -0,0 +1,293 @@
+import asyncio
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from config import settings
+from utils.chat_hub import CHANGE_STREAMS_UNSUPPORTED
+
+# Subscribers are indexed on a grid of this many degrees
+CELL_DEGREES = 1.0
+
+# Boxes covering more cells than this are checked against every fix instead
+MAX_SUBSCRIBER_CELLS = 400
+
+# Location fields a feed event carries
+FEED_FIELDS = ("user_id", "latitude", "longitude", "accuracy", "is_sharing", "updated_at")
+FEED_PROJECTION = {"_id": 0, **{field: 1 for field in FEED_FIELDS}}
+
+# Each poll re-reads rows written this long before the newest one seen, since a
+# write stamped earlier can commit later
+POLL_OVERLAP_SECONDS = 2
+
+
+def _cell(latitude: float, longitude: float) -> tuple:
+    return (math.floor(latitude / CELL_DEGREES), math.floor(longitude / CELL_DEGREES))
+
+
+class CrewFeedSubscriber:
+    """
+    One live map client: a bounding box plus the changes waiting to be sent
+
+    Pending changes are keyed by user, so a user who moves several times
+    between two sends is delivered once, at their latest fix.
+    """
+
+    def __init__(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+        self.box = (min_lat, min_lon, max_lat, max_lon)
+        self.visible: set = set()
+        self.pending: dict = {}
+        self.removed: set = set()
+        self.wakeup = asyncio.Event()
+        self.cells: list = []
+        self.last_sent = 0.0
+
+    def contains(self, fix: dict) -> bool:
+        min_lat, min_lon, max_lat, max_lon = self.box
+        return min_lat <= fix["latitude"] <= max_lat and min_lon <= fix["longitude"] <= max_lon
+
+    async def next_changes(self) -> tuple:
+        """
+        Wait for pending changes and take them as (locations, removed user ids)
+
+        Sends are spaced at least CREW_FEED_MIN_INTERVAL_MS apart; changes
+        arriving in between are coalesced into the next send.
+        """
+        await self.wakeup.wait()
+        delay = self.last_sent + settings.CREW_FEED_MIN_INTERVAL_MS / 1000 - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        locations, removed = list(self.pending.values()), list(self.removed)
+        self.pending, self.removed = {}, set()
+        self.wakeup.clear()
+        self.last_sent = time.monotonic()
+        return locations, removed
+
+
+class CrewFeed:
+    """
+    In-process fan-out of shared locations to live map subscribers
+
+    One change stream on `consumer_locations` feeds every subscriber in the
+    process, and the latest fix of every sharing user is kept in memory to
+    answer each new subscriber's snapshot, so the database load does not
+    grow with the number of open maps. Subscribers are indexed by grid
+    cell, so a fix only touches the maps whose box it falls in plus those
+    currently showing that user (to send removals). Without change streams
+    (standalone mongod) rows written since the last poll are fetched every
+    CREW_FEED_POLL_SECONDS, keyed on the server-stamped `written_at`.
+    """
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.subscribers: set = set()
+        self.published = 0
+        self.locations: dict = {}
+        self._cells: dict = {}
+        self._wide: set = set()
+        self._watchers: dict = {}
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db):
+        """Start watching the current locations"""
+        self._db = db
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop watching and drop all subscribers"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for subscriber in list(self.subscribers):
+            self.unsubscribe(subscriber)
+        self.locations = {}
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint"""
+        return {
+            "mode": self.mode,
+            "subscribers": len(self.subscribers),
+            "sharing_users": len(self.locations),
+            "published": self.published
+        }
+
+    def subscribe(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> CrewFeedSubscriber:
+        """Register a subscriber for a bounding box"""
+        subscriber = CrewFeedSubscriber(min_lat, min_lon, max_lat, max_lon)
+        low, high = _cell(min_lat, min_lon), _cell(max_lat, max_lon)
+        if (high[0] - low[0] + 1) * (high[1] - low[1] + 1) > MAX_SUBSCRIBER_CELLS:
+            self._wide.add(subscriber)
+        else:
+            subscriber.cells = [
+                (row, column)
+                for row in range(low[0], high[0] + 1)
+                for column in range(low[1], high[1] + 1)
+            ]
+            for cell in subscriber.cells:
+                self._cells.setdefault(cell, set()).add(subscriber)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def snapshot(self, subscriber: CrewFeedSubscriber) -> list:
+        """Current sharing users inside the subscriber's box, now tracked as visible to it"""
+        fixes = [fix for fix in self.locations.values() if subscriber.contains(fix)]
+        for fix in fixes:
+            subscriber.visible.add(fix["user_id"])
+            self._watchers.setdefault(fix["user_id"], set()).add(subscriber)
+        return fixes
+
+    def unsubscribe(self, subscriber: CrewFeedSubscriber):
+        """Remove a subscriber from every index"""
+        self.subscribers.discard(subscriber)
+        self._wide.discard(subscriber)
+        for cell in subscriber.cells:
+            members = self._cells.get(cell)
+            if members is not None:
+                members.discard(subscriber)
+                if not members:
+                    del self._cells[cell]
+        for user_id in subscriber.visible:
+            watchers = self._watchers.get(user_id)
+            if watchers is not None:
+                watchers.discard(subscriber)
+                if not watchers:
+                    del self._watchers[user_id]
+
+    def show(self, subscriber: CrewFeedSubscriber, fix: dict):
+        """Queue a location for a subscriber and remember that it shows the user"""
+        user_id = fix["user_id"]
+        subscriber.pending[user_id] = fix
+        subscriber.removed.discard(user_id)
+        if user_id not in subscriber.visible:
+            subscriber.visible.add(user_id)
+            self._watchers.setdefault(user_id, set()).add(subscriber)
+        subscriber.wakeup.set()
+
+    def publish(self, fix: dict):
+        """Route a current-location document to the subscribers it concerns"""
+        user_id = fix.get("user_id")
+        if user_id is None or fix.get("latitude") is None or fix.get("longitude") is None:
+            return
+        self.published += 1
+        sharing = fix.get("is_sharing", True)
+        if sharing:
+            self.locations[user_id] = fix
+            for subscriber in self._cells.get(_cell(fix["latitude"], fix["longitude"]), ()):
+                if subscriber.contains(fix):
+                    self.show(subscriber, fix)
+            for subscriber in self._wide:
+                if subscriber.contains(fix):
+                    self.show(subscriber, fix)
+        else:
+            self.locations.pop(user_id, None)
+
+        # Maps showing the user that it has now left (or stopped sharing)
+        for subscriber in list(self._watchers.get(user_id, ())):
+            if sharing and subscriber.contains(fix):
+                continue
+            subscriber.visible.discard(user_id)
+            subscriber.pending.pop(user_id, None)
+            subscriber.removed.add(user_id)
+            self._watchers[user_id].discard(subscriber)
+            subscriber.wakeup.set()
+        if not self._watchers.get(user_id, True):
+            del self._watchers[user_id]
+
+    async def _run(self):
+        try:
+            await self._watch()
+        except OperationFailure as e:
+            if e.code != CHANGE_STREAMS_UNSUPPORTED:
+                raise
+            print("⚠️ Change streams unavailable, crew feed falling back to polling")
+            await self._poll()
+
+    async def _watch(self):
+        """Publish location changes from a change stream, resuming after transient errors"""
+        self.mode = "change_stream"
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}},
+            {"$project": {f"fullDocument.{field}": 1 for field in FEED_FIELDS}}
+        ]
+        resume_token = None
+
+        while True:
+            try:
+                async with self._db["consumer_locations"].watch(
+                    pipeline, full_document="updateLookup", resume_after=resume_token
+                ) as stream:
+                    # Snapshot after the stream opens, so no change falls between the two
+                    await self._load()
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        if change.get("fullDocument"):
+                            self.publish(change["fullDocument"])
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    raise
+                # The token may have fallen off the oplog (ChangeStreamHistoryLost) and would fail
+                # every retry; start a fresh stream, whose snapshot covers the gap
+                resume_token = None
+                print(f"⚠️ Crew feed change stream error: {e}")
+            except PyMongoError as e:
+                print(f"⚠️ Crew feed change stream error: {e}")
+            await asyncio.sleep(settings.CREW_FEED_POLL_SECONDS)
+
+    async def _load(self):
+        """
+        Bring the in-memory locations up to the sharing users' current rows
+
+        Runs again whenever the stream is reopened, so changes missed in
+        between are published: moved users as updates, and users no longer
+        sharing as removals to the maps showing them.
+        """
+        fixes = await self._db["consumer_locations"].find({"is_sharing": True}, FEED_PROJECTION).to_list(None)
+        current = {fix["user_id"]: fix for fix in fixes if fix.get("user_id") is not None}
+        for user_id in self.locations.keys() - current.keys():
+            self.publish({**self.locations[user_id], "is_sharing": False})
+        for user_id, fix in current.items():
+            if self.locations.get(user_id) != fix:
+                self.publish(fix)
+
+    async def _poll(self):
+        """Fetch rows written since the last poll"""
+        self.mode = "polling"
+        locations = self._db["consumer_locations"]
+        while True:
+            try:
+                newest = await locations.find({}, {"written_at": 1}).sort("written_at", -1).limit(1).to_list(1)
+                await self._load()
+                break
+            except PyMongoError as e:
+                print(f"⚠️ Crew feed load error: {e}")
+                await asyncio.sleep(settings.CREW_FEED_POLL_SECONDS)
+
+        # Server timestamps only, so the app's clock never decides what is new
+        last_seen = (newest[0].get("written_at") if newest else None) or datetime(1970, 1, 1)
+        delivered = set()
+        while True:
+            await asyncio.sleep(settings.CREW_FEED_POLL_SECONDS)
+            lower = last_seen - timedelta(seconds=POLL_OVERLAP_SECONDS)
+            delivered = {key for key in delivered if key[1] >= lower}
+            try:
+                async for fix in locations.find(
+                    {"written_at": {"$gte": lower}}, {**FEED_PROJECTION, "written_at": 1}
+                ).sort("written_at", 1):
+                    written_at = fix.pop("written_at")
+                    key = (fix.get("user_id"), written_at)
+                    if key in delivered:
+                        continue
+                    delivered.add(key)
+                    last_seen = max(last_seen, written_at)
+                    self.publish(fix)
+            except PyMongoError as e:
+                print(f"⚠️ Crew feed polling error: {e}")
+
+
+crew_feed = CrewFeed()
@@ -0,0 +1,214 @@
+import math
+import re
+from array import array
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo.errors import PyMongoError
+from config import settings
+from models.geo import KM_PER_DEGREE
+from repositories import FaultRequestRepository
+
+# Shingle hashes kept per bottom-k MinHash signature; estimates have ~1/sqrt(k) error,
+# and texts with fewer shingles than this are compared exactly
+SIGNATURE_SIZE = 64
+
+_MAX_HASH = (1 << 64) - 1
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Character shingle length; short enough to match "downed"/"down", "st"/"street" prefixes
+SHINGLE_LENGTH = 3
+
+
+def shingles(text: str) -> set:
+    """Character trigrams of each normalized word, plus the words themselves"""
+    result = set()
+    for word in _WORD.findall(text.lower()):
+        result.add(word)
+        padded = f" {word} "
+        for start in range(len(padded) - SHINGLE_LENGTH + 1):
+            result.add(padded[start:start + SHINGLE_LENGTH])
+    return result
+
+
+def signature(text: str) -> array:
+    """
+    Bottom-k MinHash signature: the SIGNATURE_SIZE smallest hashes of a text's shingles, sorted
+
+    One hash function and a sort, instead of a minimum per hash
+    function, so a signature costs about as much as building the shingles.
+    Shingle hashes come from the built-in `hash`, so signatures are only
+    comparable within one process, which is all the in-memory index needs.
+    """
+    return array("Q", sorted({hash(shingle) & _MAX_HASH for shingle in shingles(text)})[:SIGNATURE_SIZE])
+
+
+def similarity(first: array, second: array) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    hashes = set(first)
+    union = hashes.union(second)
+    if len(union) <= SIGNATURE_SIZE:
+        # Short texts: the signatures hold every shingle, so this is the exact similarity
+        return len(hashes.intersection(second)) / len(union) if union else 0.0
+    # Share of the union's SIGNATURE_SIZE smallest hashes found in both signatures
+    largest = sorted(union)[SIGNATURE_SIZE - 1]
+    return sum(1 for value in hashes.intersection(second) if value <= largest) / SIGNATURE_SIZE
+
+
+def report_text(doc: dict) -> str:
+    return f"{doc.get('title') or ''} {doc.get('description') or ''}"
+
+
+class DuplicateDetector:
+    """
+    Spatial grid of open fault requests for duplicate detection at create time
+
+    The fault index feeds every open request in (and takes closed ones
+    out), so a lookup only visits the grid cells around the new report
+    instead of querying the database. Cells are DEDUP_RADIUS_METERS tall.
+    MinHash signatures of title and description are computed the first
+    time a request is compared and cached, so a snapshot load costs no
+    hashing. When the fault index is not ready, candidates come from a
+    `$geoNear` query instead.
+    """
+
+    def __init__(self):
+        self._points: dict = {}  # _id -> (latitude, longitude, created_at, parent_id, text)
+        self._cells: dict = {}
+        self._signatures: dict = {}
+        self.checked = 0
+        self.linked = 0
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint"""
+        return {
+            "enabled": settings.DEDUP_ENABLED,
+            "indexed": len(self._points),
+            "signatures": len(self._signatures),
+            "checked": self.checked,
+            "linked": self.linked
+        }
+
+    @staticmethod
+    def _cell_degrees() -> float:
+        return settings.DEDUP_RADIUS_METERS / 1000 / KM_PER_DEGREE
+
+    def _cell(self, latitude: float, longitude: float) -> tuple:
+        size = self._cell_degrees()
+        return (math.floor(latitude / size), math.floor(longitude / size))
+
+    def add(self, doc: dict):
+        """Index an open request (replacing any earlier version of it)"""
+        self.remove(doc["_id"])
+        latitude, longitude = doc.get("latitude"), doc.get("longitude")
+        if latitude is None or longitude is None:
+            return
+        self._points[doc["_id"]] = (
+            latitude, longitude, doc.get("created_at"), doc.get("parent_id"), report_text(doc)
+        )
+        self._cells.setdefault(self._cell(latitude, longitude), set()).add(doc["_id"])
+
+    def remove(self, request_id):
+        """Forget a request"""
+        point = self._points.pop(request_id, None)
+        self._signatures.pop(request_id, None)
+        if point is None:
+            return
+        cell = self._cell(point[0], point[1])
+        members = self._cells.get(cell)
+        if members is not None:
+            members.discard(request_id)
+            if not members:
+                del self._cells[cell]
+
+    def clear(self):
+        self._points = {}
+        self._cells = {}
+        self._signatures = {}
+
+    def _nearby(self, latitude: float, longitude: float, since: datetime) -> list:
+        """Indexed requests created since `since` within DEDUP_RADIUS_METERS, as candidate dicts"""
+        radius_km = settings.DEDUP_RADIUS_METERS / 1000
+        row, column = self._cell(latitude, longitude)
+        # Cells are square in degrees; a degree of longitude shrinks away from the equator
+        x_scale = math.cos(math.radians(latitude))
+        column_span = math.ceil(1 / max(x_scale, 0.01))
+
+        candidates = []
+        for cell_row in range(row - 1, row + 2):
+            for cell_column in range(column - column_span, column + column_span + 1):
+                for request_id in self._cells.get((cell_row, cell_column), ()):
+                    point_latitude, point_longitude, created_at, parent_id, text = self._points[request_id]
+                    if created_at is None or created_at < since:
+                        continue
+                    dy = (point_latitude - latitude) * KM_PER_DEGREE
+                    dx = (point_longitude - longitude) * KM_PER_DEGREE * x_scale
+                    distance_km = math.sqrt(dx * dx + dy * dy)
+                    if distance_km <= radius_km:
+                        candidates.append({
+                            "_id": request_id,
+                            "parent_id": parent_id,
+                            "distance": distance_km * 1000,
+                            "text": text
+                        })
+        return candidates
+
+    def _signature(self, candidate: dict) -> array:
+        cached = self._signatures.get(candidate["_id"])
+        if cached is None:
+            cached = signature(candidate["text"])
+            if candidate["_id"] in self._points:
+                self._signatures[candidate["_id"]] = cached
+        return cached
+
+    async def find_parent(self, db, doc: dict, in_memory: bool) -> Optional[tuple]:
+        """
+        Find the incident a new report most likely duplicates
+
+        Candidates are open requests within DEDUP_RADIUS_METERS created in the
+        last DEDUP_WINDOW_MINUTES, from the in-memory grid when `in_memory`
+        or a `$geoNear` query otherwise. The most similar one scoring at
+        least DEDUP_MIN_SIMILARITY wins (closest on ties). Returns
+        `(parent_id, score)`, where the parent is the candidate's own parent
+        if it is itself a duplicate, or None.
+        """
+        if not settings.DEDUP_ENABLED:
+            return None
+        latitude, longitude = doc.get("latitude"), doc.get("longitude")
+        if latitude is None or longitude is None:
+            return None
+
+        self.checked += 1
+        since = datetime.utcnow() - timedelta(minutes=settings.DEDUP_WINDOW_MINUTES)
+        if in_memory:
+            candidates = self._nearby(latitude, longitude, since)
+        else:
+            try:
+                candidates = await FaultRequestRepository(db).duplicate_candidates(
+                    latitude, longitude, settings.DEDUP_RADIUS_METERS, since, settings.DEDUP_MAX_CANDIDATES
+                )
+            except PyMongoError as e:
+                # Linking is best effort; never fail the report over it
+                print(f"⚠️ Duplicate lookup failed: {e}")
+                return None
+            for candidate in candidates:
+                candidate["text"] = report_text(candidate)
+        if not candidates:
+            return None
+
+        new_signature = signature(report_text(doc))
+        best = None
+        for candidate in candidates:
+            score = similarity(new_signature, self._signature(candidate))
+            key = (score, -candidate["distance"])
+            if score >= settings.DEDUP_MIN_SIMILARITY and (best is None or key > best[0]):
+                best = (key, candidate)
+        if best is None:
+            return None
+
+        self.linked += 1
+        parent = best[1]
+        return str(parent.get("parent_id") or parent["_id"]), best[0][0]
+
+
+duplicate_detector = DuplicateDetector()
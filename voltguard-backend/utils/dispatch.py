@@ -0,0 +1,255 @@
+import asyncio
+import heapq
+import math
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from config import settings
+from models.geo import KM_PER_DEGREE
+from repositories import FaultRequestRepository, FaultStatsRepository, LeaseRepository, LocationRepository
+from utils.fault_tiles import fault_tiles
+from utils.response_cache import response_cache
+
+# Nearest crews kept per fault; the greedy pass picks among these
+CANDIDATES_PER_FAULT = 8
+
+# One priority step outranks this much extra travel
+PRIORITY_WEIGHT_KM = 10.0
+
+# Waiting time counts like travel saved, up to a cap so old faults cannot swamp priority
+AGE_WEIGHT_KM_PER_HOUR = 1.0
+AGE_CAP_HOURS = 24.0
+
+# Statuses that take up a crew's capacity
+ACTIVE_STATUSES = ("assigned", "in_progress")
+
+# Only the worker holding this lease dispatches; it lasts this many rounds without renewal
+DISPATCH_LEASE = "dispatcher"
+LEASE_ROUNDS = 3
+
+
+def assignment_cost(distance_km: float, priority_rank: int, age_hours: float) -> float:
+    """Lower is better: travel distance offset by priority and waiting time"""
+    return (
+        distance_km
+        - PRIORITY_WEIGHT_KM * priority_rank
+        - AGE_WEIGHT_KM_PER_HOUR * min(age_hours, AGE_CAP_HOURS)
+    )
+
+
+def solve_assignments(faults: list, crews: list, max_distance_km: float, now: datetime) -> list:
+    """
+    Match open faults to crews greedily by cost
+
+    - **faults**: dicts with `_id`, `latitude`, `longitude`, `priority_rank`, `created_at`
+    - **crews**: dicts with `user_id`, `latitude`, `longitude`, `capacity`
+
+    Positions are projected onto a local plane around the batch's mean
+    latitude and crews are bucketed on a grid sized to their density. Each
+    fault searches outward ring by ring for its CANDIDATES_PER_FAULT nearest
+    crews within `max_distance_km`; the resulting pairs are then taken
+    cheapest first while the fault is free and the crew has capacity left.
+
+    Returns `(fault, crew, distance_km)` tuples.
+    """
+    crews = [crew for crew in crews if crew["capacity"] > 0]
+    if not faults or not crews or max_distance_km <= 0:
+        return []
+
+    # Equirectangular projection; accurate to ~1% over a region a few hundred km across
+    mean_latitude = sum(crew["latitude"] for crew in crews) / len(crews)
+    x_scale = KM_PER_DEGREE * math.cos(math.radians(mean_latitude))
+    crew_x = [crew["longitude"] * x_scale for crew in crews]
+    crew_y = [crew["latitude"] * KM_PER_DEGREE for crew in crews]
+
+    # Aim for a couple of crews per cell, within 1/20 and 1x the search radius
+    width = (max(crew_x) - min(crew_x)) or 1.0
+    height = (max(crew_y) - min(crew_y)) or 1.0
+    cell_km = min(max(math.sqrt(width * height / len(crews)) * 1.5, max_distance_km / 20), max_distance_km)
+    max_ring = math.ceil(max_distance_km / cell_km)
+
+    grid = {}
+    for crew_index in range(len(crews)):
+        cell = (math.floor(crew_x[crew_index] / cell_km), math.floor(crew_y[crew_index] / cell_km))
+        grid.setdefault(cell, []).append(crew_index)
+
+    pairs = []
+    for fault_index, fault in enumerate(faults):
+        x = fault["longitude"] * x_scale
+        y = fault["latitude"] * KM_PER_DEGREE
+        column, row = math.floor(x / cell_km), math.floor(y / cell_km)
+
+        candidates = []
+        for ring in range(max_ring + 1):
+            for cell_column in range(column - ring, column + ring + 1):
+                # Interior columns only contribute the top and bottom cells of the ring
+                edge = cell_column in (column - ring, column + ring)
+                cell_rows = range(row - ring, row + ring + 1) if edge else (row - ring, row + ring)
+                for cell_row in cell_rows:
+                    for crew_index in grid.get((cell_column, cell_row), ()):
+                        dx = crew_x[crew_index] - x
+                        dy = crew_y[crew_index] - y
+                        distance_km = math.sqrt(dx * dx + dy * dy)
+                        if distance_km <= max_distance_km:
+                            candidates.append((distance_km, crew_index))
+            # Anything in the next ring is at least ring * cell_km away
+            if len(candidates) >= CANDIDATES_PER_FAULT:
+                candidates.sort()
+                if candidates[CANDIDATES_PER_FAULT - 1][0] <= ring * cell_km:
+                    break
+        if not candidates:
+            continue
+
+        age_hours = (now - fault["created_at"]).total_seconds() / 3600
+        offset = assignment_cost(0.0, fault.get("priority_rank", 0), age_hours)
+        for distance_km, crew_index in heapq.nsmallest(CANDIDATES_PER_FAULT, candidates):
+            pairs.append((distance_km + offset, distance_km, fault_index, crew_index))
+
+    pairs.sort()
+
+    remaining = [crew["capacity"] for crew in crews]
+    assigned = set()
+    assignments = []
+    for _, distance_km, fault_index, crew_index in pairs:
+        if fault_index in assigned or remaining[crew_index] <= 0:
+            continue
+        assigned.add(fault_index)
+        remaining[crew_index] -= 1
+        assignments.append((faults[fault_index], crews[crew_index], distance_km))
+    return assignments
+
+
+class Dispatcher:
+    """
+    Background loop that assigns open faults to nearby crews
+
+    Every DISPATCH_INTERVAL_SECONDS it loads the open, unassigned faults and
+    the electricians sharing a recent location, solves the matching and
+    applies each assignment as a conditional update, so a fault claimed by
+    hand in the meantime is simply skipped.
+
+    Crew capacity is counted once per round, so two dispatchers running at
+    the same time could both fill the same crew. Every worker starts a
+    dispatcher, but only the one holding the `dispatcher` lease runs
+    rounds; it renews the lease each round, and another worker takes over
+    within LEASE_ROUNDS rounds if it stops.
+    """
+
+    def __init__(self):
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self.owner = str(ObjectId())
+        self.leader = False
+        self.runs = 0
+        self.assigned = 0
+        self.conflicts = 0
+        self.last_run_seconds: Optional[float] = None
+
+    async def start(self, db):
+        """Start dispatching if DISPATCH_ENABLED"""
+        if not settings.DISPATCH_ENABLED:
+            return
+        self._db = db
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the dispatch loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.leader:
+            self.leader = False
+            try:
+                await LeaseRepository(self._db).release(DISPATCH_LEASE, self.owner)
+            except PyMongoError as e:
+                print(f"⚠️ Could not release the dispatcher lease: {e}")
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint"""
+        return {
+            "enabled": settings.DISPATCH_ENABLED,
+            "leader": self.leader,
+            "runs": self.runs,
+            "assigned": self.assigned,
+            "conflicts": self.conflicts,
+            "last_run_seconds": self.last_run_seconds
+        }
+
+    async def dispatch_once(self) -> int:
+        """Run one dispatch round if this worker holds the lease; returns the number of faults assigned"""
+        started = asyncio.get_running_loop().time()
+        self.leader = await LeaseRepository(self._db).acquire(
+            DISPATCH_LEASE, self.owner, LEASE_ROUNDS * settings.DISPATCH_INTERVAL_SECONDS
+        )
+        if not self.leader:
+            return 0
+
+        now = datetime.utcnow()
+        fault_requests = FaultRequestRepository(self._db)
+
+        faults = await fault_requests.dispatch_candidates(settings.DISPATCH_BATCH_SIZE)
+        if not faults:
+            return 0
+
+        crews = await LocationRepository(self._db).sharing_electricians(
+            now - timedelta(minutes=settings.DISPATCH_FIX_MAX_AGE_MINUTES)
+        )
+        if not crews:
+            return 0
+
+        load = await fault_requests.active_assignment_counts(
+            [crew["user_id"] for crew in crews], ACTIVE_STATUSES
+        )
+        for crew in crews:
+            crew["capacity"] = settings.DISPATCH_CREW_CAPACITY - load.get(crew["user_id"], 0)
+
+        # CPU-bound; keep it off the event loop
+        assignments = await asyncio.to_thread(
+            solve_assignments, faults, crews, settings.DISPATCH_MAX_DISTANCE_KM, now
+        )
+
+        stats = FaultStatsRepository(self._db)
+        assigned_ids = []
+        for fault, crew, _ in assignments:
+            update_data = {
+                "status": "assigned",
+                "assigned_to": crew["user_id"],
+                "updated_at": datetime.utcnow()
+            }
+            previous = await fault_requests.update_status(
+                str(fault["_id"]),
+                update_data,
+                {"status": "open", "assigned_to": None, "version": fault.get("version", 0)}
+            )
+            if not previous:
+                self.conflicts += 1
+                continue
+            await stats.record_transition(previous, update_data)
+            fault_tiles.invalidate_fault(fault)
+            assigned_ids.append(str(fault["_id"]))
+
+        if assigned_ids:
+            await response_cache.invalidate_fault_requests(*assigned_ids)
+        assigned = len(assigned_ids)
+        self.assigned += assigned
+        self.last_run_seconds = asyncio.get_running_loop().time() - started
+        return assigned
+
+    async def _run(self):
+        while True:
+            try:
+                assigned = await self.dispatch_once()
+                self.runs += 1
+                if assigned:
+                    print(f"🚚 Dispatcher assigned {assigned} fault requests")
+            except PyMongoError as e:
+                print(f"⚠️ Dispatch round failed: {e}")
+            await asyncio.sleep(settings.DISPATCH_INTERVAL_SECONDS)
+
+
+dispatcher = Dispatcher()
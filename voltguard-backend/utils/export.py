@@ -0,0 +1,77 @@
+import csv
+import io
+from models.base import response_row
+from schemas.fault_request import FaultRequestResponse
+from utils.fast_json import encode_json, encode_jsonable
+from utils.users import resolve_assigned_names
+
+# Column order for CSV exports, matching the JSON field order
+EXPORT_FIELDS = tuple(FaultRequestResponse.model_fields)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+
+async def _batches(db, cursor, batch_size: int):
+    """Yield response rows one batch at a time, closing the cursor when done or abandoned"""
+    batch = []
+    try:
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield await _rows(db, batch)
+                batch = []
+        if batch:
+            yield await _rows(db, batch)
+    finally:
+        await cursor.close()
+
+
+async def _rows(db, batch: list) -> list:
+    assigned_names = await resolve_assigned_names(db, batch)
+    return [
+        response_row(doc, assigned_to_name=assigned_names.get(doc.get("assigned_to")))
+        for doc in batch
+    ]
+
+
+def _ndjson_chunk(rows: list) -> bytes:
+    return b"".join(encode_json(FaultRequestResponse, row) + b"\n" for row in rows)
+
+
+def _csv_chunk(rows: list, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        values = encode_jsonable(FaultRequestResponse, row)
+        writer.writerow(["" if values[field] is None else values[field] for field in EXPORT_FIELDS])
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_fault_requests(db, cursor, batch_size: int, format: str):
+    """
+    Encode a fault request cursor as NDJSON or CSV, one chunk per batch
+
+    Only one batch is held in memory at a time: the next batch is fetched
+    once the previous chunk has been handed to the server, so a slow client
+    slows the cursor down instead of letting rows pile up.
+    """
+    header = True
+    try:
+        async for rows in _batches(db, cursor, batch_size):
+            if format == "csv":
+                yield _csv_chunk(rows, header)
+                header = False
+            else:
+                yield _ndjson_chunk(rows)
+        if format == "csv" and header:
+            # Empty export still gets its header row
+            yield _csv_chunk([], True)
+    except Exception as e:
+        # Headers are already sent, so abort the response rather than end it cleanly truncated
+        print(f"⚠️ Fault request export failed: {e}")
+        raise
@@ -0,0 +1,279 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from config import settings
+from models.fault_request import priority_rank
+from repositories.fault_requests import QUEUE_ORDER, SUMMARY_PROJECTION
+from utils.chat_hub import CHANGE_STREAMS_UNSUPPORTED
+from utils.dedup import duplicate_detector
+from utils.pagination import encode_cursor
+from utils.fault_tiles import fault_tiles
+from utils.response_cache import response_cache
+
+EPOCH = datetime(1970, 1, 1)
+
+# How far the index may trail the database before it counts as behind: the age of the
+# last applied change, or the time since the change stream last ran dry
+STREAM_MAX_LAG_SECONDS = 5
+
+# Stored alongside the response fields so the index can order and page like the queue query
+INDEX_PROJECTION = {"geo": 0, "quadkey": 0}
+
+# Fields of a summary row: what the summary queue query reads, sort keys included
+SUMMARY_FIELDS = tuple(dict.fromkeys(["_id", *SUMMARY_PROJECTION, *(field for field, _ in QUEUE_ORDER)]))
+
+
+def change_lag(change: dict) -> float:
+    """Seconds since a change stream event was committed (0 if the event carries no time)"""
+    committed = change.get("wallTime")
+    if committed is None and change.get("clusterTime") is not None:
+        committed = change["clusterTime"].as_datetime()
+    if committed is None:
+        return 0.0
+    if committed.tzinfo is not None:
+        committed = committed.astimezone(timezone.utc).replace(tzinfo=None)
+    return max(0.0, (datetime.utcnow() - committed).total_seconds())
+
+
+def queue_key(doc: dict) -> tuple:
+    """Heap key matching the queue sort: priority_rank, created_at and _id, all descending"""
+    created_at = doc.get("created_at") or EPOCH
+    return (
+        -doc.get("priority_rank", priority_rank(doc.get("priority"))),
+        -(created_at - EPOCH).total_seconds(),
+        bytes(255 - b for b in doc["_id"].binary)
+    )
+
+
+class FaultIndex:
+    """
+    Process-local priority index of open fault requests
+
+    Open requests live in a dict by `_id` plus a binary heap in queue order.
+    Updates push a fresh heap entry and leave the old one to be skipped
+    (lazy deletion); the heap is rebuilt once stale entries outnumber live
+    ones. `top(k)` walks the heap as a tree with a small frontier heap, so it
+    costs O(k log k) and never touches the rest of the index.
+
+    A change stream on `fault_requests` keeps the index current and
+    invalidates the local response and tile caches for each changed request. Without
+    change streams (standalone mongod) the index is reloaded every
+    FAULT_INDEX_POLL_SECONDS instead, but a snapshot that old would hide
+    recent writes, so reads are only served from it while it is `live`.
+    The duplicate detector's grid is fed from the same updates.
+    """
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.loaded = False
+        self.caught_up_at: Optional[float] = None
+        self._docs: dict = {}
+        self._entries: dict = {}
+        self._heap: list = []
+        self._sequence = itertools.count()
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db):
+        """Load the open requests and start following changes, if FAULT_INDEX_ENABLED"""
+        if not settings.FAULT_INDEX_ENABLED:
+            return
+        self._db = db
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop following changes and drop the index"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._reset()
+        self.loaded = False
+
+    @property
+    def ready(self) -> bool:
+        """Whether the index has loaded and recently caught up with the database"""
+        if not self.loaded or self.caught_up_at is None:
+            return False
+        if self.mode == "polling":
+            max_lag = 2 * settings.FAULT_INDEX_POLL_SECONDS
+        else:
+            max_lag = STREAM_MAX_LAG_SECONDS
+        return time.monotonic() - self.caught_up_at <= max_lag
+
+    @property
+    def live(self) -> bool:
+        """Whether reads may be served from the index: ready and following the change stream"""
+        return self.mode == "change_stream" and self.ready
+
+    def __len__(self):
+        return len(self._docs)
+
+    def stats(self) -> dict:
+        """Counters for the metrics and readiness endpoints"""
+        return {
+            "enabled": settings.FAULT_INDEX_ENABLED,
+            "mode": self.mode,
+            "ready": self.ready,
+            "live": self.live,
+            "open_requests": len(self._docs),
+            "heap_entries": len(self._heap),
+            "seconds_since_caught_up": (
+                None if self.caught_up_at is None else round(time.monotonic() - self.caught_up_at, 3)
+            )
+        }
+
+    def top(self, k: int, summary: bool = False) -> list:
+        """
+        The first `k` open requests in queue order (copies, safe to modify)
+
+        With `summary` the copies hold only the SUMMARY_FIELDS.
+        """
+        heap = self._heap
+        results = []
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and len(results) < k:
+            entry, position = heapq.heappop(frontier)
+            if self._entries.get(entry[2]) is entry:
+                doc = self._docs[entry[2]]
+                if summary:
+                    results.append({field: doc[field] for field in SUMMARY_FIELDS if field in doc})
+                else:
+                    results.append(dict(doc))
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return results
+
+    def page(self, limit: int, count: str = "none", summary: bool = False):
+        """
+        First page of the open queue, shaped like `paginate`'s result
+
+        Returns `(documents, next_cursor, total, total_is_estimate)`; the
+        cursor continues in the database with the regular keyset query.
+        """
+        documents = self.top(limit + 1, summary)
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = encode_cursor([
+                last.get("priority_rank", priority_rank(last.get("priority"))),
+                last["created_at"],
+                last["_id"]
+            ])
+        total = None if count == "none" else len(self._docs)
+        return documents, next_cursor, total, False
+
+    def upsert(self, doc: dict):
+        """Add or refresh a request; requests that are no longer open are removed"""
+        if doc.get("status") != "open":
+            self.remove(doc["_id"])
+            return
+        doc.pop("geo", None)
+        doc.pop("quadkey", None)
+        entry = (queue_key(doc), next(self._sequence), doc["_id"])
+        self._docs[doc["_id"]] = doc
+        self._entries[doc["_id"]] = entry
+        heapq.heappush(self._heap, entry)
+        duplicate_detector.add(doc)
+        self._compact()
+
+    def remove(self, request_id):
+        """Drop a request from the index (its heap entry goes stale)"""
+        self._docs.pop(request_id, None)
+        self._entries.pop(request_id, None)
+        duplicate_detector.remove(request_id)
+        self._compact()
+
+    def _compact(self):
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+
+    def _reset(self):
+        self._docs = {}
+        self._entries = {}
+        self._heap = []
+        duplicate_detector.clear()
+
+    async def _load(self):
+        """Replace the index with a fresh snapshot of the open requests"""
+        docs = await self._db["fault_requests"].find({"status": "open"}, INDEX_PROJECTION).to_list(None)
+        # Rebuild without awaiting, so readers never see a partial index
+        self._reset()
+        for doc in docs:
+            self.upsert(doc)
+        self.loaded = True
+
+    def _apply(self, change: dict):
+        if change["operationType"] == "delete":
+            self.remove(change["documentKey"]["_id"])
+        elif change.get("fullDocument") is not None:
+            self.upsert(change["fullDocument"])
+        else:
+            # Updated then deleted before the lookup ran
+            self.remove(change["documentKey"]["_id"])
+
+    async def _run(self):
+        try:
+            await self._watch()
+        except OperationFailure as e:
+            if e.code != CHANGE_STREAMS_UNSUPPORTED:
+                raise
+            print("⚠️ Change streams unavailable, fault index falling back to polling")
+            await self._poll()
+
+    async def _watch(self):
+        """Follow the change stream, reloading the snapshot whenever the stream is (re)opened"""
+        self.mode = "change_stream"
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+
+        while True:
+            try:
+                async with self._db["fault_requests"].watch(
+                    pipeline, full_document="updateLookup", max_await_time_ms=1000
+                ) as stream:
+                    # Snapshot after the stream opens, so no change falls between the two
+                    await self._load()
+                    print(f"📋 Fault index loaded ({len(self)} open requests)")
+                    while stream.alive:
+                        change = await stream.try_next()
+                        if change is None:
+                            self.caught_up_at = time.monotonic()
+                            continue
+                        # Writes from other workers reach this process's caches here
+                        fault_tiles.invalidate_fault(change.get("fullDocument"))
+                        self._apply(change)
+                        # Behind by as much as this change is old, however busy the stream is
+                        self.caught_up_at = time.monotonic() - change_lag(change)
+                        await response_cache.fault_request_changed(str(change["documentKey"]["_id"]))
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    raise
+                print(f"⚠️ Fault index change stream error: {e}")
+            except PyMongoError as e:
+                print(f"⚠️ Fault index change stream error: {e}")
+            self.caught_up_at = None
+            await asyncio.sleep(settings.FAULT_INDEX_POLL_SECONDS)
+
+    async def _poll(self):
+        """Reload the snapshot periodically"""
+        self.mode = "polling"
+        while True:
+            try:
+                await self._load()
+                self.caught_up_at = time.monotonic()
+            except PyMongoError as e:
+                print(f"⚠️ Fault index reload error: {e}")
+            await asyncio.sleep(settings.FAULT_INDEX_POLL_SECONDS)
+
+
+fault_index = FaultIndex()
@@ -0,0 +1,120 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+from config import settings
+from models.geo import QUADKEY_ZOOM, point_quadkey, tile_quadkey
+from repositories import FaultRequestRepository
+from schemas.fault_request import FaultTile
+from utils.fast_json import encode_json
+
+
+class FaultTileCache:
+    """
+    Clustered fault request map tiles, rendered once and cached in memory
+
+    A tile is split into cells TILE_CLUSTER_DEPTH zoom levels deeper, so a
+    tile holds at most 4 ** TILE_CLUSTER_DEPTH clusters however many faults
+    it contains. Rendered JSON is cached per tile and status filter.
+
+    A changed fault invalidates exactly the cached tiles containing it: the
+    prefixes of its quadkey. Write handlers call `invalidate_fault`, and the
+    fault index change stream does too for writes made by other workers.
+    Entries also expire after TILE_CACHE_TTL_SECONDS as a backstop.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()  # (quadkey, status) -> (body, expires_at)
+        self._statuses: dict = {}  # quadkey -> status filters cached for it
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations
+        }
+
+    def invalidate_fault(self, doc: Optional[dict]):
+        """Drop the cached tiles containing a fault request (needs its latitude/longitude)"""
+        if not doc:
+            return
+        quadkey = point_quadkey(doc.get("latitude"), doc.get("longitude"))
+        if quadkey is None:
+            return
+        self._generation += 1
+        self.invalidations += 1
+        for zoom in range(len(quadkey) + 1):
+            for status in self._statuses.pop(quadkey[:zoom], ()):
+                self._entries.pop((quadkey[:zoom], status), None)
+
+    def _store(self, key: tuple, body: bytes):
+        self._entries[key] = (body, time.monotonic() + settings.TILE_CACHE_TTL_SECONDS)
+        self._entries.move_to_end(key)
+        self._statuses.setdefault(key[0], set()).add(key[1])
+        while len(self._entries) > settings.TILE_CACHE_MAX_ENTRIES:
+            (quadkey, status), _ = self._entries.popitem(last=False)
+            statuses = self._statuses.get(quadkey)
+            if statuses is not None:
+                statuses.discard(status)
+                if not statuses:
+                    del self._statuses[quadkey]
+
+    async def render(self, db, z: int, x: int, y: int, status: Optional[str] = None) -> bytes:
+        """JSON for tile z/x/y, from the cache or a fresh aggregation"""
+        quadkey = tile_quadkey(z, x, y)
+        key = (quadkey, status)
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+        self.misses += 1
+
+        generation = self._generation
+        cluster_length = min(z + settings.TILE_CLUSTER_DEPTH, QUADKEY_ZOOM)
+        rows = await FaultRequestRepository(db).tile_clusters(quadkey, cluster_length, status)
+
+        clusters = {}
+        for row in rows:
+            cluster = clusters.setdefault(row["_id"]["cluster"], {
+                "quadkey": row["_id"]["cluster"],
+                "count": 0,
+                "latitude": 0.0,
+                "longitude": 0.0,
+                "by_status": {},
+                "by_priority": {}
+            })
+            count = row["count"]
+            cluster["count"] += count
+            cluster["latitude"] += row["latitude"]
+            cluster["longitude"] += row["longitude"]
+            by_status, by_priority = cluster["by_status"], cluster["by_priority"]
+            status_label = row["_id"].get("status") or "unknown"
+            priority_label = row["_id"].get("priority") or "unknown"
+            by_status[status_label] = by_status.get(status_label, 0) + count
+            by_priority[priority_label] = by_priority.get(priority_label, 0) + count
+
+        for cluster in clusters.values():
+            cluster["latitude"] /= cluster["count"]
+            cluster["longitude"] /= cluster["count"]
+
+        body = encode_json(FaultTile, {
+            "z": z,
+            "x": x,
+            "y": y,
+            "quadkey": quadkey,
+            "clusters": sorted(clusters.values(), key=lambda cluster: cluster["quadkey"]),
+            "total": sum(cluster["count"] for cluster in clusters.values())
+        })
+        # A fault changed while aggregating; serve this result but do not keep it
+        if generation == self._generation:
+            self._store(key, body)
+        return body
+
+
+fault_tiles = FaultTileCache()
@@ -0,0 +1,184 @@
+import asyncio
+import time
+from typing import Optional
+from pymongo.errors import PyMongoError
+from config import settings
+from models.location import Location
+from repositories import LocationRepository
+
+
+class LocationIngest:
+    """
+    Buffered writer for high-frequency GPS fixes
+
+    Handlers `submit` fixes into a bounded queue and answer immediately. A
+    single flush loop waits LOCATION_INGEST_FLUSH_MS after the first fix of
+    a batch, drains up to LOCATION_INGEST_BATCH_SIZE fixes and writes them
+    with `LocationRepository.save_batch`, which coalesces them per user.
+    When the queue is full `submit` refuses the fix so callers can apply
+    backpressure. On shutdown everything still queued is flushed.
+
+    A flush that fails with a database error is retried with exponential
+    backoff, up to LOCATION_INGEST_MAX_RETRIES times, while new fixes wait
+    in the queue. Retries are at least once: a retried history append can
+    store a fix twice, while current locations only ever move to a newer
+    fix. A batch that fails for any other reason, such as a fix that
+    cannot be encoded, is written one fix at a time so only the bad fixes
+    are dropped.
+    """
+
+    def __init__(self):
+        self._db = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: list = []
+        self._writing: Optional[asyncio.Future] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+        self.loop_errors = 0
+        self.flushes = 0
+        self.coalesced = 0
+        self.last_flush_seconds: Optional[float] = None
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, db):
+        """Start the flush loop if LOCATION_INGEST_ENABLED"""
+        if not settings.LOCATION_INGEST_ENABLED:
+            return
+        self._db = db
+        self._queue = asyncio.Queue(maxsize=settings.LOCATION_INGEST_QUEUE_SIZE)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still queued"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._writing:
+            await self._writing
+        remaining = self._batch + self._drain(self._queue.qsize())
+        self._batch = []
+        if remaining:
+            await self._write(remaining)
+
+    def submit(self, location: Location) -> bool:
+        """Queue a fix for writing; returns False when the queue is full"""
+        try:
+            self._queue.put_nowait((location, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.accepted += 1
+        return True
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint"""
+        return {
+            "enabled": settings.LOCATION_INGEST_ENABLED,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": settings.LOCATION_INGEST_QUEUE_SIZE,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "failed": self.failed,
+            "retries": self.retries,
+            "loop_errors": self.loop_errors,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "last_flush_seconds": self.last_flush_seconds,
+            "max_flush_seconds": round(self.max_flush_seconds, 6),
+            "mean_flush_seconds": (
+                round(self.total_flush_seconds / self.flushes, 6) if self.flushes else None
+            ),
+            "max_lag_seconds": round(self.max_lag_seconds, 6)
+        }
+
+    def _drain(self, limit: int) -> list:
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return items
+
+    async def _write(self, batch: list):
+        started = time.monotonic()
+        for attempt in range(settings.LOCATION_INGEST_MAX_RETRIES + 1):
+            try:
+                counts = await LocationRepository(self._db).save_batch([location for location, _ in batch])
+                break
+            except PyMongoError as e:
+                if attempt == settings.LOCATION_INGEST_MAX_RETRIES:
+                    self.failed += len(batch)
+                    print(f"⚠️ Location ingest flush failed, dropping {len(batch)} fixes: {e}")
+                    return
+                delay = settings.LOCATION_INGEST_RETRY_MS / 1000 * 2 ** attempt
+                self.retries += 1
+                print(f"⚠️ Location ingest flush failed ({len(batch)} fixes), retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                # Not a database error, so retrying the same batch would fail the same way
+                if len(batch) == 1:
+                    self.failed += 1
+                    print(f"⚠️ Location ingest dropped a fix it could not write: {e!r}")
+                    return
+                print(f"⚠️ Location ingest flush failed ({e!r}), writing {len(batch)} fixes one at a time")
+                for item in batch:
+                    await self._write([item])
+                return
+
+        finished = time.monotonic()
+        elapsed = finished - started
+        self.flushes += 1
+        self.written += len(batch)
+        self.coalesced += len(batch) - counts["current"]
+        self.last_flush_seconds = round(elapsed, 6)
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        self.total_flush_seconds += elapsed
+        # Queue time of the oldest fix until it was durable
+        self.max_lag_seconds = max(self.max_lag_seconds, finished - batch[0][1])
+
+    async def _run(self):
+        while True:
+            try:
+                await self._flush_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep flushing; a dead loop would leave every later fix queued until a restart
+                self.loop_errors += 1
+                self._writing = None
+                print(f"⚠️ Location ingest flush loop error: {e!r}")
+
+    async def _flush_next(self):
+        batch_size = settings.LOCATION_INGEST_BATCH_SIZE
+        self._batch = [await self._queue.get()]
+        # Give other fixes a window to arrive unless a full batch is already waiting
+        if self._queue.qsize() < batch_size - 1:
+            await asyncio.sleep(settings.LOCATION_INGEST_FLUSH_MS / 1000)
+        self._batch += self._drain(batch_size - 1)
+
+        batch, self._batch = self._batch, []
+        # Shielded so stop() can wait for an in-flight write instead of cutting it off
+        self._writing = asyncio.ensure_future(self._write(batch))
+        await asyncio.shield(self._writing)
+        self._writing = None
+
+
+location_ingest = LocationIngest()
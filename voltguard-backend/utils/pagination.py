@@ -0,0 +1,100 @@
+import base64
+from typing import List, Optional, Tuple
+from bson import json_util
+
+# Filtered counts stop at this many matches when an estimate is requested
+ESTIMATED_COUNT_CAP = 10000
+
+
+def encode_cursor(values: list) -> str:
+    """Encode the sort-key values of the last returned document as an opaque token"""
+    raw = json_util.dumps(values, json_options=json_util.CANONICAL_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> list:
+    """Decode a token produced by `encode_cursor`"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid pagination cursor")
+    return values
+
+
+def keyset_filter(sort: List[Tuple[str, int]], values: list) -> dict:
+    """
+    Build the filter that selects documents strictly after `values` in `sort` order
+
+    For sort keys (a, b, c) this expands to
+    a < va OR (a == va AND b < vb) OR (a == va AND b == vb AND c < vc)
+    with the comparison flipped for ascending keys.
+    """
+    if len(values) != len(sort):
+        raise ValueError("Invalid pagination cursor")
+
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {sort[j][0]: values[j] for j in range(i)}
+        clause[field] = {"$lt" if direction < 0 else "$gt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def _sort_values(doc: dict, sort: List[Tuple[str, int]]) -> list:
+    return [doc.get(field) for field, _ in sort]
+
+
+async def count_matches(collection, query: dict, mode: str) -> Tuple[Optional[int], bool]:
+    """
+    Count documents matching `query`
+
+    - **exact**: full `count_documents`
+    - **estimated**: collection metadata when unfiltered, otherwise a count capped at `ESTIMATED_COUNT_CAP`
+    - **none**: skip counting
+
+    Returns the total and whether it is an estimate.
+    """
+    if mode == "none":
+        return None, False
+    if mode == "exact":
+        return await collection.count_documents(query), False
+    if not query:
+        return await collection.estimated_document_count(), True
+    total = await collection.count_documents(query, limit=ESTIMATED_COUNT_CAP)
+    return total, total >= ESTIMATED_COUNT_CAP
+
+
+async def paginate(
+    collection,
+    query: dict,
+    sort: List[Tuple[str, int]],
+    limit: int,
+    cursor: Optional[str] = None,
+    count: str = "none",
+    projection: Optional[dict] = None,
+):
+    """
+    Fetch one keyset page of `collection`
+
+    `sort` must end with a unique key (normally `_id`) so the ordering is total.
+    Returns `(documents, next_cursor, total, total_is_estimate)`; `next_cursor`
+    is None on the last page.
+    """
+    page_query = query
+    if cursor:
+        after = keyset_filter(sort, decode_cursor(cursor))
+        page_query = {"$and": [query, after]} if query else after
+
+    # Read one extra document to learn whether another page exists
+    documents = await collection.find(page_query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(_sort_values(documents[-1], sort))
+
+    total, total_is_estimate = await count_matches(collection, query, count)
+    return documents, next_cursor, total, total_is_estimate
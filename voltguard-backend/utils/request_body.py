@@ -0,0 +1,47 @@
+import zlib
+from fastapi import HTTPException, Request, status
+
+
+async def read_decoded_body(request: Request, max_bytes: int) -> bytes:
+    """
+    Read a request body, inflating it when sent with `Content-Encoding: gzip`
+
+    Both the bytes received and the inflated size are capped at `max_bytes`,
+    so a small compressed body cannot expand without limit.
+    """
+    encoding = request.headers.get("content-encoding", "identity").strip().lower()
+    if encoding not in ("gzip", "identity"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported Content-Encoding: {encoding}"
+        )
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Request body exceeds {max_bytes} bytes"
+    )
+
+    # wbits 16 + MAX_WBITS expects a gzip header and trailer
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding == "gzip" else None
+    chunks = []
+    received = 0
+    size = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise too_large
+        if inflater:
+            try:
+                chunk = inflater.decompress(chunk, max_bytes - size + 1)
+            except zlib.error:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid gzip body")
+            # Input left over means the output limit was hit
+            if inflater.unconsumed_tail:
+                raise too_large
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+
+    if inflater and not inflater.eof:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Truncated gzip body")
+    return b"".join(chunks)
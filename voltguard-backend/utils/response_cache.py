@@ -0,0 +1,226 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional
+from fastapi import Request, Response, status
+from config import settings
+from utils.fast_json import encode_json
+
+# Tag bumped by every fault request write; list responses depend on it
+FAULT_REQUESTS_TAG = "fault_requests"
+
+
+def fault_request_tag(request_id: str) -> str:
+    return f"fault_request:{request_id}"
+
+
+def user_tag(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry expiry"""
+
+    shared = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._generations: dict = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def generations(self, tags: list) -> list:
+        return [self._generations.get(tag, 0) for tag in tags]
+
+    async def bump(self, tags: list):
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Shared cache on a Redis-compatible async client
+
+    Any client with async `get`, `set(key, value, ex=)`, `mget` and `incr`
+    works, e.g. `redis.asyncio.Redis` or an in-memory stand-in. Generations
+    live in Redis too, so an invalidation in one worker reaches them all.
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix: str = "voltguard:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the `redis` package")
+        return cls(redis.from_url(url))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def generations(self, tags: list) -> list:
+        values = await self.client.mget([f"{self.prefix}gen:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, tags: list):
+        for tag in tags:
+            await self.client.incr(f"{self.prefix}gen:{tag}")
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class ResponseCache:
+    """
+    Cache of rendered JSON responses with ETag support
+
+    Keys combine the route, the principal, the query string and the current
+    generation of every tag the response depends on. Writes invalidate by
+    bumping tag generations, so stale entries are never read again and
+    simply age out. Every response carries an ETag; a matching
+    `If-None-Match` gets a 304 with no body, whether the response came from
+    the cache or was just built.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def configure(self):
+        """
+        Create the backend selected by CACHE_BACKEND
+
+        Tag generations of the memory backend live in one process, so other
+        workers would keep serving responses a write has invalidated. With
+        more than one worker the cache must be shared (redis) or disabled.
+        """
+        if settings.CACHE_BACKEND == "redis":
+            self.backend = RedisCacheBackend.from_url(settings.REDIS_URL)
+        elif settings.CACHE_ENABLED and settings.WORKERS > 1:
+            raise RuntimeError(
+                f"CACHE_BACKEND=memory cannot be invalidated across {settings.WORKERS} workers; "
+                "use CACHE_BACKEND=redis or CACHE_ENABLED=false"
+            )
+        else:
+            self.backend = MemoryCacheBackend(settings.CACHE_MAX_ENTRIES)
+
+    @property
+    def enabled(self) -> bool:
+        return settings.CACHE_ENABLED and self.backend is not None
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint"""
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "entries": self.backend.size() if self.backend else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations
+        }
+
+    async def invalidate(self, *tags: str):
+        """Make every cached response that depends on `tags` unreachable"""
+        if not self.enabled or not tags:
+            return
+        self.invalidations += 1
+        await self.backend.bump(list(tags))
+
+    async def invalidate_fault_requests(self, *request_ids: str):
+        """Invalidate the fault request lists and the given requests"""
+        await self.invalidate(FAULT_REQUESTS_TAG, *(fault_request_tag(request_id) for request_id in request_ids))
+
+    async def fault_request_changed(self, request_id: str):
+        """
+        Change stream hook for fault request writes made by any process
+
+        Only needed for process-local backends: with a shared backend the
+        writer's own invalidation already reached every worker.
+        """
+        if self.backend is not None and not self.backend.shared:
+            await self.invalidate_fault_requests(request_id)
+
+    async def _key(self, route: str, principal_id: str, request: Request, tags: list) -> str:
+        generations = await self.backend.generations(tags)
+        query = "&".join(sorted(f"{name}={value}" for name, value in request.query_params.multi_items()))
+        digest = hashlib.sha256(f"{request.url.path}?{query}".encode("utf-8")).hexdigest()[:32]
+        versions = ".".join(str(generation) for generation in generations)
+        return f"resp:{route}:{principal_id}:{digest}:{versions}"
+
+    def _respond(self, request: Request, etag: str, body: bytes) -> Response:
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag in (value.strip() for value in if_none_match.split(",")):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def respond(
+        self,
+        request: Request,
+        route: str,
+        principal_id: str,
+        tags: Iterable[str],
+        ttl: int,
+        model,
+        build: Callable[[], Awaitable]
+    ) -> Response:
+        """
+        Serve a cached response or build, render and cache a new one
+
+        - **route**: Name of the route, part of the cache key
+        - **principal_id**: User the response is for, part of the cache key
+        - **tags**: Invalidation tags the response depends on
+        - **ttl**: Seconds the response stays cached
+        - **model**: Response model used to render `build()`'s result
+        - **build**: Coroutine function producing the payload; exceptions propagate uncached
+        """
+        key = None
+        if self.enabled:
+            key = await self._key(route, principal_id, request, list(tags))
+            cached = await self.backend.get(key)
+            if cached is not None:
+                self.hits += 1
+                etag, _, body = cached.partition(b"\n")
+                return self._respond(request, etag.decode("ascii"), body)
+            self.misses += 1
+
+        body = encode_json(model, await build())
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        if key is not None:
+            await self.backend.set(key, etag.encode("ascii") + b"\n" + body, ttl)
+        return self._respond(request, etag, body)
+
+
+response_cache = ResponseCache()
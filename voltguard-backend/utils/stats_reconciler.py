@@ -0,0 +1,50 @@
+import asyncio
+from typing import Optional
+from pymongo.errors import PyMongoError
+from config import settings
+from repositories.stats import FaultStatsRepository
+
+
+class StatsReconciler:
+    """
+    Periodically rebuild the dashboard counters from the fault requests
+
+    The counters are kept current with `$inc` on every write; this loop
+    corrects drift from failed writes or manual edits and seeds the counters
+    for data created before they existed.
+    """
+
+    def __init__(self):
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db):
+        """Reconcile now and then every STATS_RECONCILE_INTERVAL_SECONDS"""
+        self._db = db
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the reconcile loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def reconcile(self) -> dict:
+        """Rebuild the counters once"""
+        return await FaultStatsRepository(self._db).reconcile(self._db["fault_requests"])
+
+    async def _run(self):
+        while True:
+            try:
+                document = await self.reconcile()
+                print(f"📊 Fault request stats reconciled ({document['total']} requests)")
+            except PyMongoError as e:
+                print(f"⚠️ Fault request stats reconcile failed: {e}")
+            await asyncio.sleep(settings.STATS_RECONCILE_INTERVAL_SECONDS)
+
+
+stats_reconciler = StatsReconciler()
@@ -0,0 +1,33 @@
+from typing import Iterable, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from repositories.users import UserRepository
+
+
+async def resolve_user_names(db, user_ids: Iterable[Optional[str]]) -> dict:
+    """
+    Resolve user IDs to full names with a single `$in` query
+
+    Returns a mapping of the original string ID to the user's full name.
+    IDs that are empty, malformed or unknown are simply left out.
+    """
+    object_ids = {}
+    for user_id in user_ids:
+        if not user_id or user_id in object_ids:
+            continue
+        try:
+            object_ids[user_id] = ObjectId(user_id)
+        except (InvalidId, TypeError):
+            continue
+
+    if not object_ids:
+        return {}
+
+    return await UserRepository(db).get_names(object_ids.values())
+
+
+async def resolve_assigned_names(db, requests: list) -> dict:
+    """
+    Resolve the `assigned_to` electrician names for a list of fault request documents
+    """
+    return await resolve_user_names(db, (req.get("assigned_to") for req in requests))